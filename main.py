@@ -17,15 +17,15 @@ SRC_DIR = Path("src")
 SRC_DIR.mkdir(exist_ok=True)
 PROJECTS_DIR.mkdir(exist_ok=True)
 
-DEFAULT_CONFIG = {
-    "generator": {"rozměr_karty": "63x88mm", "barvy": "RGB"},
-    "editor": {"alpha": "1"},
-    "prevod": {"formát": "PNG"},
-    "tisk": {"printer": "HP_LaserJet", "duplex": True},
-    "zdroje": {"excel": "", "sablona": ""}
-}
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+from konfigurace import DEFAULT_CONFIG  # výchozí config.json, sdílený s benchmark.py
+
+BUTTON_ORDER = ["Kontrola", "Generator", "Editor", "Prevod", "Casy", "Tisk"]
 
-BUTTON_ORDER = ["Generator", "Editor", "Prevod", "Tisk"]
+# Tlačítka, která spouští existující skript s dalšími argumenty: stem -> (skript, argumenty)
+BUTTON_SCRIPTS = {
+    "kontrola": ("generator", ["--check"]),
+}
 
 # ---------------- Načtení skriptů ze složky src ----------------
 SCRIPTS = {}
@@ -132,7 +132,8 @@ class ScriptGUI:
         """
         for display_name in BUTTON_ORDER:
             stem = display_name.lower()
-            if stem in SCRIPTS:
+            script_stem, _ = BUTTON_SCRIPTS.get(stem, (stem, []))
+            if script_stem in SCRIPTS:
                 self._add_script_button(parent, display_name, stem)
 
     # ---------------- Okno pro výběr zdrojů ----------------
@@ -276,11 +277,12 @@ class ScriptGUI:
         self._update_time_label(name)
 
     def _execute_script(self, name):
-        script = SCRIPTS[name]
+        script_stem, args = BUTTON_SCRIPTS.get(name, (name, []))
+        script = SCRIPTS[script_stem]
         project_path = PROJECTS_DIR / self.current_project
         try:
             process = subprocess.Popen(
-                [sys.executable, script, str(project_path)],
+                [sys.executable, script, str(project_path), *args],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True
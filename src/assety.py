@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Úložiště obrázků karet podle obsahu (vystup/assety/<sha256>.<přípona>).
+
+Místo base64 vloženého do každého SVG se obrázek uloží jednou a karty na něj
+odkazují relativním href. Krok "zabalení" obrázky zase vloží zpět pro přenosný export.
+
+Použití z příkazové řádky:
+    python assety.py <projekt>            převede vložené obrázky existujících karet na odkazy
+    python assety.py <projekt> --zabal    vytvoří vystup/export_svg s vloženými obrázky
+                                          (volné karty i karty z balíku karty.zip)
+"""
+import os
+import sys
+import base64
+import hashlib
+import mimetypes
+import xml.etree.ElementTree as ET
+from contextlib import ExitStack
+from pathlib import Path
+from urllib.parse import unquote
+
+SVG_IMAGE = "{http://www.w3.org/2000/svg}image"
+HREF_ATRIBUTY = ["{http://www.w3.org/1999/xlink}href", "href"]
+
+PRIPONY = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+
+# ---------------- Úložiště ----------------
+def asset_dir_projektu(project_path):
+    return Path(project_path) / "vystup" / "assety"
+
+def pouzit_assety(config):
+    """generator.assety v config.json zapíná odkazy na sdílené obrázky místo base64."""
+    return bool(config.get("generator", {}).get("assety", False))
+
+def uloz_asset(data, mime, asset_dir):
+    """Uloží obrázek pod jménem podle hashe obsahu (pokud tam ještě není) a vrátí jeho cestu."""
+    asset_dir = Path(asset_dir)
+    asset_dir.mkdir(parents=True, exist_ok=True)
+    cesta = asset_dir / (hashlib.sha256(data).hexdigest() + PRIPONY.get(mime, ".bin"))
+    if not cesta.exists():
+        docasny = cesta.with_name(cesta.name + ".tmp")
+        docasny.write_bytes(data)
+        os.replace(docasny, cesta)
+    return cesta
+
+def rozloz_data_uri(href):
+    """Vrátí (mime, bajty) z base64 data URI, jinak None."""
+    if not href or not href.startswith("data:"):
+        return None
+    hlavicka, _, data = href[5:].partition(",")
+    casti = hlavicka.split(";")
+    if "base64" not in casti:
+        return None
+    mime = casti[0] or "text/plain"
+    return mime, base64.b64decode(data)
+
+def relativni_href(cesta, svg_dir):
+    return Path(os.path.relpath(cesta, svg_dir)).as_posix()
+
+# ---------------- Převod stromu ----------------
+def odkazat_obrazky(root, asset_dir, svg_dir):
+    """
+    Nahradí vložené base64 obrázky odkazem do úložiště (relativně ke složce svg_dir).
+    Funguje pro xml.etree i lxml stromy, vrací počet převedených obrázků.
+    """
+    pocet = 0
+    for image_el in root.iter(SVG_IMAGE):
+        for attr in HREF_ATRIBUTY:
+            rozlozeno = rozloz_data_uri(image_el.get(attr))
+            if rozlozeno is None:
+                continue
+            mime, data = rozlozeno
+            cesta = uloz_asset(data, mime, asset_dir)
+            image_el.set(attr, relativni_href(cesta, svg_dir))
+            pocet += 1
+    return pocet
+
+def zabalit_obrazky(root, svg_dir):
+    """Vloží obrázky odkazované relativním href zpět jako base64, vrací počet vložených."""
+    pocet = 0
+    for image_el in root.iter(SVG_IMAGE):
+        for attr in HREF_ATRIBUTY:
+            href = image_el.get(attr)
+            if not href or ":" in href.split("/")[0]:
+                continue  # data:, http:, file: apod. nechat být
+            cesta = Path(svg_dir) / unquote(href)
+            if not cesta.is_file():
+                continue
+            mime = mimetypes.guess_type(cesta.name)[0] or "application/octet-stream"
+            b64_data = base64.b64encode(cesta.read_bytes()).decode("utf-8")
+            image_el.set(attr, f"data:{mime};base64,{b64_data}")
+            pocet += 1
+    return pocet
+
+def absolutni_odkazy(root, svg_dir):
+    """Přepíše relativní href obrázků na absolutní file:// URI (pro kartu vybalenou jinam)."""
+    for image_el in root.iter(SVG_IMAGE):
+        for attr in HREF_ATRIBUTY:
+            href = image_el.get(attr)
+            if not href or href.startswith("#") or ":" in href.split("/")[0]:
+                continue
+            image_el.set(attr, (Path(svg_dir) / unquote(href)).resolve().as_uri())
+
+# ---------------- Příkazová řádka ----------------
+def main():
+    import balik  # balik importuje assety, proto až tady
+
+    if len(sys.argv) < 2:
+        print("Nebyla předána cesta k projektu.")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    svg_dir = project_path / "vystup" / "vystup_svg"
+    asset_dir = asset_dir_projektu(project_path)
+    zabalit = "--zabal" in sys.argv[2:]
+    export_dir = project_path / "vystup" / "export_svg"
+
+    # karty z balíku (generator.vystup = "zip") se exportují také, volný soubor má přednost
+    if zabalit:
+        karty = balik.karty_k_prevodu(svg_dir, balik.cesta_baliku(project_path))
+    else:
+        karty = [(svg_soubor.relative_to(svg_dir).as_posix(), svg_soubor)
+                 for svg_soubor in sorted(svg_dir.rglob("*.svg"))]
+
+    celkem = 0
+    with ExitStack() as stack:
+        cteni = None
+        for rel, svg_soubor in karty:
+            try:
+                if svg_soubor is None:
+                    if cteni is None:
+                        cteni = stack.enter_context(balik.CteniBaliku(balik.cesta_baliku(project_path), svg_dir))
+                    tree = ET.ElementTree(ET.fromstring(cteni.precti(rel)))
+                else:
+                    tree = ET.parse(svg_soubor)
+            except ET.ParseError as e:
+                print(f"Chyba při načítání {svg_soubor or rel}: {e}")
+                continue
+
+            karta_dir = (svg_dir / rel).parent
+            if zabalit:
+                pocet = zabalit_obrazky(tree.getroot(), karta_dir)
+                cil = export_dir / rel
+                cil.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                pocet = odkazat_obrazky(tree.getroot(), asset_dir, karta_dir)
+                cil = svg_soubor
+                if not pocet:
+                    continue
+
+            tree.write(cil, encoding="utf-8", xml_declaration=True, method="xml")
+            celkem += pocet
+
+    if zabalit:
+        print(f"Export s vloženými obrázky: {export_dir} ({celkem} obrázků)")
+    else:
+        if balik.nacti_obsah(balik.cesta_baliku(project_path)):
+            print("Karty v balíku karty.zip se nepřevádějí, odkazy na obrázky jim dá generátor (generator.assety).")
+        print(f"Převedeno {celkem} vložených obrázků na odkazy do {asset_dir}")
+    print("Hotovo!")
+
+if __name__ == "__main__":
+    main()
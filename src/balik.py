@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+import zipfile
+import tempfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from pathlib import Path
+import assety
+
+# ---------------- Balík karet (generator.vystup = "zip") ----------------
+# Celý balíček v jednom souboru vystup/karty.zip místo tisíců malých SVG.
+# Položky mají stejné relativní cesty jako ve vystup_svg (<Kategorie>/<nazev>.svg),
+# manifest.json popisuje každou kartu (název, kategorie, vzácnost, počet, offset v archivu).
+# Volný soubor ve vystup_svg má přednost před stejnou položkou v balíku
+# (např. karta upravená v editoru). Generátor proto volné SVG každé karty,
+# kterou znovu zapíše do balíku, smaže, aby starou verzi nepřevedl místo nové.
+
+MANIFEST = "manifest.json"
+
+def cesta_baliku(project_path):
+    return Path(project_path) / "vystup" / "karty.zip"
+
+def pouzit_balik(config):
+    return str(config.get("generator", {}).get("vystup", "svg")).lower() == "zip"
+
+class ZapisBaliku:
+    """Zapisuje karty do dočasného archivu, který se při úspěšném zavření atomicky přejmenuje."""
+
+    def __init__(self, balik_path):
+        self.balik_path = Path(balik_path)
+        self.docasny = self.balik_path.with_name(self.balik_path.name + ".tmp")
+        self.zip = zipfile.ZipFile(self.docasny, "w", compression=zipfile.ZIP_DEFLATED)
+        self.karty = {}
+
+    def pridej(self, soubor, data, info):
+        # při kolizi názvů vyhrává poslední karta, stejně jako při zápisu do složky
+        self.zip.writestr(soubor, data)
+        zipinfo = self.zip.getinfo(soubor)
+        self.karty[soubor] = {"soubor": soubor, **info,
+                              "offset": zipinfo.header_offset, "velikost": zipinfo.file_size}
+
+    def zkopiruj(self, stary_zip, soubor, info):
+        """Převezme nezměněnou kartu ze starého balíku bez generování."""
+        self.pridej(soubor, stary_zip.read(soubor), info)
+
+    def zavri(self, ok=True):
+        if ok:
+            self.zip.writestr(MANIFEST, json.dumps({"karty": list(self.karty.values())}, ensure_ascii=False, indent=2))
+        self.zip.close()
+        if ok:
+            os.replace(self.docasny, self.balik_path)
+        else:
+            self.docasny.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.zavri(ok=exc_type is None)
+
+def nacti_obsah(balik_path):
+    """{relativní cesta: záznam z manifestu} nebo prázdný slovník, pokud balík neexistuje."""
+    balik_path = Path(balik_path)
+    if not balik_path.exists():
+        return {}
+    try:
+        with zipfile.ZipFile(balik_path) as zf:
+            manifest = json.loads(zf.read(MANIFEST).decode("utf-8"))
+    except (KeyError, zipfile.BadZipFile, ValueError) as e:
+        print(f"Balík {balik_path} nelze přečíst: {e}")
+        return {}
+    return {karta["soubor"]: karta for karta in manifest.get("karty", [])}
+
+# relativní odkaz = href, který není data:, http:, file: ani #kotva
+RELATIVNI_HREF = re.compile(rb'href="(?![a-zA-Z][a-zA-Z0-9+.-]*:|#)')
+
+class CteniBaliku:
+    """
+    Otevřený balík pro čtení. Inkscape potřebuje soubor na disku, karta se proto
+    vybalí do dočasného souboru; relativní odkazy na obrázky se přepíšou na absolutní,
+    aby fungovaly i mimo vystup_svg.
+    """
+
+    def __init__(self, balik_path, svg_dir):
+        self.svg_dir = Path(svg_dir)
+        self.zip = zipfile.ZipFile(balik_path)
+
+    def precti(self, soubor):
+        return self.zip.read(soubor)
+
+    def velikost(self, soubor):
+        return self.zip.getinfo(soubor).file_size
+
+    @contextmanager
+    def docasny_soubor(self, soubor):
+        data = self.precti(soubor)
+        if RELATIVNI_HREF.search(data):
+            root = ET.fromstring(data)
+            assety.absolutni_odkazy(root, (self.svg_dir / soubor).parent)
+            data = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        fd, cesta = tempfile.mkstemp(suffix=".svg")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            yield Path(cesta)
+        finally:
+            os.remove(cesta)
+
+    def zavri(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.zavri()
+
+def karty_k_prevodu(svg_dir, balik_path):
+    """
+    Seznam (relativní cesta, zdroj) všech karet: volná SVG ve svg_dir a položky balíku,
+    které nemají volný soubor. zdroj je Path volného souboru nebo None pro položku balíku.
+    """
+    svg_dir = Path(svg_dir)
+    karty = {}
+    if svg_dir.exists():
+        for svg_soubor in svg_dir.rglob("*.svg"):
+            karty[svg_soubor.relative_to(svg_dir).as_posix()] = svg_soubor
+    for soubor in nacti_obsah(balik_path):
+        karty.setdefault(soubor, None)
+    return sorted(karty.items())
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark linky Excel → SVG → PNG → PDF.
+
+Pro každou kombinaci počtu řádků a velikosti vloženého obrázku vytvoří syntetický
+projekt (karty.xlsx, sablona.svg, ruby, config.json), postupně spustí generator,
+prevod a tisk jako samostatné procesy a zapíše do JSON dobu běhu, propustnost
+(karty/s), maximální RSS a velikost výstupů každého kroku.
+Inkscape nahrazuje falesny_inkscape.py, benchmark tedy běží i bez grafiky na Linuxu.
+
+Použití:
+    python benchmark.py [--radky 100,1000,10000] [--obrazky-kb 10,200]
+                        [--kroky generator,prevod,tisk] [--nastaveni '{"generator": {"procesy": 0}}']
+                        [--pracovni DIR] [--vystup vysledky.json] [--porovnat stare.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import struct
+import zlib
+import base64
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from konfigurace import vychozi_config
+from impozice import Rozvrzeni
+
+SRC_DIR = Path(__file__).resolve().parent
+KROKY = ["generator", "prevod", "tisk"]
+VERZE_VYSLEDKU = 1
+
+KATEGORIE = ["postavy", "akce", "predmety", "mista"]
+VZACNOSTI = ["bezna", "vzacna", "legendarni"]
+
+# ---------------- Syntetická data ----------------
+def nahodne_png(velikost_kb, seed=0):
+    """PNG s náhodnými pixely bez komprese, soubor má přibližně velikost_kb."""
+    strana = max(1, int((velikost_kb * 1024 / 3) ** 0.5))
+    nahoda = random.Random(seed)
+    data = b"".join(b"\x00" + nahoda.randbytes(strana * 3) for _ in range(strana))
+
+    def blok(typ, obsah):
+        return struct.pack(">I", len(obsah)) + typ + obsah + struct.pack(">I", zlib.crc32(typ + obsah))
+    return (b"\x89PNG\r\n\x1a\n"
+            + blok(b"IHDR", struct.pack(">IIBBBBB", strana, strana, 8, 2, 0, 0, 0))
+            + blok(b"IDAT", zlib.compress(data, 0))
+            + blok(b"IEND", b""))
+
+def sablona_svg(obrazek_kb):
+    obrazek = base64.b64encode(nahodne_png(obrazek_kb)).decode("ascii") if obrazek_kb else ""
+    kategorie = "\n".join(
+        f'    <g inkscape:label="{k}" style="display:none"><rect x="2" y="2" width="59" height="10" fill="#{i * 40 + 30:02x}3366"/></g>'
+        for i, k in enumerate(KATEGORIE))
+    vzacnosti = "\n".join(
+        f'    <g inkscape:label="{v}" style="display:none"><circle cx="55" cy="80" r="{i + 2}"/></g>'
+        for i, v in enumerate(VZACNOSTI))
+    obrazek_el = (f'    <image x="5" y="14" width="53" height="40" xlink:href="data:image/png;base64,{obrazek}"/>'
+                  if obrazek else "")
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+     width="63mm" height="88mm" viewBox="0 0 63 88">
+  <g inkscape:label="Kategorie">
+{kategorie}
+  </g>
+  <g inkscape:label="OBRAZEK">
+{obrazek_el}
+  </g>
+  <g inkscape:label="Vzacnost">
+{vzacnosti}
+  </g>
+  <text x="5" y="9" font-size="5"><tspan>Nazev</tspan></text>
+  <text x="5" y="62" font-size="3"><tspan>Popis</tspan></text>
+  <text x="5" y="80" font-size="4"><tspan>Utok</tspan></text>
+  <text x="20" y="80" font-size="4"><tspan>Obrana</tspan></text>
+</svg>
+'''
+
+def tabulka(radky):
+    return pd.DataFrame({
+        "Nazev": [f"Karta {i:05d}" for i in range(radky)],
+        "Kategorie": [KATEGORIE[i % len(KATEGORIE)] for i in range(radky)],
+        "Vzacnost": [VZACNOSTI[(i // 7) % len(VZACNOSTI)] for i in range(radky)],
+        "Popis": [f"Popis karty číslo {i}, která dělá něco užitečného." for i in range(radky)],
+        "Utok": [i % 10 for i in range(radky)],
+        "Obrana": [(i * 3) % 10 for i in range(radky)],
+        "Pocet": [1 + (i % 3 == 0) for i in range(radky)],
+    })
+
+def rub_pdf(cesta, text, velikost=None):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    velikost = velikost or A4
+    c = canvas.Canvas(str(cesta), pagesize=velikost)
+    c.drawString(10, velikost[1] / 2, text)
+    c.showPage()
+    c.save()
+
+def vytvor_projekt(project_path, radky, obrazek_kb, nastaveni):
+    data_dir = project_path / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (project_path / "vystup").mkdir(exist_ok=True)
+    tabulka(radky).to_excel(data_dir / "karty.xlsx", index=False)
+    (data_dir / "sablona.svg").write_text(sablona_svg(obrazek_kb), encoding="utf-8")
+    # běžné karty mají rub velikosti karty (zrcadlově skládaný), ostatní rub na celý arch
+    for vzacnost in VZACNOSTI:
+        rub_pdf(data_dir / f"{vzacnost}.pdf", f"Rub {vzacnost}",
+                Rozvrzeni().karta if vzacnost == "bezna" else None)
+
+    config = vychozi_config()
+    config["zdroje"].update(excel="karty.xlsx", sablona="sablona.svg")
+    for sekce, hodnoty in nastaveni.items():
+        config.setdefault(sekce, {}).update(hodnoty)
+    with open(project_path / "config.json", "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+def falesny_inkscape(pracovni):
+    """Spustitelný obal falesny_inkscape.py (cesta pro KARTICANDY_INKSCAPE)."""
+    skript = SRC_DIR / "falesny_inkscape.py"
+    if os.name == "nt":
+        obal = pracovni / "falesny_inkscape.bat"
+        obal.write_text(f'@"{sys.executable}" "{skript}" %*\n', encoding="utf-8")
+    else:
+        obal = pracovni / "falesny_inkscape"
+        obal.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{skript}" "$@"\n', encoding="utf-8")
+        obal.chmod(0o755)
+    return obal
+
+# ---------------- Měření ----------------
+def velikost(*cesty):
+    celkem = 0
+    for cesta in cesty:
+        if cesta.is_file():
+            celkem += cesta.stat().st_size
+        elif cesta.is_dir():
+            celkem += sum(f.stat().st_size for f in cesta.rglob("*") if f.is_file())
+    return celkem
+
+def vystupy_kroku(project_path, krok):
+    vystup = project_path / "vystup"
+    if krok == "generator":
+        return [vystup / "vystup_svg", vystup / "karty.zip", vystup / "assety"]
+    if krok == "prevod":
+        return [vystup / "vystup_png", vystup / "vystup_pdf"]
+    return [vystup / "karty_tisk.pdf", vystup / "karty_tisk_oboustranne.pdf"]
+
+def spust_krok(krok, project_path, env, log_path):
+    """Spustí skript jako samostatný proces a vrátí (návratový kód, sekundy, max. RSS v MB)."""
+    with open(log_path, "w", encoding="utf-8") as log:
+        start = time.perf_counter()
+        proces = subprocess.Popen([sys.executable, str(SRC_DIR / f"{krok}.py"), str(project_path)],
+                                  stdout=log, stderr=subprocess.STDOUT, env=env, cwd=str(project_path))
+        if hasattr(os, "wait4"):
+            # rusage dětského procesu – max RSS bez cizího balíčku
+            _, status, rusage = os.wait4(proces.pid, 0)
+            sekundy = time.perf_counter() - start
+            proces.returncode = os.waitstatus_to_exitcode(status)
+            # Linux hlásí ru_maxrss v KiB, macOS v bajtech
+            rss_mb = rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proces.wait()
+            sekundy = time.perf_counter() - start
+            rss_mb = None
+    return proces.returncode, sekundy, rss_mb
+
+def zmer(radky, obrazek_kb, kroky, nastaveni, pracovni, env):
+    project_path = pracovni / f"projekt_{radky}_{obrazek_kb}kb"
+    if project_path.exists():
+        shutil.rmtree(project_path)
+    vytvor_projekt(project_path, radky, obrazek_kb, nastaveni)
+    karty = int(tabulka(radky)["Pocet"].sum())
+
+    beh = {"radky": radky, "obrazek_kb": obrazek_kb,
+           "sablona_bajty": (project_path / "data" / "sablona.svg").stat().st_size, "kroky": {}}
+    for krok in kroky:
+        kod, sekundy, rss_mb = spust_krok(krok, project_path, env, project_path / f"{krok}.log")
+        # tisk skládá každou kopii karty, ostatní kroky pracují s řádky
+        pocet = karty if krok == "tisk" else radky
+        beh["kroky"][krok] = {
+            "navratovy_kod": kod,
+            "sekundy": round(sekundy, 3),
+            "karty_za_s": round(pocet / sekundy, 1) if sekundy > 0 else None,
+            "max_rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+            "vystup_bajty": velikost(*vystupy_kroku(project_path, krok)),
+        }
+        print(f"{radky:>6} řádků, obrázek {obrazek_kb:>4} kB, {krok:<9}: "
+              f"{sekundy:8.2f} s, {beh['kroky'][krok]['karty_za_s']} karet/s, "
+              f"RSS {beh['kroky'][krok]['max_rss_mb']} MB"
+              + ("" if kod == 0 else f"  (CHYBA {kod}, viz {project_path / (krok + '.log')})"))
+        if kod != 0:
+            break  # další krok by pracoval s neúplným výstupem
+    return beh
+
+def revize():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def porovnej(vysledky, stare_path):
+    with open(stare_path, "r", encoding="utf-8") as f:
+        stare = json.load(f)
+    stare_behy = {(b["radky"], b["obrazek_kb"]): b for b in stare.get("behy", [])}
+    print(f"\nPorovnání s {stare_path} (revize {stare.get('revize')}):")
+    for beh in vysledky["behy"]:
+        stary = stare_behy.get((beh["radky"], beh["obrazek_kb"]))
+        if stary is None:
+            continue
+        for krok, hodnoty in beh["kroky"].items():
+            puvodni = stary["kroky"].get(krok)
+            if not puvodni or not puvodni.get("sekundy") or not hodnoty.get("sekundy"):
+                continue
+            pomer = puvodni["sekundy"] / hodnoty["sekundy"]
+            print(f"{beh['radky']:>6} řádků, obrázek {beh['obrazek_kb']:>4} kB, {krok:<9}: "
+                  f"{puvodni['sekundy']:8.2f} s → {hodnoty['sekundy']:8.2f} s  ({pomer:.2f}×)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generator → prevod → tisk na syntetických datech.")
+    parser.add_argument("--radky", default="100,1000,10000", help="počty řádků oddělené čárkou")
+    parser.add_argument("--obrazky-kb", default="10,200", help="velikosti obrázku v šabloně (kB), 0 = bez obrázku")
+    parser.add_argument("--kroky", default=",".join(KROKY), help="měřené kroky v pořadí")
+    parser.add_argument("--nastaveni", default="{}", help="JSON slučovaný do config.json, např. '{\"generator\": {\"procesy\": 0}}'")
+    parser.add_argument("--pracovni", help="složka pro syntetické projekty (jinak dočasná, po běhu se smaže)")
+    parser.add_argument("--vystup", help="soubor s výsledky (výchozí benchmark_<datum>.json)")
+    parser.add_argument("--porovnat", help="starší soubor s výsledky k porovnání")
+    args = parser.parse_args()
+
+    kroky = [k for k in args.kroky.split(",") if k]
+    for krok in kroky:
+        if krok not in KROKY:
+            parser.error(f"Neznámý krok: {krok}")
+    nastaveni = json.loads(args.nastaveni)
+
+    pracovni = Path(args.pracovni) if args.pracovni else Path(tempfile.mkdtemp(prefix="karticandy_bench_"))
+    pracovni.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, KARTICANDY_INKSCAPE=str(falesny_inkscape(pracovni)), PYTHONIOENCODING="utf-8")
+
+    vysledky = {
+        "verze": VERZE_VYSLEDKU,
+        "revize": revize(),
+        "datum": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platforma": platform.platform(),
+        "cpu": os.cpu_count(),
+        "nastaveni": nastaveni,
+        "behy": [],
+    }
+    try:
+        for radky in (int(r) for r in args.radky.split(",")):
+            for obrazek_kb in (int(o) for o in args.obrazky_kb.split(",")):
+                vysledky["behy"].append(zmer(radky, obrazek_kb, kroky, nastaveni, pracovni, env))
+    finally:
+        if not args.pracovni:
+            shutil.rmtree(pracovni, ignore_errors=True)
+
+    vystup = Path(args.vystup or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(vystup, "w", encoding="utf-8") as f:
+        json.dump(vysledky, f, ensure_ascii=False, indent=2)
+    print(f"Výsledky uloženy: {vystup}")
+
+    if args.porovnat:
+        porovnej(vysledky, args.porovnat)
+
+if __name__ == "__main__":
+    main()
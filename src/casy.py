@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Časy převodu karet.
+
+prevod zapisuje za každou kartu jeden řádek JSON do data/prevod_casy.jsonl:
+    {"beh": "2025-01-31T10:15:00", "karta": "akce/Karta.svg", "ok": true,
+     "vykreslovani": "inkscape" | "cairo" | "mezipamet", "sekundy": 1.93,
+     "vykresleni_s": 1.80, "ulozeni_s": 0.13, "svg_b": 412345, "vystup_b": 98765}
+a tento skript z něj vypíše nejpomalejší karty a co se na celkovém čase podílí nejvíc.
+
+Použití:
+    python casy.py <projekt> [--pocet 20] [--vse]
+    (--vse = všechny zaznamenané běhy, jinak jen poslední)
+"""
+import sys
+import json
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# log se při překročení velikosti přesune do prevod_casy.1.jsonl (jedna starší generace)
+MAX_VELIKOST_LOGU = 20 * 1024 * 1024
+VELIKOSTI_SVG = [(100 * 1024, "do 100 kB"), (1024 * 1024, "do 1 MB"), (10 * 1024 * 1024, "do 10 MB"),
+                 (None, "nad 10 MB")]
+
+def cesta_logu(project_path):
+    return Path(project_path) / "data" / "prevod_casy.jsonl"
+
+class LogCasu:
+    """Zápis záznamů jednoho běhu převodu; volající drží zámek, pokud zapisuje z více vláken."""
+
+    def __init__(self, project_path):
+        self.path = cesta_logu(project_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > MAX_VELIKOST_LOGU:
+            self.path.replace(self.path.with_name("prevod_casy.1.jsonl"))
+        self.beh = datetime.now().isoformat(timespec="seconds")
+        self.f = open(self.path, "a", encoding="utf-8")
+
+    def zapis(self, **zaznam):
+        self.f.write(json.dumps({"beh": self.beh, **zaznam}, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def zavri(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.zavri()
+
+def nacti_zaznamy(project_path, vse=False):
+    zaznamy = []
+    path = cesta_logu(project_path)
+    if not path.exists():
+        return zaznamy
+    with open(path, "r", encoding="utf-8") as f:
+        for radek in f:
+            try:
+                zaznamy.append(json.loads(radek))
+            except ValueError:
+                continue  # useknutý řádek po přerušeném běhu
+    if not vse and zaznamy:
+        posledni = zaznamy[-1]["beh"]
+        zaznamy = [z for z in zaznamy if z.get("beh") == posledni]
+    return zaznamy
+
+def velikost_textem(bajty):
+    if bajty is None:
+        return "-"
+    for jednotka in ("B", "kB", "MB"):
+        if bajty < 1024:
+            return f"{bajty:.0f} {jednotka}"
+        bajty /= 1024
+    return f"{bajty:.1f} GB"
+
+def skupina_velikosti(bajty):
+    for mez, nazev in VELIKOSTI_SVG:
+        if mez is None or (bajty or 0) <= mez:
+            return nazev
+
+def podily(zaznamy, klic, celkem):
+    """[(skupina, počet, sekundy, podíl)] seřazené od největšího času."""
+    skupiny = defaultdict(lambda: [0, 0.0])
+    for z in zaznamy:
+        skupina = skupiny[klic(z)]
+        skupina[0] += 1
+        skupina[1] += z.get("sekundy", 0.0)
+    return sorted(((nazev, pocet, sekundy, sekundy / celkem if celkem else 0.0)
+                   for nazev, (pocet, sekundy) in skupiny.items()), key=lambda s: -s[2])
+
+def vypis_souhrn(zaznamy, pocet=20):
+    if not zaznamy:
+        print("Žádné záznamy časů převodu, nejdřív spusťte Převod.")
+        return
+    celkem = sum(z.get("sekundy", 0.0) for z in zaznamy)
+    behy = sorted({z["beh"] for z in zaznamy})
+    chyby = [z for z in zaznamy if not z.get("ok")]
+    print(f"Běh {behy[-1]}" if len(behy) == 1 else f"Běhy {behy[0]} až {behy[-1]} ({len(behy)})")
+    print(f"Karet {len(zaznamy)}, chyb {len(chyby)}, součet časů karet {celkem:.1f} s, "
+          f"průměr {celkem / len(zaznamy):.2f} s")
+
+    print(f"\nNejpomalejší karty (top {pocet}):")
+    nejpomalejsi = sorted(zaznamy, key=lambda z: -z.get("sekundy", 0.0))[:pocet]
+    for z in nejpomalejsi:
+        stav = "" if z.get("ok") else "  CHYBA"
+        print(f"  {z.get('sekundy', 0.0):7.2f} s  {z.get('vykreslovani', '?'):9}  "
+              f"SVG {velikost_textem(z.get('svg_b')):>9}  výstup {velikost_textem(z.get('vystup_b')):>9}  "
+              f"{z['karta']}{stav}")
+    if celkem:
+        podil = sum(z.get("sekundy", 0.0) for z in nejpomalejsi) / celkem
+        print(f"  Těchto {len(nejpomalejsi)} karet tvoří {podil:.0%} celkového času.")
+
+    for nadpis, klic in (("Podle vykreslování", lambda z: z.get("vykreslovani", "?")),
+                         ("Podle kategorie", lambda z: z["karta"].split("/")[0] if "/" in z["karta"] else "-"),
+                         ("Podle velikosti SVG", lambda z: skupina_velikosti(z.get("svg_b")))):
+        print(f"\n{nadpis}:")
+        for nazev, n, sekundy, podil in podily(zaznamy, klic, celkem):
+            print(f"  {nazev:12} {n:6} karet  {sekundy:8.1f} s  {podil:5.0%}  ø {sekundy / n:.2f} s")
+
+    if chyby:
+        print(f"\nNepovedené karty ({len(chyby)}):")
+        for z in chyby[:pocet]:
+            print(f"  {z['karta']}: {z.get('chyba', '')}")
+
+def main():
+    if len(sys.argv) < 2:
+        print("Nebyla předána cesta k projektu.")
+        sys.exit(1)
+    project_path = Path(sys.argv[1])
+    argumenty = sys.argv[2:]
+    pocet = 20
+    if "--pocet" in argumenty:
+        try:
+            pocet = int(argumenty[argumenty.index("--pocet") + 1])
+        except (IndexError, ValueError):
+            print("--pocet potřebuje číslo, použiji 20.")
+    vypis_souhrn(nacti_zaznamy(project_path, vse="--vse" in argumenty), pocet)
+
+if __name__ == "__main__":
+    main()
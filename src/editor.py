@@ -14,6 +14,13 @@ import lxml.etree as ET
 import subprocess
 from pathlib import Path
 import base64
+import assety
+import balik
+import inkscape
+import rastr
+import nahledy
+import mezipamet
+import hashlib
 
 # ---------------- cesta k projektu ----------------
 if len(sys.argv) < 2:
@@ -25,19 +32,34 @@ OUTPUT_FOLDER = PROJECT_PATH / "vystup" / "vystup_svg"
 DATA_FOLDER = PROJECT_PATH / "data"
 DATA_FOLDER.mkdir(parents=True, exist_ok=True)
 
-if not OUTPUT_FOLDER.exists():
+# generator.vystup = "zip": karty jsou v balíku, volné soubory ve vystup_svg mají přednost
+BALIK_PATH = balik.cesta_baliku(PROJECT_PATH)
+
+if not OUTPUT_FOLDER.exists() and not BALIK_PATH.exists():
     print(f"Složka se SVG soubory neexistuje: {OUTPUT_FOLDER}")
     sys.exit(1)
 
-# --- Najdi Inkscape (portable) ---
-if getattr(sys, 'frozen', False):
-    BASE_DIR = Path(sys.executable).parent
-else:
-    BASE_DIR = Path(__file__).parent
+# --- úložiště obrázků (generator.assety) ---
+try:
+    with open(PROJECT_PATH / "config.json", "r", encoding="utf-8") as f:
+        PROJECT_CONFIG = json.load(f)
+except Exception:
+    PROJECT_CONFIG = {}
+ASSET_DIR = assety.asset_dir_projektu(PROJECT_PATH) if assety.pouzit_assety(PROJECT_CONFIG) else None
+# --- náhledy odvozené převodem (vystup_png/<Kategorie>/<nazev>.nahled.png) ---
+PNG_FOLDER = PROJECT_PATH / "vystup" / "vystup_png"
+PREVOD_MANIFEST = DATA_FOLDER / "prevod_manifest.json"
+_manifest_prevodu = {"mtime": None, "karty": {}}
+
+# --- sdílená mezipaměť vykreslených karet (data/cache/vykresleni), přežije zavření editoru ---
+MEZIPAMET = mezipamet.mezipamet_projektu(PROJECT_PATH, PROJECT_CONFIG)
+
+# --- náhledy přes cairo (prevod.vykreslovani = "cairo"), složitější karty dál Inkscape ---
+CAIRO = (str(PROJECT_CONFIG.get("prevod", {}).get("vykreslovani", "inkscape")).lower() == "cairo"
+         and rastr.dostupny())
 
-INKSCAPE_PATH = BASE_DIR / "inkscape_portable/App/Inkscape/bin/inkscape.exe"
-if not INKSCAPE_PATH.exists():
-    INKSCAPE_PATH = BASE_DIR / "inkscape_portable/InkscapePortable.exe"
+# --- Najdi Inkscape (portable) ---
+INKSCAPE_PATH = inkscape.INKSCAPE_PATH
 if not INKSCAPE_PATH.exists():
     raise FileNotFoundError(f"Inkscape nebyl nalezen: {INKSCAPE_PATH}")
 
@@ -50,19 +72,25 @@ NS = {
 
 # --- lock pro Inkscape (jedno volání najednou) ---
 INKSCAPE_LOCK = threading.Lock()
+# jedna dlouho běžící instance pro náhledy, start Inkscape se neplatí u každé karty
+PREVADEC = inkscape.Prevadec(INKSCAPE_PATH)
 
 # ---------------- pomocné funkce ----------------
 def svg_to_png_bytes(svg_path, dpi=150):
+    if not Path(svg_path).exists():
+        # karta jen v balíku – Inkscape dostane dočasně vybalený soubor
+        with balik.CteniBaliku(BALIK_PATH, OUTPUT_FOLDER) as cteni:
+            with cteni.docasny_soubor(Path(svg_path).relative_to(OUTPUT_FOLDER).as_posix()) as docasny:
+                return svg_to_png_bytes(docasny, dpi)
+    if CAIRO:
+        try:
+            return rastr.png_bytes(svg_path, dpi)
+        except rastr.Nepodporovano:
+            pass
     with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
         tmp_path = tmp.name
     try:
-        subprocess.run([
-            str(INKSCAPE_PATH),
-            str(svg_path),
-            "--export-type=png",
-            f"--export-filename={tmp_path}",
-            "--export-dpi", str(dpi)
-        ], check=True)
+        PREVADEC.prevest(svg_path, tmp_path, dpi)
         with open(tmp_path, "rb") as f:
             return f.read()
     finally:
@@ -75,6 +103,73 @@ def svg_to_png_bytes_threadsafe(svg_path, dpi=150):
     with INKSCAPE_LOCK:
         return svg_to_png_bytes(svg_path, dpi)
 
+def karty_prevodu():
+    """{relativní cesta: SHA-256 SVG} z data/prevod_manifest.json, znovu se čte jen po změně."""
+    try:
+        mtime = PREVOD_MANIFEST.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _manifest_prevodu["mtime"] != mtime:
+        try:
+            with open(PREVOD_MANIFEST, "r", encoding="utf-8") as f:
+                karty = json.load(f).get("karty", {})
+        except Exception:
+            karty = {}
+        _manifest_prevodu.update(mtime=mtime, karty=karty)
+    return _manifest_prevodu["karty"]
+
+def hash_svg(svg_path):
+    if Path(svg_path).exists():
+        data = Path(svg_path).read_bytes()
+    else:
+        with balik.CteniBaliku(BALIK_PATH, OUTPUT_FOLDER) as cteni:
+            data = cteni.precti(Path(svg_path).relative_to(OUTPUT_FOLDER).as_posix())
+    return hashlib.sha256(data).hexdigest()
+
+def nahled_z_prevodu(svg_path, hash_karty=None):
+    """Náhled zmenšený z tiskového PNG, pokud se SVG od převodu nezměnilo; jinak None."""
+    rel = Path(svg_path).relative_to(OUTPUT_FOLDER).as_posix()
+    nahled = nahledy.cesta_varianty(PNG_FOLDER / Path(rel).with_suffix(".png"), "nahled")
+    hash_prevodu = karty_prevodu().get(rel)
+    if hash_prevodu is None or not nahled.exists():
+        return None
+    if (hash_karty or hash_svg(svg_path)) != hash_prevodu:
+        return None
+    try:
+        return Image.open(nahled).convert("RGBA")
+    except OSError:
+        return None
+
+def nahled_karty(svg_path, dpi=150, vykreslit=True):
+    """Náhled z převodu, z mezipaměti, nebo nově vykreslený; s vykreslit=False bez Inkscape (jinak None)."""
+    hash_karty = hash_svg(svg_path)
+    img = nahled_z_prevodu(svg_path, hash_karty)
+    if img is not None:
+        return img
+    klic = mezipamet.klic(hash_karty, dpi, "page", "cairo" if CAIRO else "inkscape")
+    png_data = MEZIPAMET.nacti(klic)
+    if png_data is None:
+        if not vykreslit:
+            return None
+        png_data = svg_to_png_bytes_threadsafe(svg_path, dpi)
+        MEZIPAMET.uloz(klic, png_data)
+    return Image.open(io.BytesIO(png_data)).convert("RGBA")
+
+def nacti_svg_strom(svg_path):
+    parser = ET.XMLParser(huge_tree=True)
+    if Path(svg_path).exists():
+        return ET.parse(svg_path, parser=parser)
+    with balik.CteniBaliku(BALIK_PATH, OUTPUT_FOLDER) as cteni:
+        data = cteni.precti(Path(svg_path).relative_to(OUTPUT_FOLDER).as_posix())
+    return ET.fromstring(data, parser).getroottree()
+
+def vybalit_svg(svg_path):
+    """Uloží kartu z balíku jako volný soubor (ten pak má před balíkem přednost)."""
+    with balik.CteniBaliku(BALIK_PATH, OUTPUT_FOLDER) as cteni:
+        data = cteni.precti(Path(svg_path).relative_to(OUTPUT_FOLDER).as_posix())
+    Path(svg_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(svg_path).write_bytes(data)
+
 def parse_svg_length(value):
     if value is None:
         return 0.0
@@ -87,7 +182,7 @@ def parse_svg_length(value):
     except Exception:
         return 0.0
 
-def replace_image_in_svg(tree, new_image_path, pos, size):
+def replace_image_in_svg(tree, new_image_path, pos, size, asset_dir=None, svg_dir=None):
     root = tree.getroot()
     group = root.find('.//svg:g[@inkscape:label="OBRAZEK"]', NS)
     if group is None:
@@ -98,9 +193,14 @@ def replace_image_in_svg(tree, new_image_path, pos, size):
 
     img_data = Path(new_image_path).read_bytes()
     mime = "image/jpeg" if new_image_path.lower().endswith((".jpg", ".jpeg")) else "image/png"
-    b64_data = base64.b64encode(img_data).decode("utf-8")
-
-    image_el.set("{http://www.w3.org/1999/xlink}href", f"data:{mime};base64,{b64_data}")
+    if asset_dir is not None:
+        # obrázek jednou v úložišti, karta na něj jen odkazuje
+        href = assety.relativni_href(assety.uloz_asset(img_data, mime, asset_dir), svg_dir)
+    else:
+        b64_data = base64.b64encode(img_data).decode("utf-8")
+        href = f"data:{mime};base64,{b64_data}"
+
+    image_el.set("{http://www.w3.org/1999/xlink}href", href)
     image_el.set("x", str(pos[0]))
     image_el.set("y", str(pos[1]))
     image_el.set("width", str(size[0]))
@@ -115,7 +215,7 @@ class SVGEditor(TkinterDnD.Tk):
         self.geometry("1300x850")
 
         # seznam svg
-        self.svg_files = sorted([p for p in OUTPUT_FOLDER.rglob("*.svg")])
+        self.svg_files = [OUTPUT_FOLDER / rel for rel, _ in balik.karty_k_prevodu(OUTPUT_FOLDER, BALIK_PATH)]
         self.current_index = 0
         self.current_svg_path = None
         self.loading_path = None
@@ -304,7 +404,7 @@ class SVGEditor(TkinterDnD.Tk):
             return
         fpath_str = self.tree.item(item_id)["values"][0]
         svg_path = Path(fpath_str)
-        if svg_path.exists():
+        if svg_path.exists() or svg_path in self.svg_files:
             self.load_svg_by_path(svg_path)
 
     # ---------------- navigace ----------------
@@ -340,14 +440,12 @@ class SVGEditor(TkinterDnD.Tk):
                 if path in self.svg_cache:
                     img = self.svg_cache[path]
                 else:
-                    png_data = svg_to_png_bytes_threadsafe(path)
-                    img = Image.open(io.BytesIO(png_data)).convert("RGBA")
+                    img = nahled_karty(path)
                     self.svg_cache[path] = img
                 if path != self.loading_path:
                     return
                 self.img = img
-                parser = ET.XMLParser(huge_tree=True)
-                self.tree_xml = ET.parse(path, parser=parser)
+                self.tree_xml = nacti_svg_strom(path)
                 self.root = self.tree_xml.getroot()
                 self.after(0, self.center_display_svg)
                 self.after(0, lambda: self.highlight_active_tree_item(path))
@@ -505,10 +603,12 @@ class SVGEditor(TkinterDnD.Tk):
 
     # ---------------- Inkscape ----------------
     def open_in_inkscape(self):
-        if not hasattr(self, "current_svg_path") or not self.current_svg_path.exists():
+        if getattr(self, "current_svg_path", None) is None or self.current_svg_path not in self.svg_files:
             messagebox.showerror("Chyba", "Žádný SVG soubor k otevření")
             return
         try:
+            if not self.current_svg_path.exists():
+                vybalit_svg(self.current_svg_path)
             subprocess.Popen([str(INKSCAPE_PATH), str(self.current_svg_path)])
         except Exception as e:
             messagebox.showerror("Chyba", f"Nepodařilo se otevřít Inkscape: {e}")
@@ -535,7 +635,9 @@ class SVGEditor(TkinterDnD.Tk):
             with tempfile.TemporaryDirectory() as tmpdir:
                 tmp_path = os.path.join(tmpdir, "image.png")
                 self.original_img.save(tmp_path)
-                replace_image_in_svg(self.tree_xml, tmp_path, (rel_x, rel_y), (rel_w, rel_h))
+                replace_image_in_svg(self.tree_xml, tmp_path, (rel_x, rel_y), (rel_w, rel_h),
+                                     ASSET_DIR, self.current_svg_path.parent)
+            self.current_svg_path.parent.mkdir(parents=True, exist_ok=True)
             self.tree_xml.write(self.current_svg_path)
             self.saved_files.add(self.current_svg_path)
             with open(self.saved_files_path, "w", encoding="utf-8") as f:
@@ -566,11 +668,12 @@ class SVGEditor(TkinterDnD.Tk):
                 path = self.svg_files[idx]
                 if path not in self.svg_cache:
                     try:
-                        if INKSCAPE_LOCK.locked():
-                            time.sleep(0.1)
-                            continue
-                        png_data = svg_to_png_bytes_threadsafe(path)
-                        img = Image.open(io.BytesIO(png_data)).convert("RGBA")
+                        img = nahled_karty(path, vykreslit=False)
+                        if img is None:
+                            if INKSCAPE_LOCK.locked():
+                                time.sleep(0.1)
+                                continue
+                            img = nahled_karty(path)
                         self.svg_cache[path] = img
                     except Exception:
                         pass
@@ -579,6 +682,10 @@ class SVGEditor(TkinterDnD.Tk):
     # ---------------- ukončení ----------------
     def on_close(self):
         self.stop_preloader.set()
+        with INKSCAPE_LOCK:
+            PREVADEC.zavri()
+        if MEZIPAMET.zapnuta:
+            MEZIPAMET.uklid()
         self.destroy()
 
 # ---------------- spustit ----------------
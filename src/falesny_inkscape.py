@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Falešný Inkscape pro benchmark a běh bez grafického prostředí.
+
+Chápe stejné volání jako prevod/editor:
+    falesny_inkscape.py karta.svg --export-type=png --export-filename=karta.png --export-dpi=300
+i režim --shell s akcemi file-open/export-filename/export-dpi/export-do oddělenými ';'.
+SVG přečte, z width/height spočítá rozměr v pixelech a zapíše jednobarevné PNG
+správné velikosti (u výstupu .pdf jednostránkové PDF s obdélníkem a textem).
+Nic nevykresluje, měří se tedy jen režie linky kolem Inkscape.
+"""
+import re
+import sys
+import zlib
+import struct
+
+JEDNOTKY_NA_PALEC = {"mm": 25.4, "cm": 2.54, "in": 1.0, "pt": 72.0, "pc": 6.0, "px": 96.0, "": 96.0}
+DELKA = re.compile(r'\s(width|height)="([0-9.]+)\s*([a-z]*)"')
+
+def rozmer_px(svg_data, dpi):
+    hlavicka = svg_data[:4096].decode("utf-8", "ignore")
+    rozmery = {}
+    for nazev, cislo, jednotka in DELKA.findall(hlavicka):
+        # první výskyt patří kořenovému <svg>, další už vnořeným prvkům
+        rozmery.setdefault(nazev, float(cislo) / JEDNOTKY_NA_PALEC.get(jednotka, 96.0) * dpi)
+    return max(1, round(rozmery.get("width", 100))), max(1, round(rozmery.get("height", 100)))
+
+def png_bytes(sirka, vyska, barva=(255, 255, 255)):
+    def blok(typ, data):
+        return struct.pack(">I", len(data)) + typ + data + struct.pack(">I", zlib.crc32(typ + data))
+    radek = b"\x00" + bytes(barva) * sirka
+    return (b"\x89PNG\r\n\x1a\n"
+            + blok(b"IHDR", struct.pack(">IIBBBBB", sirka, vyska, 8, 2, 0, 0, 0))
+            + blok(b"IDAT", zlib.compress(radek * vyska, 6))
+            + blok(b"IEND", b""))
+
+def pdf_bytes(sirka_pt, vyska_pt, text="Karta"):
+    obsah = (f"0.9 0.9 0.9 rg 0 0 {sirka_pt:.2f} {vyska_pt:.2f} re f "
+             f"BT /F1 12 Tf 10 {vyska_pt - 20:.2f} Td ({text}) Tj ET").encode("ascii")
+    objekty = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {sirka_pt:.2f} {vyska_pt:.2f}] "
+         f"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>").encode("ascii"),
+        b"<< /Length %d >>\nstream\n" % len(obsah) + obsah + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    pozice = []
+    for i, objekt in enumerate(objekty, 1):
+        pozice.append(len(data))
+        data += b"%d 0 obj\n" % i + objekt + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objekty) + 1)
+    data += b"".join(b"%010d 00000 n \n" % p for p in pozice)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objekty) + 1, xref)
+    return data
+
+def argumenty(argv):
+    """(vstup, výstup, dpi) z argumentů ve tvaru --klic=hodnota i --klic hodnota."""
+    vstup, volby = None, {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("--"):
+            if "=" in arg:
+                klic, hodnota = arg[2:].split("=", 1)
+            else:
+                klic, hodnota = arg[2:], argv[i + 1] if i + 1 < len(argv) else ""
+                i += 1
+            volby[klic] = hodnota
+        else:
+            vstup = arg
+        i += 1
+    return vstup, volby.get("export-filename"), float(volby.get("export-dpi", 96))
+
+def exportuj(vstup, vystup, dpi):
+    with open(vstup, "rb") as f:
+        svg_data = f.read()
+    if b"<svg" not in svg_data and b":svg" not in svg_data:
+        raise ValueError(f"Soubor není SVG: {vstup}")
+    with open(vystup, "wb") as f:
+        if str(vystup).lower().endswith(".pdf"):
+            # PDF se měří v bodech (72 na palec) bez ohledu na export-dpi
+            f.write(pdf_bytes(*rozmer_px(svg_data, 72)))
+        else:
+            f.write(png_bytes(*rozmer_px(svg_data, dpi)))
+
+def shell():
+    print("Inkscape interactive shell mode (falešný).")
+    stav = {}
+    while True:
+        sys.stdout.write("> ")
+        sys.stdout.flush()
+        radek = sys.stdin.readline()
+        if not radek or radek.strip() == "quit":
+            return
+        for akce in radek.strip().split(";"):
+            nazev, _, hodnota = akce.strip().partition(":")
+            if nazev == "file-open":
+                stav = {"vstup": hodnota}
+            elif nazev in ("export-filename", "export-dpi", "export-type"):
+                stav[nazev] = hodnota
+            elif nazev == "export-do":
+                try:
+                    exportuj(stav["vstup"], stav["export-filename"], float(stav.get("export-dpi", 96)))
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"export-do: {e}", file=sys.stderr, flush=True)
+
+def main():
+    if "--shell" in sys.argv[1:]:
+        return shell()
+    vstup, vystup, dpi = argumenty(sys.argv[1:])
+    if vstup is None or vystup is None:
+        print("Použití: falesny_inkscape.py karta.svg --export-filename=karta.png [--export-dpi=300]")
+        sys.exit(2)
+    try:
+        exportuj(vstup, vystup, dpi)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+import threading
+from pathlib import Path
+
+# ---------------- Fronta převodu ----------------
+# data/prevod_fronta.json drží stav každé karty běžícího převodu:
+#   {"verze": 1, "nastaveni": {...}, "karty": {rel: {"hash": ..., "stav": "ceka" | "hotovo" | "chyba",
+#                                                   "priorita": 0, "chyba": "..."}}}
+# Průběh se zapisuje už během převodu, takže převod přerušený pádem nebo zavřeným
+# oknem příště pokračuje jen s kartami, které ještě nejsou hotové.
+# Pořadí: vyšší priorita dřív (--prednost, marked_files.json, saved_files.json),
+# uvnitř priority naposledy uložené SVG dřív, pak podle cesty.
+
+VERZE_FRONTY = 1
+STAV_CEKA, STAV_HOTOVO, STAV_CHYBA = "ceka", "hotovo", "chyba"
+PRIORITA_PREDNOST, PRIORITA_OZNACENE, PRIORITA_ULOZENE = 3, 2, 1
+
+def cesta_fronty(project_path):
+    return Path(project_path) / "data" / "prevod_fronta.json"
+
+def _nacti_seznam(json_path, svg_slozka):
+    """Relativní cesty karet ze seznamu editoru (ukládá absolutní cesty SVG)."""
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            cesty = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    vysledek = set()
+    for cesta in cesty:
+        try:
+            vysledek.add(Path(cesta).relative_to(svg_slozka).as_posix())
+        except ValueError:
+            continue  # projekt se mezitím přesunul nebo cesta patří jinam
+    return vysledek
+
+def priority_karet(project_path, svg_slozka, prednost=()):
+    """{rel: priorita} pro karty, které mají jít na řadu dřív."""
+    data_dir = Path(project_path) / "data"
+    priority = {}
+    for rel in _nacti_seznam(data_dir / "saved_files.json", svg_slozka):
+        priority[rel] = PRIORITA_ULOZENE
+    for rel in _nacti_seznam(data_dir / "marked_files.json", svg_slozka):
+        priority[rel] = PRIORITA_OZNACENE
+    for karta in prednost:
+        cesta = Path(karta)
+        if cesta.is_absolute():
+            try:
+                cesta = cesta.relative_to(svg_slozka)
+            except ValueError:
+                continue
+        priority[cesta.with_suffix(".svg").as_posix()] = PRIORITA_PREDNOST
+    return priority
+
+class FrontaPrevodu:
+    """Stav převodu na disku; oznac() je bezpečné volat z více vláken."""
+
+    def __init__(self, json_path, nastaveni, interval=1.0):
+        self.json_path = Path(json_path)
+        self.nastaveni = nastaveni
+        self.interval = interval
+        self.karty = {}
+        self._zamek = threading.Lock()
+        self._ulozeno = time.monotonic()
+        self._nacti()
+
+    def _nacti(self):
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # jiné nastavení exportu = rozpracovaný převod už neplatí
+        if data.get("verze") == VERZE_FRONTY and data.get("nastaveni") == self.nastaveni:
+            self.karty = data.get("karty", {})
+
+    def hotove(self, hashe):
+        """{rel: hash} karet hotových v minulém běhu, jejichž SVG se od té doby nezměnilo."""
+        return {rel: zaznam["hash"] for rel, zaznam in self.karty.items()
+                if zaznam.get("stav") == STAV_HOTOVO and hashe.get(rel) == zaznam.get("hash")}
+
+    def naplanuj(self, ulohy, priority, cas_zmeny=None):
+        """
+        ulohy = [(rel, zdroj, hash)] k převodu; vrátí je seřazené podle priority.
+        cas_zmeny(rel, zdroj) řadí karty stejné priority od naposledy změněných.
+        """
+        def klic(uloha):
+            rel, zdroj, _ = uloha
+            priorita = priority.get(rel, 0)
+            cas = cas_zmeny(rel, zdroj) if priorita and cas_zmeny else 0
+            return -priorita, -cas, rel
+        ulohy = sorted(ulohy, key=klic)
+        with self._zamek:
+            for rel, _, hash_svg in ulohy:
+                predchozi = self.karty.get(rel, {})
+                self.karty[rel] = {"hash": hash_svg, "stav": STAV_CEKA, "priorita": priority.get(rel, 0)}
+                if predchozi.get("stav") == STAV_CHYBA and predchozi.get("hash") == hash_svg:
+                    self.karty[rel]["chyba"] = predchozi.get("chyba", "")
+        self.uloz()
+        return ulohy
+
+    def oznac(self, rel, ok, chyba=None):
+        with self._zamek:
+            zaznam = self.karty.setdefault(rel, {"hash": None, "priorita": 0})
+            zaznam["stav"] = STAV_HOTOVO if ok else STAV_CHYBA
+            if ok:
+                zaznam.pop("chyba", None)
+            else:
+                zaznam["chyba"] = chyba or ""
+            ulozit = time.monotonic() - self._ulozeno >= self.interval
+        if ulozit:
+            self.uloz()
+
+    def dokonci(self, zbyvajici):
+        """Po celém běhu zůstanou ve frontě jen karty z 'zbyvajici' (chyby, nedokončené)."""
+        with self._zamek:
+            self.karty = {rel: zaznam for rel, zaznam in self.karty.items() if rel in zbyvajici}
+        self.uloz()
+
+    def uloz(self):
+        with self._zamek:
+            data = {"verze": VERZE_FRONTY, "nastaveni": self.nastaveni, "karty": dict(self.karty)}
+            self._ulozeno = time.monotonic()
+            docasny = self.json_path.with_name(self.json_path.name + ".tmp")
+            with open(docasny, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            docasny.replace(self.json_path)
@@ -4,8 +4,17 @@ from pathlib import Path
 import xml.etree.ElementTree as ET
 import unicodedata
 import re
+import os
 import sys
 import json
+import hashlib
+import zipfile
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from sablona import Sablona
+import assety
+import balik
+from tabulka import nacti_excel, hash_souboru
 
 # ---------------- Funkce ----------------
 
@@ -15,145 +24,372 @@ def odstranit_diakritiku(text):
         if not unicodedata.combining(c)
     )
 
-def set_display(elem, value):
-    styl = elem.get("style", "")
-    novy_styl = ";".join(
-        s for s in styl.split(";") if not s.strip().startswith("display:")
-    )
-    elem.set("style", (novy_styl + f";display:{value}").strip(";"))
-
-def najdi_g(root, name, namespaces):
-    for attr in ["id", "inkscape:label", "sodipodi:label", "label"]:
-        elem = root.find(f".//svg:g[@{attr}='{name}']", namespaces)
-        if elem is not None:
-            return elem
-    return None
+def format_hodnota(hodnota):
+    if pd.isna(hodnota):
+        return ""
+    if isinstance(hodnota, float) and hodnota.is_integer():
+        hodnota = int(hodnota)
+    return str(hodnota)
 
-# ---------------- Cesta k projektu ----------------
-if len(sys.argv) < 2:
-    print("Nebyla předána cesta k projektu.")
-    sys.exit(1)
-
-project_path = Path(sys.argv[1])
-data_dir = project_path / "data"
-output_dir = project_path / "vystup"
-output_dir.mkdir(exist_ok=True)
-
-# ---------------- Výstupní složka pro SVG ----------------
-vystup_svg_dir = output_dir / "vystup_svg"
-vystup_svg_dir.mkdir(exist_ok=True)
-
-config_path = project_path / "config.json"
-if not config_path.exists():
-    print(f"Chybí config soubor: {config_path}")
-    sys.exit(1)
-
-with open(config_path, "r", encoding="utf-8") as f:
-    config = json.load(f)
-
-excel_file = data_dir / config["zdroje"].get("excel", "")
-sablona_file = data_dir / config["zdroje"].get("sablona", "")
-
-if not excel_file.exists():
-    print(f"Excel soubor nenalezen: {excel_file}")
-    sys.exit(1)
-
-if not sablona_file.exists():
-    print(f"Šablona nenalezena: {sablona_file}")
-    sys.exit(1)
-
-# ---------------- Načtení dat z Excelu ----------------
-try:
-    df = pd.read_excel(excel_file)
-except Exception as e:
-    print(f"Chyba při načítání Excelu: {e}")
-    sys.exit(1)
-
-# ---------------- SVG nastavení ----------------
-namespaces = {
-    'svg': 'http://www.w3.org/2000/svg',
-    'inkscape': 'http://www.inkscape.org/namespaces/inkscape',
-    'sodipodi': 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd'
-}
-
-# ---------------- Zpracování karet ----------------
-for index, row in df.iterrows():
+def chyba_radku(index, row):
     if "Vzacnost" not in row or pd.isna(row["Vzacnost"]):
-        print(f"Karta na řádku {index+2} nemá vyplněnou vzácnost.")
-        continue
+        return f"Karta na řádku {index+2} nemá vyplněnou vzácnost."
     if "Nazev" not in row or pd.isna(row["Nazev"]):
-        print(f"Karta na řádku {index+2} nemá vyplněný název.")
-        continue
+        return f"Karta na řádku {index+2} nemá vyplněný název."
     if "Kategorie" not in row or pd.isna(row["Kategorie"]):
-        print(f"Karta na řádku {index+2} nemá vyplněnou kategorii.")
-        continue
+        return f"Karta na řádku {index+2} nemá vyplněnou kategorii."
+    return None
 
-    # Načti šablonu
-    try:
-        tree = ET.parse(sablona_file)
-        root = tree.getroot()
-    except ET.ParseError as e:
-        print(f"Chyba při načítání šablony {sablona_file}: {e}")
-        continue
-
-    # Nahrazení placeholderů podle názvů sloupců
-    svg_text = ET.tostring(root, encoding="unicode")
-    for col in df.columns:
-        hodnota = row[col]
-        if pd.isna(hodnota):
-            hodnota = ""
-        elif isinstance(hodnota, float) and hodnota.is_integer():
-            hodnota = int(hodnota)
-        hodnota = str(hodnota)
-
-        svg_text = re.sub(rf">\s*{re.escape(col)}\s*<", f">{hodnota}<", svg_text)
-
-    root = ET.fromstring(svg_text)
-
-    # --- Kategorie ---
-    kategorie_root = najdi_g(root, "Kategorie", namespaces)
-    if kategorie_root is not None:
-        aktualni_kategorie = str(row["Kategorie"]).strip()
-        for podskupina in kategorie_root.findall(".//svg:g", namespaces):
-            set_display(podskupina, "none")
-        cilova = najdi_g(kategorie_root, aktualni_kategorie, namespaces)
-        if cilova is not None:
-            set_display(cilova, "inline")
-            for vnoreny in cilova.findall(".//svg:g", namespaces):
-                set_display(vnoreny, "inline")
-        else:
-            print(f"Kategorie '{aktualni_kategorie}' nebyla nalezena v šabloně")
+def vystupni_soubor(row, vystup_svg_dir):
+    aktualni_kategorie = str(row["Kategorie"]).strip()
+    nazev_karty = odstranit_diakritiku(row["Nazev"]).strip().replace(" ", "_")
+    nazev_karty = re.sub(r'[^A-Za-z0-9_-]', '_', nazev_karty)
+    return vystup_svg_dir / aktualni_kategorie / f"{nazev_karty}.svg"
 
-    # --- Vzácnost ---
-    vzacnost_skupiny = []
-    for attr in ["id", "inkscape:label", "sodipodi:label", "label"]:
-        vzacnost_skupiny.extend(root.findall(f".//svg:g[@{attr}='Vzacnost']", namespaces))
+def hodnoty_radku(row, columns):
+    return {str(col): format_hodnota(row[col]) for col in columns}
 
-    aktualni_vzacnost = odstranit_diakritiku(row["Vzacnost"]).lower().strip()
-    for vzacnost_root in vzacnost_skupiny:
-        for podskupina in vzacnost_root.findall(".//svg:g", namespaces):
-            set_display(podskupina, "none")
-        cilova = najdi_g(vzacnost_root, aktualni_vzacnost, namespaces)
-        if cilova is not None:
-            set_display(cilova, "inline")
-        else:
-            print(f"Vzacnost '{aktualni_vzacnost}' nebyla nalezena v šabloně")
+def info_karty(row):
+    """Záznam karty do manifestu balíku."""
+    pocet = row.get("Pocet", 1)
+    return {
+        "nazev": format_hodnota(row["Nazev"]),
+        "kategorie": str(row["Kategorie"]).strip(),
+        "vzacnost": format_hodnota(row["Vzacnost"]),
+        "pocet": 1 if pd.isna(pocet) else int(pocet),
+    }
 
-    # ---------------- Uložení výstupu do podsložky podle kategorie ----------------
+def zpracuj_kartu(sablona, index, row, columns, vystup_svg_dir, do_baliku=False):
+    """
+    Vygeneruje SVG jedné karty a vrátí (seznam hlášek pro konzoli, data SVG pro balík).
+    Hlášky se nevypisují přímo, aby je paralelní běh mohl vypsat v pořadí řádků.
+    Bez balíku se karta zapíše rovnou do vystup_svg a data jsou None.
+    """
+    hlasky = []
+    chyba = chyba_radku(index, row)
+    if chyba:
+        return [chyba], None
+
+    # Kopie předem načtené šablony s nahrazenými placeholdery podle názvů sloupců
+    # a přepnutými vrstvami Kategorie / Vzacnost
+    hodnoty = hodnoty_radku(row, columns)
     aktualni_kategorie = str(row["Kategorie"]).strip()
-    cilova_slozka = vystup_svg_dir / aktualni_kategorie
-    cilova_slozka.mkdir(exist_ok=True)
+    aktualni_vzacnost = odstranit_diakritiku(row["Vzacnost"]).lower().strip()
+    root, nenalezene = sablona.nova_karta(hodnoty, aktualni_kategorie, aktualni_vzacnost)
+    for skupina, nazev in nenalezene:
+        hlasky.append(f"{skupina} '{nazev}' nebyla nalezena v šabloně")
 
-    nazev_karty = odstranit_diakritiku(row["Nazev"]).strip().replace(" ", "_")
-    nazev_karty = re.sub(r'[^A-Za-z0-9_-]', '_', nazev_karty)
-    vystup_soubor = cilova_slozka / f"{nazev_karty}.svg"
+    # ---------------- Uložení výstupu do podsložky podle kategorie ----------------
+    vystup_soubor = vystupni_soubor(row, vystup_svg_dir)
+    if do_baliku:
+        return hlasky, ET.tostring(root, encoding="utf-8", xml_declaration=True, method="xml")
 
+    vystup_soubor.parent.mkdir(exist_ok=True)
     try:
         tree = ET.ElementTree(root)
         tree.write(vystup_soubor, encoding="utf-8", xml_declaration=True, method="xml")
     except Exception as e:
-        print(f"Chyba při ukládání souboru {vystup_soubor}: {e}")
-        continue
+        hlasky.append(f"Chyba při ukládání souboru {vystup_soubor}: {e}")
+
+    return hlasky, None
+
+# ---------------- Kontrola bez generování (--check) ----------------
+POVINNE_SLOUPCE = ["Vzacnost", "Nazev", "Kategorie"]
+
+def _cisla_radku(index, limit=10):
+    cisla = [str(i + 2) for i in index[:limit]]
+    if len(index) > limit:
+        cisla.append(f"… (celkem {len(index)})")
+    return ", ".join(cisla)
+
+def kontrola(df, sablona):
+    """
+    Ověří celou tabulku proti šabloně po sloupcích, bez zápisu karet.
+    Vrací (chyby, upozornění) jako seznamy hlášek.
+    """
+    chyby, upozorneni = [], []
+
+    # --- povinné sloupce a hodnoty ---
+    for col in POVINNE_SLOUPCE:
+        if col not in df.columns:
+            chyby.append(f"V Excelu chybí sloupec '{col}'.")
+    if chyby:
+        return chyby, upozorneni
+
+    prazdne = df[POVINNE_SLOUPCE].isna()
+    for col in POVINNE_SLOUPCE:
+        if prazdne[col].any():
+            chyby.append(f"Prázdný sloupec '{col}' na řádcích: {_cisla_radku(df.index[prazdne[col]])}")
+    platne = df[~prazdne.any(axis=1)]
+
+    kategorie = platne["Kategorie"].astype(str).str.strip()
+    # astype(str): bez platných řádků je výsledek map prázdná řada typu float a .str by selhalo
+    vzacnost = platne["Vzacnost"].map(odstranit_diakritiku).astype(str).str.lower().str.strip()
+
+    # --- vrstvy v šabloně ---
+    if sablona.kategorie is not None:
+        for nazev, skupina in kategorie[~kategorie.isin(list(sablona.kategorie[1]))].groupby(kategorie):
+            chyby.append(f"Kategorie '{nazev}' nebyla nalezena v šabloně (řádky: {_cisla_radku(skupina.index)})")
+    else:
+        upozorneni.append("Šablona nemá skupinu 'Kategorie'.")
+
+    if not sablona.vzacnosti:
+        upozorneni.append("Šablona nemá skupinu 'Vzacnost'.")
+    chybi_vzacnost = pd.Series(False, index=vzacnost.index)
+    for _, cile in sablona.vzacnosti:
+        chybi_vzacnost |= ~vzacnost.isin(list(cile))
+    for nazev, skupina in vzacnost[chybi_vzacnost].groupby(vzacnost):
+        chyby.append(f"Vzacnost '{nazev}' nebyla nalezena v šabloně (řádky: {_cisla_radku(skupina.index)})")
+
+    # --- sloupce, které se v šabloně nikde nepoužijí ---
+    nepouzite = [str(col) for col in df.columns if str(col) not in sablona.placeholdery]
+    if nepouzite:
+        upozorneni.append(f"Sloupce bez placeholderu v šabloně: {', '.join(nepouzite)}")
+
+    # --- kolize výstupních souborů (stejná kategorie + stejný název po úpravě) ---
+    nazev_karty = (platne["Nazev"].map(odstranit_diakritiku).astype(str).str.strip()
+                   .str.replace(" ", "_", regex=False)
+                   .str.replace(r'[^A-Za-z0-9_-]', '_', regex=True))
+    soubor = kategorie + "/" + nazev_karty + ".svg"
+    for nazev, skupina in soubor[soubor.duplicated(keep=False)].groupby(soubor):
+        chyby.append(f"Více karet se uloží do stejného souboru {nazev} (řádky: {_cisla_radku(skupina.index)})")
+
+    return chyby, upozorneni
+
+# ---------------- Manifest sestavení ----------------
+# data/generator_manifest.json: hash šablony a nastavení + hash hodnot každého řádku podle výstupního souboru.
+# Karty, jejichž řádek ani šablona se nezměnily, se při dalším běhu přeskočí.
+VERZE_MANIFESTU = 2
+
+def hash_radku(hodnoty):
+    data = json.dumps(hodnoty, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def nacti_manifest(manifest_path, nastaveni):
+    """Vrátí záznamy karet z manifestu; při změně šablony, nastavení nebo verze prázdný slovník."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception:
+        return {}
+    if manifest.get("verze") != VERZE_MANIFESTU or manifest.get("nastaveni") != nastaveni:
+        return {}
+    return manifest.get("karty", {})
+
+def uloz_manifest(manifest_path, nastaveni, karty):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"verze": VERZE_MANIFESTU, "nastaveni": nastaveni, "karty": karty},
+                  f, ensure_ascii=False, indent=2)
+
+# ---------------- Paralelní zpracování ----------------
+# Každý proces si šablonu načte jednou v inicializátoru, mezi procesy se posílají jen řádky.
+_sablona_procesu = None
+_columns_procesu = None
+_vystup_procesu = None
+_do_baliku_procesu = False
+
+def _init_procesu(sablona_file, asset_dir, columns, vystup_svg_dir, do_baliku):
+    global _sablona_procesu, _columns_procesu, _vystup_procesu, _do_baliku_procesu
+    _sablona_procesu = nacti_sablonu(sablona_file, asset_dir, vystup_svg_dir)
+    _columns_procesu = columns
+    _vystup_procesu = vystup_svg_dir
+    _do_baliku_procesu = do_baliku
+
+def _zpracuj_v_procesu(polozka):
+    index, row = polozka
+    return zpracuj_kartu(_sablona_procesu, index, row, _columns_procesu, _vystup_procesu,
+                         _do_baliku_procesu)
+
+def nacti_sablonu(sablona_file, asset_dir, vystup_svg_dir):
+    # karty leží ve vystup_svg/<Kategorie>/, odkazy na obrázky jsou relativní k této hloubce
+    return Sablona(sablona_file, asset_dir, vystup_svg_dir / "Kategorie")
+
+def pocet_procesu(config):
+    """generator.procesy v config.json: 1 = sériově (výchozí), 0 = všechna jádra."""
+    try:
+        procesy = int(config.get("generator", {}).get("procesy", 1))
+    except (TypeError, ValueError):
+        procesy = 1
+    if procesy <= 0:
+        procesy = os.cpu_count() or 1
+    return procesy
+
+# ---------------- Hlavní běh ----------------
+def main():
+    # ---------------- Cesta k projektu ----------------
+    if len(sys.argv) < 2:
+        print("Nebyla předána cesta k projektu.")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    data_dir = project_path / "data"
+    output_dir = project_path / "vystup"
+    vystup_svg_dir = output_dir / "vystup_svg"
+    jen_kontrola = "--check" in sys.argv[2:]
+
+    config_path = project_path / "config.json"
+    if not config_path.exists():
+        print(f"Chybí config soubor: {config_path}")
+        sys.exit(1)
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    excel_file = data_dir / config["zdroje"].get("excel", "")
+    sablona_file = data_dir / config["zdroje"].get("sablona", "")
+
+    if not excel_file.exists():
+        print(f"Excel soubor nenalezen: {excel_file}")
+        sys.exit(1)
+
+    if not sablona_file.exists():
+        print(f"Šablona nenalezena: {sablona_file}")
+        sys.exit(1)
+
+    # ---------------- Načtení dat z Excelu ----------------
+    try:
+        df = nacti_excel(excel_file)
+    except Exception as e:
+        print(f"Chyba při načítání Excelu: {e}")
+        sys.exit(1)
+
+    # ---------------- Kontrola (nic se nezapisuje) ----------------
+    if jen_kontrola:
+        try:
+            sablona = Sablona(sablona_file)
+        except ET.ParseError as e:
+            print(f"Chyba při načítání šablony {sablona_file}: {e}")
+            sys.exit(1)
+        chyby, upozorneni = kontrola(df, sablona)
+        for hlaska in upozorneni:
+            print(f"Upozornění: {hlaska}")
+        for hlaska in chyby:
+            print(f"Chyba: {hlaska}")
+        print(f"Kontrola {len(df)} řádků: {len(chyby)} chyb, {len(upozorneni)} upozornění.")
+        sys.exit(1 if chyby else 0)
+
+    # ---------------- Výstupní složka pro SVG ----------------
+    output_dir.mkdir(exist_ok=True)
+    vystup_svg_dir.mkdir(exist_ok=True)
+
+    # ---------------- Načtení šablony (jednou za běh) ----------------
+    asset_dir = assety.asset_dir_projektu(project_path) if assety.pouzit_assety(config) else None
+    try:
+        sablona = nacti_sablonu(sablona_file, asset_dir, vystup_svg_dir)
+    except ET.ParseError as e:
+        print(f"Chyba při načítání šablony {sablona_file}: {e}")
+        sys.exit(1)
+
+    # ---------------- Výběr změněných karet ----------------
+    columns = list(df.columns)
+    vsechny_radky = list(zip(df.index, df.to_dict("records")))
+
+    # generator.vystup = "zip": všechny karty do jednoho balíku místo souborů ve vystup_svg
+    do_baliku = balik.pouzit_balik(config)
+    balik_path = balik.cesta_baliku(project_path)
+    stary_obsah = balik.nacti_obsah(balik_path) if do_baliku else {}
+
+    def existuje(klic):
+        return klic in stary_obsah if do_baliku else (vystup_svg_dir / klic).exists()
+
+    manifest_path = data_dir / "generator_manifest.json"
+    nastaveni = {"sablona": hash_souboru(sablona_file), "assety": asset_dir is not None,
+                 "vystup": "zip" if do_baliku else "svg"}
+    puvodni_karty = {} if "--vse" in sys.argv[2:] else nacti_manifest(manifest_path, nastaveni)
+    karty = {}
+    info = {}
+    radky = []
+    nezmenene = []
+    # více řádků do jednoho souboru: rozhoduje se za soubor a platí poslední řádek;
+    # hlášky o přeskočených řádcích se vypíšou v pořadí řádků spolu se zpracováním
+    posledni = {}
+    prepsane = []
+    for index, row in vsechny_radky:
+        if not chyba_radku(index, row):
+            posledni[vystupni_soubor(row, vystup_svg_dir)] = index
+    for index, row in vsechny_radky:
+        if chyba_radku(index, row):
+            radky.append((index, row))  # hlášku o chybějící hodnotě vypíše zpracování
+            continue
+        vystup_soubor = vystupni_soubor(row, vystup_svg_dir)
+        klic = vystup_soubor.relative_to(vystup_svg_dir).as_posix()
+        if posledni[vystup_soubor] != index:
+            prepsane.append((index, f"Karta na řádku {index+2} se přeskočí, "
+                                    f"do {klic} se uloží řádek {posledni[vystup_soubor]+2}."))
+            continue
+        karty[klic] = hash_radku(hodnoty_radku(row, columns))
+        info[klic] = info_karty(row)
+        if puvodni_karty.get(klic) == karty[klic] and existuje(klic):
+            nezmenene.append(klic)
+            continue
+        radky.append((index, row))
+
+    if nezmenene:
+        print(f"Přeskočeno {len(nezmenene)} nezměněných karet.")
+
+    # ---------------- Zpracování karet ----------------
+    procesy = min(pocet_procesu(config), max(1, len(radky)))
+    mazat = bool(config.get("generator", {}).get("mazat_smazane", False))
+
+    with ExitStack() as stack:
+        if procesy == 1:
+            vysledky = (zpracuj_kartu(sablona, index, row, columns, vystup_svg_dir, do_baliku)
+                        for index, row in radky)
+        else:
+            print(f"Generuji {len(radky)} karet v {procesy} procesech.")
+            chunksize = max(1, len(radky) // (procesy * 4))
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=procesy,
+                initializer=_init_procesu,
+                initargs=(sablona_file, asset_dir, columns, vystup_svg_dir, do_baliku),
+            ))
+            # map vrací výsledky v pořadí řádků, hlášky tak zůstanou seřazené
+            vysledky = executor.map(_zpracuj_v_procesu, radky, chunksize=chunksize)
+
+        zapis = stary_zip = None
+        if do_baliku:
+            zapis = stack.enter_context(balik.ZapisBaliku(balik_path))
+            if stary_obsah:
+                stary_zip = stack.enter_context(zipfile.ZipFile(balik_path))
+            for klic in nezmenene:
+                zapis.zkopiruj(stary_zip, klic, info[klic])
+
+        prepsane.reverse()
+        for (index, row), (hlasky, data) in zip(radky, vysledky):
+            while prepsane and prepsane[-1][0] < index:
+                print(prepsane.pop()[1])
+            for hlaska in hlasky:
+                print(hlaska)
+            if data is not None:
+                klic = vystupni_soubor(row, vystup_svg_dir).relative_to(vystup_svg_dir).as_posix()
+                zapis.pridej(klic, data, info[klic])
+                # volné SVG by v převodu zastínilo novou položku balíku (např. po přepnutí ze svg)
+                (vystup_svg_dir / klic).unlink(missing_ok=True)
+
+        while prepsane:
+            print(prepsane.pop()[1])
+
+        # ---------------- Karty, jejichž řádek z Excelu zmizel ----------------
+        for klic in sorted(set(puvodni_karty) - set(karty)):
+            if not existuje(klic):
+                continue
+            if mazat:
+                (vystup_svg_dir / klic).unlink(missing_ok=True)
+                print(f"Smazána karta bez řádku v Excelu: {klic}")
+            else:
+                karty[klic] = puvodni_karty[klic]  # zůstává v manifestu, dokud se nesmaže
+                if do_baliku:
+                    stara_info = {k: v for k, v in stary_obsah[klic].items()
+                                  if k not in ("soubor", "offset", "velikost")}
+                    zapis.zkopiruj(stary_zip, klic, stara_info)
+                print(f"Karta už nemá řádek v Excelu: {klic}")
 
-print("Hotovo!")
+    uloz_manifest(manifest_path, nastaveni, karty)
+    if do_baliku:
+        print(f"Balík karet uložen: {balik_path}")
+    print("Hotovo!")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+import math
+import re
+
+# ---------------- Rozměry karet a archu ----------------
+# Karta: generator.rozměr_karty platí pro celý balík, sloupec "Rozmer" v Excelu pro
+# jednotlivé karty (balík tak může míchat tarot, mini a běžné karty). Zápis "63x88mm",
+# "2.5x3.5in", "70x120" (bez jednotky v mm) nebo název formátu z FORMATY_KARET.
+# Arch: tisk.arch ("A4", "A3", "SRA3", "Letter" nebo "320x450mm"), okraj tisk.okraj_mm,
+# mezera mezi kartami tisk.mezera_mm; tisk.otaceni povolí kartu otočit o 90°, pokud
+# se tím ušetří archy.
+
+BODU_NA_MM = 72 / 25.4
+JEDNOTKY = {"mm": 1.0, "cm": 10.0, "in": 25.4, "pt": 25.4 / 72}
+FORMATY_KARET = {
+    "standard": (63.5, 88.9),
+    "bridge": (57.2, 88.9),
+    "euro": (59, 92),
+    "mini": (41, 63),
+    "tarot": (70, 120),
+}
+FORMATY_ARCHU = {"a4": (210, 297), "a3": (297, 420), "sra3": (320, 450), "letter": (215.9, 279.4)}
+VYCHOZI_KARTA = "standard"
+# Výchozí hodnota, kterou starší verze zapisovaly do každého config.json a tisk ji
+# nečetl (karty vždy 63.5x88.9 mm); doslovně by karty bez vědomí uživatele zmenšila.
+STARA_VYCHOZI_KARTA = "63x88mm"
+VYCHOZI_ARCH = "a4"
+VYCHOZI_OKRAJ_MM = 7
+VYCHOZI_MEZERA_MM = 2
+PRESNOST = 1e-6
+
+def rozmer_mm(text, formaty):
+    """(šířka, výška) v mm z "63x88mm" nebo názvu formátu; None, když text nedává smysl."""
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return None
+    text = str(text).strip().lower().replace(",", ".")
+    if text in formaty:
+        return formaty[text]
+    shoda = re.fullmatch(r"([\d.]+)\s*[x×*]\s*([\d.]+)\s*(mm|cm|in|pt)?", text)
+    if not shoda:
+        return None
+    try:
+        sirka, vyska = float(shoda.group(1)), float(shoda.group(2))
+    except ValueError:
+        return None
+    if sirka <= 0 or vyska <= 0:
+        return None
+    jednotka = JEDNOTKY[shoda.group(3) or "mm"]
+    return sirka * jednotka, vyska * jednotka
+
+class Rozvrzeni:
+    """Rozměry archu, okraj, mezera a výchozí karta z config.json, vše v bodech."""
+
+    def __init__(self, config=None):
+        config = config or {}
+        tisk = config.get("tisk", {})
+        karta = config.get("generator", {}).get("rozměr_karty")
+        if isinstance(karta, str) and karta.strip().lower() == STARA_VYCHOZI_KARTA:
+            karta = VYCHOZI_KARTA
+        self.karta = self._rozmer(karta, FORMATY_KARET,
+                                  FORMATY_KARET[VYCHOZI_KARTA], "generator.rozměr_karty")
+        self.sirka, self.vyska = self._rozmer(tisk.get("arch", VYCHOZI_ARCH), FORMATY_ARCHU,
+                                              FORMATY_ARCHU[VYCHOZI_ARCH], "tisk.arch")
+        self.okraj = float(tisk.get("okraj_mm", VYCHOZI_OKRAJ_MM)) * BODU_NA_MM
+        self.mezera = float(tisk.get("mezera_mm", VYCHOZI_MEZERA_MM)) * BODU_NA_MM
+        self.otaceni = bool(tisk.get("otaceni", False))
+
+    @staticmethod
+    def _rozmer(text, formaty, vychozi, nazev):
+        rozmer = rozmer_mm(text, formaty)
+        if rozmer is None:
+            if text is not None:
+                print(f"⚠️ Neplatný rozměr {nazev} '{text}', použiji {vychozi[0]}x{vychozi[1]}mm.")
+            rozmer = vychozi
+        return rozmer[0] * BODU_NA_MM, rozmer[1] * BODU_NA_MM
+
+    def rozmer_karty(self, text):
+        """Rozměr karty ze sloupce "Rozmer"; prázdná buňka nebo nesmysl = výchozí karta balíku."""
+        rozmer = rozmer_mm(text, FORMATY_KARET)
+        if rozmer is None:
+            if isinstance(text, str) and text.strip():
+                print(f"⚠️ Neplatný rozměr karty '{text}', použiji výchozí.")
+            return self.karta
+        return rozmer[0] * BODU_NA_MM, rozmer[1] * BODU_NA_MM
+
+    def popis(self):
+        return (f"arch {self.sirka / BODU_NA_MM:.0f}x{self.vyska / BODU_NA_MM:.0f} mm, "
+                f"karta {self.karta[0] / BODU_NA_MM:g}x{self.karta[1] / BODU_NA_MM:g} mm"
+                f"{', s otáčením' if self.otaceni else ''}")
+
+# ---------------- Umístění karty ----------------
+class Umisteni:
+    """
+    Karta na archu: levý dolní roh x, y v bodech, rozměr karty sirka x vyska (bez
+    otočení) a otoceni 0, 90 (proti směru hodinových ručiček) nebo -90 stupňů.
+    """
+
+    def __init__(self, x, y, sirka, vyska, otoceni=0):
+        self.x, self.y = x, y
+        self.sirka, self.vyska = sirka, vyska
+        self.otoceni = otoceni
+
+    @property
+    def stopa(self):
+        """Rozměr, který karta na archu zabírá."""
+        return (self.vyska, self.sirka) if self.otoceni else (self.sirka, self.vyska)
+
+    def zrcadlit(self, sirka_archu):
+        """
+        Místo rubu téže karty při oboustranném tisku přes dlouhou (svislou) hranu:
+        zrcadlově podle svislé osy archu, otočená karta se na rubu otáčí opačně.
+        """
+        return Umisteni(sirka_archu - self.x - self.stopa[0], self.y, self.sirka, self.vyska, -self.otoceni)
+
+    def matice(self, box):
+        """Matice PDF (a b c d e f), která obsah s rámečkem box vloží do karty jako
+        drawImage s preserveAspectRatio a anchor="sw", případně otočený."""
+        x0, y0, x1, y1 = box
+        s = min(self.sirka / (x1 - x0), self.vyska / (y1 - y0))
+        if self.otoceni == 90:
+            return 0, s, -s, 0, self.x + self.vyska + s * y0, self.y - s * x0
+        if self.otoceni == -90:
+            return 0, -s, s, 0, self.x - s * y0, self.y + self.sirka + s * x0
+        return s, 0, 0, s, self.x - s * x0, self.y - s * y0
+
+# ---------------- Skládání na archy ----------------
+# MaxRects: arch drží seznam největších volných obdélníků; karta jde do toho, který
+# podle heuristiky sedí nejlépe, a volné obdélníky se podle ní rozřežou. Souřadnice
+# uvnitř jsou od levého horního rohu tiskové plochy, každá karta je zvětšená o mezeru.
+# "zleva" (bottom-left) skládá stejné karty do řádků zleva doprava shora dolů, jako
+# dřívější pevná mřížka; "kratsi_strana" (best short side fit) bývá lepší pro směs
+# rozměrů. rozlozit() zkusí obě (s otáčením i bez) a nechá rozvržení s nejméně archy.
+
+def _skore_zleva(x, y, w, h, volny):
+    return y + h, x
+
+def _skore_kratsi_strana(x, y, w, h, volny):
+    zbytek_w, zbytek_h = volny[2] - w, volny[3] - h
+    return min(zbytek_w, zbytek_h), max(zbytek_w, zbytek_h)
+
+HEURISTIKY = {"zleva": _skore_zleva, "kratsi_strana": _skore_kratsi_strana}
+
+class Arch:
+    """Jeden arch při skládání; umisti() vrátí Umisteni nebo None, když se karta nevejde.
+    karty = [(Umisteni, data)] zapisuje volající."""
+
+    def __init__(self, rozvrzeni):
+        self.rozvrzeni = rozvrzeni
+        mezera = rozvrzeni.mezera
+        # mezera se přičte ke každé kartě, proto je plocha o jednu mezeru větší
+        self.volne = [(0.0, 0.0, rozvrzeni.sirka - 2 * rozvrzeni.okraj + mezera,
+                       rozvrzeni.vyska - 2 * rozvrzeni.okraj + mezera)]
+        self.karty = []
+
+    def _nejlepsi(self, w, h, skore):
+        nejlepsi = None
+        for volny in self.volne:
+            if w <= volny[2] + PRESNOST and h <= volny[3] + PRESNOST:
+                kandidat = skore(volny[0], volny[1], w, h, volny)
+                if nejlepsi is None or kandidat < nejlepsi[0]:
+                    nejlepsi = (kandidat, volny[0], volny[1])
+        return nejlepsi
+
+    def vejde_se(self, sirka, vyska, otaceni):
+        mezera = self.rozvrzeni.mezera
+        return (self._nejlepsi(sirka + mezera, vyska + mezera, _skore_zleva) is not None
+                or otaceni and self._nejlepsi(vyska + mezera, sirka + mezera, _skore_zleva) is not None)
+
+    def umisti(self, sirka, vyska, otaceni=False, heuristika="zleva"):
+        skore = HEURISTIKY[heuristika]
+        mezera = self.rozvrzeni.mezera
+        moznosti = [(self._nejlepsi(sirka + mezera, vyska + mezera, skore), 0)]
+        if otaceni and abs(sirka - vyska) > PRESNOST:
+            moznosti.append((self._nejlepsi(vyska + mezera, sirka + mezera, skore), 90))
+        moznosti = [(nejlepsi, otoceni) for nejlepsi, otoceni in moznosti if nejlepsi is not None]
+        if not moznosti:
+            return None
+        (_, x, y), otoceni = min(moznosti, key=lambda m: m[0][0])
+        w, h = (vyska, sirka) if otoceni else (sirka, vyska)
+        self._obsad(x, y, w + mezera, h + mezera)
+        rozvrzeni = self.rozvrzeni
+        return Umisteni(rozvrzeni.okraj + x, rozvrzeni.vyska - rozvrzeni.okraj - y - h, sirka, vyska, otoceni)
+
+    def _obsad(self, x, y, w, h):
+        nove = []
+        for volny in self.volne:
+            vx, vy, vw, vh = volny
+            if x >= vx + vw - PRESNOST or x + w <= vx + PRESNOST or y >= vy + vh - PRESNOST or y + h <= vy + PRESNOST:
+                nove.append(volny)
+                continue
+            if x > vx + PRESNOST:
+                nove.append((vx, vy, x - vx, vh))
+            if x + w < vx + vw - PRESNOST:
+                nove.append((x + w, vy, vx + vw - x - w, vh))
+            if y > vy + PRESNOST:
+                nove.append((vx, vy, vw, y - vy))
+            if y + h < vy + vh - PRESNOST:
+                nove.append((vx, y + h, vw, vy + vh - y - h))
+        # obdélníky ležící celé uvnitř jiného nic nepřidávají
+        self.volne = [a for i, a in enumerate(nove)
+                      if not any(i != j and _uvnitr(a, b) and (a != b or j < i) for j, b in enumerate(nove))]
+
+def _uvnitr(a, b):
+    return (a[0] >= b[0] - PRESNOST and a[1] >= b[1] - PRESNOST
+            and a[0] + a[2] <= b[0] + b[2] + PRESNOST and a[1] + a[3] <= b[1] + b[3] + PRESNOST)
+
+def _sloz(karty, rozvrzeni, otaceni, heuristika):
+    """[[(Umisteni, data)]] po archech; karty, které se nevejdou ani na prázdný arch, vynechá."""
+    zbyva = {}
+    for sirka, vyska, _ in karty:
+        zbyva[(sirka, vyska)] = zbyva.get((sirka, vyska), 0) + 1
+    archy, otevrene = [], []
+    for sirka, vyska, data in karty:
+        zbyva[(sirka, vyska)] -= 1
+        for arch in otevrene:
+            umisteni = arch.umisti(sirka, vyska, otaceni, heuristika)
+            if umisteni is not None:
+                break
+        else:
+            arch = Arch(rozvrzeni)
+            umisteni = arch.umisti(sirka, vyska, otaceni, heuristika)
+            if umisteni is None:
+                continue
+            archy.append(arch)
+            otevrene.append(arch)
+        arch.karty.append((umisteni, data))
+        # arch, na který se už nevejde žádná ze zbývajících velikostí, se dál nezkouší
+        otevrene = [a for a in otevrene
+                    if any(pocet and a.vejde_se(w, h, otaceni) for (w, h), pocet in zbyva.items())]
+    return [arch.karty for arch in archy]
+
+def rozlozit(karty, rozvrzeni):
+    """
+    karty = [(sirka, vyska, data)] v bodech v pořadí tisku. Vrátí (archy, nevejde):
+    archy jako [[(Umisteni, data)]] s nejmenším počtem archů ze zkoušených rozvržení,
+    nevejde = data karet větších než tisková plocha.
+    """
+    prazdny = Arch(rozvrzeni)
+    vejde = {rozmer: prazdny.vejde_se(*rozmer, rozvrzeni.otaceni) for rozmer in {(k[0], k[1]) for k in karty}}
+    nevejde = [data for sirka, vyska, data in karty if not vejde[(sirka, vyska)]]
+    karty = [karta for karta in karty if vejde[(karta[0], karta[1])]]
+    if len({(sirka, vyska) for sirka, vyska, _ in karty}) > 1:
+        # směs rozměrů: větší karty napřed, stejné karty si drží pořadí
+        karty = sorted(karty, key=lambda karta: -karta[0] * karta[1])
+    nejlepsi = None
+    for otaceni in ((False, True) if rozvrzeni.otaceni else (False,)):
+        for heuristika in HEURISTIKY:
+            archy = _sloz(karty, rozvrzeni, otaceni, heuristika)
+            if nejlepsi is None or len(archy) < len(nejlepsi):
+                nejlepsi = archy
+    return nejlepsi, nevejde
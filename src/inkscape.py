@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import queue
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+
+# ---------------- Cesta k Inkscape ----------------
+def najdi_inkscape():
+    """Portable Inkscape vedle skriptů; KARTICANDY_INKSCAPE ho přebíjí (jiná instalace, falešný renderer)."""
+    if os.environ.get("KARTICANDY_INKSCAPE"):
+        return Path(os.environ["KARTICANDY_INKSCAPE"])
+    if getattr(sys, 'frozen', False):
+        base_dir = Path(sys.executable).parent
+    else:
+        base_dir = Path(__file__).parent
+    inkscape_path = base_dir / "inkscape_portable/App/Inkscape/bin/inkscape.exe"
+    if not inkscape_path.exists():
+        inkscape_path = base_dir / "inkscape_portable/InkscapePortable.exe"  # cesta k portable Inkscape
+    return inkscape_path
+
+INKSCAPE_PATH = najdi_inkscape()
+
+class ChybaPrevodu(Exception):
+    """Převod jedné karty selhal; zpráva obsahuje výstup Inkscape, pokud nějaký byl."""
+
+def typ_exportu(vystup):
+    """Typ exportu podle přípony výstupu: karta.png -> png, karta.pdf -> pdf (vektorově)."""
+    return Path(vystup).suffix.lstrip(".").lower() or "png"
+
+# ---------------- Jednorázové volání (původní způsob) ----------------
+def prevest_jednou(svg_soubor, png_soubor, dpi=300, inkscape_path=INKSCAPE_PATH):
+    try:
+        subprocess.run([
+            str(inkscape_path),
+            str(svg_soubor),
+            f"--export-type={typ_exportu(png_soubor)}",
+            f"--export-filename={png_soubor}",
+            f"--export-dpi={dpi}"
+        ], check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        raise ChybaPrevodu(_posledni_radky(e.stderr) or str(e)) from None
+
+def _posledni_radky(data, pocet=3):
+    if not data:
+        return ""
+    text = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+    return " | ".join(r.strip() for r in text.strip().splitlines()[-pocet:])
+
+# ---------------- Dlouho běžící Inkscape (--shell) ----------------
+# Start Inkscape trvá sekundy, vykreslení karty zlomek toho. V režimu --shell
+# zůstává jedna instance otevřená a dostává akce po řádcích:
+#   file-open:<svg>;export-type:png;export-filename:<png>;export-dpi:300;export-do;file-close
+# (pro vektorový tisk stejně s export-type:pdf a souborem .pdf)
+# Po zpracování řádku vypíše výzvu "> ", podle ní poznáme, že je karta hotová.
+
+VYZVA = b"> "
+# v akcích Inkscape odděluje ';' a konec řádku, takové cesty jdou přes jednorázové volání
+NEPOVOLENE_V_CESTE = (";", "\n", "\r")
+
+class InkscapeShell:
+    """Jedna instance Inkscape v režimu --shell. Po pádu se při dalším převodu spustí znovu."""
+
+    def __init__(self, inkscape_path=INKSCAPE_PATH, timeout=120, timeout_startu=60):
+        self.inkscape_path = Path(inkscape_path)
+        self.timeout = timeout
+        self.timeout_startu = timeout_startu
+        self.proces = None
+        self.restarty = 0
+
+    def _cti(self, proud, fronta):
+        # čtení v samostatném vlákně, aby šel hlídat timeout i na Windows
+        while True:
+            data = proud.read1(65536)
+            fronta.put(data)
+            if not data:
+                return
+
+    def _cti_chyby(self, proud):
+        for radek in iter(proud.readline, b""):
+            self.chyby.append(radek.decode("utf-8", "replace").rstrip())
+
+    def spust(self):
+        self.zavri()
+        self.vystup = queue.Queue()
+        self.chyby = deque(maxlen=20)
+        self.proces = subprocess.Popen(
+            [str(self.inkscape_path), "--shell"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        threading.Thread(target=self._cti, args=(self.proces.stdout, self.vystup), daemon=True).start()
+        threading.Thread(target=self._cti_chyby, args=(self.proces.stderr,), daemon=True).start()
+        self._cekej_na_vyzvu(self.timeout_startu)
+
+    def bezi(self):
+        return self.proces is not None and self.proces.poll() is None
+
+    def _cekej_na_vyzvu(self, timeout):
+        buffer = b""
+        while True:
+            try:
+                data = self.vystup.get(timeout=timeout)
+            except queue.Empty:
+                self.zabij()
+                raise ChybaPrevodu(f"Inkscape neodpověděl do {timeout} s") from None
+            if not data:
+                self.zabij()
+                raise ChybaPrevodu("Inkscape skončil: " + (" | ".join(list(self.chyby)[-3:]) or "bez hlášky"))
+            buffer = (buffer + data)[-len(VYZVA):]
+            if buffer == VYZVA:
+                return
+
+    def prevest(self, svg_soubor, png_soubor, dpi=300):
+        png_soubor = Path(png_soubor)
+        if not self.bezi():
+            if self.proces is not None:
+                self.restarty += 1
+            self.spust()
+        # výsledek poznáme podle nově vzniklého souboru, starý proto nejdřív zmizí
+        png_soubor.unlink(missing_ok=True)
+        self.chyby.clear()
+        akce = (f"file-open:{Path(svg_soubor).resolve()};export-type:{typ_exportu(png_soubor)};"
+                f"export-filename:{png_soubor.resolve()};export-dpi:{dpi};export-do;file-close\n")
+        try:
+            self.proces.stdin.write(akce.encode("utf-8"))
+            self.proces.stdin.flush()
+        except OSError:
+            self.zabij()
+            raise ChybaPrevodu("Inkscape skončil: " + (" | ".join(list(self.chyby)[-3:]) or "bez hlášky")) from None
+        self._cekej_na_vyzvu(self.timeout)
+        if not png_soubor.exists() or png_soubor.stat().st_size == 0:
+            raise ChybaPrevodu(" | ".join(list(self.chyby)[-3:]) or f"Inkscape nevytvořil {png_soubor.suffix[1:].upper()}")
+
+    def zabij(self):
+        if self.proces is not None and self.proces.poll() is None:
+            self.proces.kill()
+            self.proces.wait()
+
+    def zavri(self):
+        if self.proces is None:
+            return
+        if self.proces.poll() is None:
+            try:
+                self.proces.stdin.write(b"quit\n")
+                self.proces.stdin.close()
+                self.proces.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.zabij()
+        self.proces = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.zavri()
+
+class Prevadec:
+    """
+    Převod karet jednou dlouho běžící instancí Inkscape.
+    Spadne-li Inkscape během karty, instance se spustí znovu a karta se zkusí ještě jednou;
+    chyba se tak vždy týká konkrétní karty a další karty pokračují.
+    Když --shell nejde spustit (např. spouštěč InkscapePortable.exe), použije se
+    jednorázové volání pro každou kartu.
+    """
+
+    def __init__(self, inkscape_path=INKSCAPE_PATH, pokusy=2):
+        self.inkscape_path = inkscape_path
+        self.pokusy = pokusy
+        self.shell = InkscapeShell(inkscape_path)
+        self.jednorazove = False
+
+    def prevest(self, svg_soubor, png_soubor, dpi=300):
+        if self.jednorazove or any(z in f"{svg_soubor}{png_soubor}" for z in NEPOVOLENE_V_CESTE):
+            return prevest_jednou(svg_soubor, png_soubor, dpi, self.inkscape_path)
+        if self.shell.proces is None and not self._spust_shell():
+            return prevest_jednou(svg_soubor, png_soubor, dpi, self.inkscape_path)
+        for pokus in range(self.pokusy):
+            try:
+                return self.shell.prevest(svg_soubor, png_soubor, dpi)
+            except ChybaPrevodu:
+                # karta bez PNG při běžícím Inkscape je chyba karty, opakování nepomůže
+                if self.shell.bezi() or pokus == self.pokusy - 1:
+                    raise
+
+    def _spust_shell(self):
+        try:
+            self.shell.spust()
+            return True
+        except (ChybaPrevodu, OSError) as e:
+            print(f"Inkscape --shell nelze použít ({e}), převádím po jednom souboru.")
+            self.jednorazove = True
+            return False
+
+    def zavri(self):
+        self.shell.zavri()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.zavri()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+from PIL import Image, ImageChops
+
+# ---------------- Profily exportu ----------------
+# Inkscape (nebo cairo) vykreslí kartu jako RGBA PNG. Podle profilu prevod.profil se
+# pak přeuloží do formátu prevod.formát (PNG / WEBP / JPEG):
+#   tisk       bez průhlednosti na bílém podkladu (papír), paleta jen bezeztrátově,
+#              WebP bezeztrátově, JPEG v kvalitě 95 bez podvzorkování barev
+#   korektura  menší soubory ke kontrole: paleta i se ztrátou, JPEG/WebP v kvalitě 80
+#   web        zachová průhlednost, nejvyšší komprese zlib, JPEG/WebP v kvalitě 75
+# paleta: "bezeztrat" = jen karty s nejvýše 256 barvami (ploché barvy, text),
+#         "ano" = kvantizace na 256 barev i u fotek, "ne" = plné barvy
+
+PROFILY = {
+    "tisk": {"alfa": False, "zlib": 6, "paleta": "bezeztrat", "kvalita": 95, "bezeztratove": True,
+             "podvzorkovani": 0},
+    "korektura": {"alfa": False, "zlib": 6, "paleta": "ano", "kvalita": 80, "bezeztratove": False,
+                  "podvzorkovani": 2},
+    "web": {"alfa": True, "zlib": 9, "paleta": "ano", "kvalita": 75, "bezeztratove": False,
+            "podvzorkovani": 2},
+}
+VYCHOZI_PROFIL = "tisk"
+FORMATY = {"PNG": ".png", "WEBP": ".webp", "JPEG": ".jpg"}
+PRIPONY = tuple(FORMATY.values())
+
+def nastaveni_exportu(config):
+    """Profil z prevod.profil doplněný o formát z prevod.formát."""
+    prevod = config.get("prevod", {})
+    profil = str(prevod.get("profil", VYCHOZI_PROFIL)).lower()
+    if profil not in PROFILY:
+        print(f"Neznámý profil exportu '{profil}', použiji '{VYCHOZI_PROFIL}'.")
+        profil = VYCHOZI_PROFIL
+    formát = str(prevod.get("formát", "PNG")).upper().replace("JPG", "JPEG")
+    if formát not in FORMATY:
+        print(f"Nepodporovaný formát '{formát}', použiji PNG.")
+        formát = "PNG"
+    return dict(PROFILY[profil], profil=profil, formát=formát)
+
+def pripona(nastaveni):
+    return FORMATY[nastaveni["formát"]]
+
+def _bez_alfy(img):
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        if rgba.getchannel("A").getextrema() != (255, 255):
+            podklad = Image.new("RGB", rgba.size, (255, 255, 255))
+            podklad.paste(rgba, mask=rgba.getchannel("A"))
+            return podklad
+    return img.convert("RGB")
+
+def _paleta(img, ztratova):
+    """Obrázek v režimu P, nebo None, když se paleta nehodí."""
+    if img.mode == "RGB":
+        barvy = img.getcolors(256)
+        if barvy is not None:
+            # všechny barvy se do palety vejdou; přesnost se ověří, tisk nesmí nic ztratit
+            paleta = img.quantize(len(barvy), method=Image.Quantize.MAXCOVERAGE, dither=Image.Dither.NONE)
+            if ImageChops.difference(paleta.convert("RGB"), img).getbbox() is None:
+                return paleta
+    if not ztratova:
+        return None
+    if img.mode == "RGBA":
+        return img.quantize(256, method=Image.Quantize.FASTOCTREE)
+    return img.quantize(256, method=Image.Quantize.MEDIANCUT)
+
+def zakodovat(img, cil, nastaveni):
+    """Uloží vykreslenou kartu podle profilu (atomicky přes .tmp) a vrátí cestu."""
+    cil = Path(cil)
+    formát = nastaveni["formát"]
+    if formát == "JPEG" or not nastaveni["alfa"]:
+        img = _bez_alfy(img)
+    elif img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    docasny = cil.with_name(cil.name + ".tmp")
+    if formát == "PNG":
+        if nastaveni["paleta"] != "ne":
+            img = _paleta(img, nastaveni["paleta"] == "ano") or img
+        img.save(docasny, format="PNG", compress_level=nastaveni["zlib"])
+    elif formát == "WEBP":
+        img.save(docasny, format="WEBP", lossless=nastaveni["bezeztratove"], quality=nastaveni["kvalita"],
+                 method=4)
+    else:
+        img.save(docasny, format="JPEG", quality=nastaveni["kvalita"], optimize=True,
+                 subsampling=nastaveni["podvzorkovani"])
+    docasny.replace(cil)
+    return cil
+
+# Vykreslené PNG je bezeztrátová předloha: WEBP/JPEG se kódují z něj a zůstává vedle nich,
+# aby se po přepnutí profilu netisklo ze ztrátového souboru ani nevykreslovalo znovu.
+PRIPONA_PREDLOHY = ".png"
+
+def smazat_ostatni_formaty(cil):
+    """Po změně formátu zmizí starší kódování karty s jinou příponou, PNG předloha zůstane."""
+    cil = Path(cil)
+    for jina in PRIPONY:
+        if jina not in (cil.suffix, PRIPONA_PREDLOHY):
+            cil.with_suffix(jina).unlink(missing_ok=True)
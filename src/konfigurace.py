@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+import copy
+
+# ---------------- Výchozí config.json projektu ----------------
+# Jediná kopie výchozího nastavení: main.py ji zapisuje do nových projektů,
+# benchmark.py z ní staví syntetické projekty. Modul nesmí importovat tkinter.
+DEFAULT_CONFIG = {
+    "generator": {"rozměr_karty": "standard", "barvy": "RGB", "procesy": 1, "mazat_smazane": False, "assety": False, "vystup": "svg"},
+    "editor": {"alpha": "1"},
+    "prevod": {"formát": "PNG", "profil": "tisk", "procesy": 0, "vykreslovani": "inkscape", "mezipamet_mb": 1024},
+    "tisk": {"printer": "HP_LaserJet", "duplex": True, "vektorove": False, "proudove": False,
+             "svazek_archu": 0, "arch": "A4", "okraj_mm": 7, "mezera_mm": 2, "otaceni": False},
+    "zdroje": {"excel": "", "sablona": ""}
+}
+
+def vychozi_config():
+    """Nezávislá kopie DEFAULT_CONFIG, kterou lze upravovat."""
+    return copy.deepcopy(DEFAULT_CONFIG)
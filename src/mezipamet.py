@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+
+# ---------------- Mezipaměť vykreslených karet ----------------
+# Projekt má jednu mezipaměť na disku (data/cache/vykresleni), sdílí ji editor i prevod.
+# Klíčem je SHA-256 obsahu SVG, DPI, oblast exportu a vykreslovač, takže stejná karta
+# se podruhé nevykresluje ani po restartu editoru, ani po novém převodu.
+#   data/cache/vykresleni/<2 znaky klíče>/<klíč>.png
+# Čas změny souboru slouží jako čas posledního použití; úklid maže nejdéle nepoužité
+# soubory, dokud se mezipaměť nevejde do prevod.mezipamet_mb (0 = vypnuto).
+
+VYCHOZI_LIMIT_MB = 1024
+
+def slozka_mezipameti(project_path):
+    return Path(project_path) / "data" / "cache" / "vykresleni"
+
+def limit_mb(config):
+    try:
+        return max(0, int(config.get("prevod", {}).get("mezipamet_mb", VYCHOZI_LIMIT_MB)))
+    except (TypeError, ValueError):
+        return VYCHOZI_LIMIT_MB
+
+def klic(hash_svg, dpi, oblast="page", vykreslovani="inkscape"):
+    popis = json.dumps([hash_svg, float(dpi), oblast, vykreslovani])
+    return hashlib.sha256(popis.encode("utf-8")).hexdigest()
+
+class Mezipamet:
+    """Soubory PNG podle klíče; zápis přes dočasný soubor, takže souběžné zápisy nevadí."""
+
+    def __init__(self, slozka, limit_mb=VYCHOZI_LIMIT_MB):
+        self.slozka = Path(slozka)
+        self.limit = limit_mb * 1024 * 1024
+        self.zasahy = 0
+        self.minuti = 0
+        self._zamek = threading.Lock()
+
+    @property
+    def zapnuta(self):
+        return self.limit > 0
+
+    def cesta(self, klic_souboru):
+        return self.slozka / klic_souboru[:2] / f"{klic_souboru}.png"
+
+    def _pouzito(self, cesta):
+        try:
+            os.utime(cesta)
+            return True
+        except OSError:
+            return False
+
+    def _zapocitej(self, zasah):
+        with self._zamek:
+            if zasah:
+                self.zasahy += 1
+            else:
+                self.minuti += 1
+
+    def nacti(self, klic_souboru):
+        """Obsah PNG, nebo None, když v mezipaměti není."""
+        if not self.zapnuta:
+            return None
+        cesta = self.cesta(klic_souboru)
+        try:
+            data = cesta.read_bytes()
+        except OSError:
+            data = None
+        if data:
+            self._pouzito(cesta)
+        self._zapocitej(bool(data))
+        return data or None
+
+    def zkopiruj_do(self, klic_souboru, cil):
+        """Zkopíruje uložené PNG do cíle (atomicky); False, když v mezipaměti není."""
+        if not self.zapnuta:
+            return False
+        cesta = self.cesta(klic_souboru)
+        cil = Path(cil)
+        docasny = cil.with_name(f"{cil.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            shutil.copyfile(cesta, docasny)
+            docasny.replace(cil)
+        except OSError:
+            docasny.unlink(missing_ok=True)
+            self._zapocitej(False)
+            return False
+        self._pouzito(cesta)
+        self._zapocitej(True)
+        return True
+
+    def _zapis(self, klic_souboru, zapsat):
+        if not self.zapnuta:
+            return
+        cesta = self.cesta(klic_souboru)
+        docasny = cesta.with_name(f"{cesta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cesta.parent.mkdir(parents=True, exist_ok=True)
+            zapsat(docasny)
+            docasny.replace(cesta)
+        except OSError:
+            # plný disk nebo zamčený soubor – mezipaměť je jen zrychlení, převod kvůli ní nepadá
+            docasny.unlink(missing_ok=True)
+
+    def uloz(self, klic_souboru, data):
+        self._zapis(klic_souboru, lambda docasny: docasny.write_bytes(data))
+
+    def uloz_soubor(self, klic_souboru, png_soubor):
+        self._zapis(klic_souboru, lambda docasny: shutil.copyfile(png_soubor, docasny))
+
+    def uklid(self):
+        """Smaže nejdéle nepoužité soubory nad limit. Vrátí (počet smazaných, zbývající bajty)."""
+        if not self.slozka.exists():
+            return 0, 0
+        soubory = []
+        for cesta in self.slozka.glob("*/*"):
+            try:
+                stat = cesta.stat()
+            except OSError:
+                continue
+            soubory.append((stat.st_mtime, stat.st_size, cesta))
+        celkem = sum(velikost for _, velikost, _ in soubory)
+        smazano = 0
+        for _, velikost, cesta in sorted(soubory, key=lambda s: s[0]):
+            if celkem <= self.limit:
+                break
+            try:
+                cesta.unlink()
+            except OSError:
+                continue
+            celkem -= velikost
+            smazano += 1
+        return smazano, celkem
+
+def mezipamet_projektu(project_path, config):
+    return Mezipamet(slozka_mezipameti(project_path), limit_mb(config))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from contextlib import nullcontext
+from pathlib import Path
+from PIL import Image
+
+# ---------------- Odvozené náhledy z tiskového PNG ----------------
+# prevod vykreslí kartu jednou v tiskovém rozlišení (master, 300 dpi) a menší verze
+# vzniknou zmenšením v PIL. Ukládají se vedle masteru:
+#   <nazev>.png            master pro tisk (.webp / .jpg podle prevod.formát, viz kodovani.py)
+#   <nazev>.nahled.png     náhled pro editor (150 dpi, stejně jako dřív vykresloval Inkscape)
+#   <nazev>.miniatura.png  miniatura do seznamů
+#   <nazev>.korektura.jpg  korektura (JPEG, menší soubor pro posílání ke kontrole)
+
+DPI_MASTERU = 300
+VARIANTY = {
+    "nahled": {"dpi": 150, "pripona": ".nahled.png"},
+    "miniatura": {"vyska": 256, "pripona": ".miniatura.png"},
+    "korektura": {"dpi": 100, "pripona": ".korektura.jpg", "kvalita": 85},
+}
+
+def cesta_varianty(master_png, varianta):
+    master_png = Path(master_png)
+    return master_png.with_name(master_png.stem + VARIANTY[varianta]["pripona"])
+
+def cesty_variant(master_png):
+    return [cesta_varianty(master_png, varianta) for varianta in VARIANTY]
+
+def chybi_varianty(master_png):
+    return any(not cesta.exists() for cesta in cesty_variant(master_png))
+
+def _zmensit(img, nastaveni, dpi_masteru):
+    if "dpi" in nastaveni:
+        pomer = dpi_masteru / nastaveni["dpi"]
+    else:
+        pomer = img.height / nastaveni["vyska"]
+    if pomer <= 1:
+        return img
+    if float(pomer).is_integer():
+        # celočíselný poměr (300 → 150, 300 → 100): reduce průměruje bloky pixelů, nejrychlejší cesta
+        return img.reduce(int(pomer))
+    velikost = (max(1, round(img.width / pomer)), max(1, round(img.height / pomer)))
+    return img.resize(velikost, Image.LANCZOS, reducing_gap=2.0)
+
+def odvodit(master_png, dpi_masteru=DPI_MASTERU, img=None):
+    """Z masteru zapíše všechny varianty (atomicky přes .tmp) a vrátí jejich cesty.
+    img = už načtený master, soubor se pak znovu nečte."""
+    master_png = Path(master_png)
+    cesty = []
+    with (nullcontext(img) if img is not None else Image.open(master_png)) as img:
+        img.load()
+        for varianta, nastaveni in VARIANTY.items():
+            cesta = cesta_varianty(master_png, varianta)
+            docasny = cesta.with_name(cesta.name + ".tmp")
+            mensi = _zmensit(img, nastaveni, dpi_masteru)
+            if cesta.suffix == ".jpg":
+                # JPEG nemá průhlednost, podklad karty je bílý jako papír
+                if mensi.mode in ("RGBA", "LA", "P"):
+                    podklad = Image.new("RGB", mensi.size, (255, 255, 255))
+                    podklad.paste(mensi, mask=mensi.convert("RGBA").getchannel("A"))
+                    mensi = podklad
+                mensi.convert("RGB").save(docasny, format="JPEG", quality=nastaveni.get("kvalita", 85),
+                                          optimize=True)
+            else:
+                # náhledy se čtou často a přepisují při každé změně karty, rychlost zápisu má přednost
+                mensi.save(docasny, format="PNG", compress_level=1)
+            docasny.replace(cesta)
+            cesty.append(cesta)
+    return cesty
+
+def smazat_varianty(master_png):
+    for cesta in cesty_variant(master_png):
+        cesta.unlink(missing_ok=True)
@@ -1,30 +1,395 @@
 # -*- coding: utf-8 -*-
-import subprocess
+import os
+import sys
+import json
+import time
+import hashlib
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
+from PIL import Image
+import balik
+import inkscape
+import rastr
+import nahledy
+import kodovani
+import fronta
+import casy
+import mezipamet
+from tabulka import hash_souboru
 
-INKSCAPE_PATH = Path("inkscape_portable/InkscapePortable.exe")  # cesta k portable Inkscape
+def argumenty(argv):
+    """(--vse, karty z --prednost <karta>) z argumentů za cestou k projektu."""
+    vse, prednost = False, []
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--vse":
+            vse = True
+        elif argv[i] == "--prednost" and i + 1 < len(argv):
+            prednost.append(argv[i + 1])
+            i += 1
+        elif argv[i].startswith("--prednost="):
+            prednost.append(argv[i].split("=", 1)[1])
+        i += 1
+    return vse, prednost
 
-# Cesta k adresáři s SVG soubory
-svg_slozka = Path("vystup")
-vystup_zaklad = Path("vystup_png")
-vystup_zaklad.mkdir(exist_ok=True)
+def pocet_prevadecu(config):
+    """prevod.procesy v config.json: počet souběžných instancí Inkscape, 0 / nevyplněno = všechna jádra."""
+    try:
+        procesy = int(config.get("prevod", {}).get("procesy", 0))
+    except (TypeError, ValueError):
+        procesy = 0
+    if procesy <= 0:
+        procesy = os.cpu_count() or 1
+    return procesy
+
+def pouzit_cairo(config):
+    """prevod.vykreslovani = "cairo": jednoduché karty kreslí rastr.py v procesu, ostatní Inkscape."""
+    if str(config.get("prevod", {}).get("vykreslovani", "inkscape")).lower() != "cairo":
+        return False
+    if not rastr.dostupny():
+        print("Balíček pycairo není k dispozici, všechny karty převede Inkscape.")
+        return False
+    return True
 
-# Rekurzivně projdeme všechny SVG soubory
-for svg_soubor in svg_slozka.rglob("*.svg"):
-    rel_path = svg_soubor.relative_to(svg_slozka).with_suffix(".png")
-    vystup_png = vystup_zaklad / rel_path
-    vystup_png.parent.mkdir(parents=True, exist_ok=True)
+def pouzit_pdf(config):
+    """tisk.vektorove: vedle PNG exportuje Inkscape každou kartu i do PDF pro vektorový tisk."""
+    return bool(config.get("tisk", {}).get("vektorove", False))
 
+# ---------------- Manifest převodu ----------------
+# data/prevod_manifest.json: {relativní cesta karty: SHA-256 zdrojového SVG} pro PNG,
+# která vznikla s aktuálním nastavením exportu. Karta se převádí jen tehdy, když
+# se její SVG změnilo nebo PNG (u tisk.vektorove i PDF) chybí; změna nastavení
+# (DPI, formát, PDF) převede vše.
+VERZE_MANIFESTU = 1
+
+def nacti_manifest(manifest_path, nastaveni):
+    """Vrátí (záznamy karet platné pro nastavení, všechny dříve vytvořené karty)."""
+    if not manifest_path.exists():
+        return {}, set()
     try:
-        subprocess.run([
-            str(INKSCAPE_PATH),
-            str(svg_soubor),
-            "--export-type=png",
-            f"--export-filename={vystup_png}",
-            "--export-dpi=300"
-        ], check=True)
-        print(f"Převod hotov: {svg_soubor} -> {vystup_png}")
-    except subprocess.CalledProcessError as e:
-        print(f"Chyba při převodu {svg_soubor}: {e}")
-
-print("Hotovo!")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception:
+        return {}, set()
+    karty = manifest.get("karty", {})
+    if manifest.get("verze") != VERZE_MANIFESTU or manifest.get("nastaveni") != nastaveni:
+        return {}, set(karty)
+    return karty, set(karty)
+
+def uloz_manifest(manifest_path, nastaveni, karty):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"verze": VERZE_MANIFESTU, "nastaveni": nastaveni, "karty": karty},
+                  f, ensure_ascii=False, indent=2)
+
+def hash_karty(rel, zdroj, cteni):
+    if zdroj is not None:
+        return hash_souboru(zdroj)
+    return hashlib.sha256(cteni.precti(rel)).hexdigest()
+
+def png_karty(vystup_zaklad, rel, pripona=".png"):
+    return vystup_zaklad / Path(rel).with_suffix(pripona)
+
+def pdf_karty(vystup_pdf, rel):
+    return vystup_pdf / Path(rel).with_suffix(".pdf")
+
+# ---------------- Souběžný převod ----------------
+class Planovac:
+    """
+    N vláken, každé s vlastní dlouho běžící instancí Inkscape (inkscape.Prevadec).
+    Karty jdou přes omezenou frontu, takže se dočasné soubory z balíku vybalují
+    až těsně před převodem. Hlášky se vypisují po celých řádcích s pořadím [k/n],
+    aby je konzole ScriptGUI četla průběžně. Karta, kterou už projekt jednou
+    vykreslil (stejný obsah SVG a nastavení), se jen zkopíruje z mezipaměti.
+    S vystup_pdf exportuje tatáž instance Inkscape kartu ještě do PDF.
+    Náhledy a uložení podle profilu exportu běží ve vlastním poolu vláken
+    (PIL při kódování uvolňuje GIL), Inkscape mezitím kreslí další kartu.
+    """
+
+    def __init__(self, procesy, cteni, vystup_zaklad, dpi=300, cairo=False, mezipamet_karet=None,
+                 vystup_pdf=None, export=None, fronta_prevodu=None, log_casu=None):
+        self.procesy = procesy
+        self.log_casu = log_casu
+        self.fronta_prevodu = fronta_prevodu
+        self.vystup_pdf = vystup_pdf
+        self.export = export or kodovani.nastaveni_exportu({})
+        self.pripona = kodovani.pripona(self.export)
+        self.kodovani = None
+        self.cairo = cairo
+        self.mezipamet = mezipamet_karet or mezipamet.Mezipamet("", limit_mb=0)
+        self.vykreslovani = "cairo" if cairo else "inkscape"
+        self.cteni = cteni
+        self.vystup_zaklad = vystup_zaklad
+        self.dpi = dpi
+        self.fronta = queue.Queue(maxsize=2 * procesy)
+        self.zamek = threading.Lock()
+        self.hotovo = 0
+        self.celkem = 0
+        self.selhane = []
+        self.prevedene = []
+        self.restarty = 0
+        self.cairem = 0
+        self.z_mezipameti = 0
+        self.nepodporovane = Counter()
+        self.casy = []
+
+    def _hlaska(self, text, rel, ok, mereni=None):
+        with self.zamek:
+            self.hotovo += 1
+            (self.prevedene if ok else self.selhane).append(rel)
+            print(f"[{self.hotovo}/{self.celkem}] {text}", flush=True)
+            if mereni is not None:
+                self.casy.append((mereni["sekundy"], rel))
+                if self.log_casu is not None:
+                    self.log_casu.zapis(karta=rel, ok=ok, **mereni)
+        if self.fronta_prevodu is not None:
+            self.fronta_prevodu.oznac(rel, ok, None if ok else text)
+
+    def _pracuj(self):
+        with inkscape.Prevadec(inkscape.INKSCAPE_PATH) as prevadec:
+            while True:
+                uloha = self.fronta.get()
+                if uloha is None:
+                    break
+                rel, zdroj, hash_svg = uloha
+                start = time.perf_counter()
+                vystup_png = png_karty(self.vystup_zaklad, rel)
+                klic = mezipamet.klic(hash_svg, self.dpi, "page", self.vykreslovani)
+                mereni = {"vykreslovani": "inkscape", "svg_b": None}
+                try:
+                    mereni["svg_b"] = zdroj.stat().st_size if zdroj is not None else self.cteni.velikost(rel)
+                    vystup_png.parent.mkdir(parents=True, exist_ok=True)
+                    if self.mezipamet.zkopiruj_do(klic, vystup_png):
+                        mereni["vykreslovani"] = "mezipamet"
+                    if mereni["vykreslovani"] != "mezipamet" or self.vystup_pdf is not None:
+                        with (nullcontext(zdroj) if zdroj is not None else self.cteni.docasny_soubor(rel)) as svg_soubor:
+                            if mereni["vykreslovani"] != "mezipamet":
+                                if self._cairem(svg_soubor, vystup_png):
+                                    mereni["vykreslovani"] = "cairo"
+                                else:
+                                    prevadec.prevest(svg_soubor, vystup_png, dpi=self.dpi)
+                                self.mezipamet.uloz_soubor(klic, vystup_png)
+                            if self.vystup_pdf is not None:
+                                vystup_pdf = pdf_karty(self.vystup_pdf, rel)
+                                vystup_pdf.parent.mkdir(parents=True, exist_ok=True)
+                                prevadec.prevest(svg_soubor, vystup_pdf, dpi=self.dpi)
+                    mereni["vykresleni_s"] = round(time.perf_counter() - start, 4)
+                    self.kodovani.submit(self._dokonci, rel, vystup_png, mereni)
+                except Exception as e:
+                    # jakákoli chyba karty se ohlásí a vlákno pokračuje další kartou
+                    sekundy = round(time.perf_counter() - start, 4)
+                    mereni.update(vykresleni_s=sekundy, sekundy=sekundy, chyba=str(e))
+                    self._hlaska(f"Chyba při převodu {rel}: {e}", rel, ok=False, mereni=mereni)
+            with self.zamek:
+                self.restarty += prevadec.shell.restarty
+
+    def _dokonci(self, rel, vystup_png, mereni):
+        """Z vykresleného PNG odvodí náhledy a kartu uloží podle profilu exportu."""
+        start = time.perf_counter()
+        vystup = png_karty(self.vystup_zaklad, rel, self.pripona)
+        try:
+            with Image.open(vystup_png) as img:
+                img.load()
+                # náhled, miniatura a korektura se jen zmenší z tiskového PNG
+                nahledy.odvodit(vystup_png, self.dpi, img)
+                kodovani.zakodovat(img, vystup, self.export)
+            kodovani.smazat_ostatni_formaty(vystup)
+        except Exception as e:
+            mereni.update(ulozeni_s=round(time.perf_counter() - start, 4), chyba=str(e))
+            mereni["sekundy"] = round(mereni["vykresleni_s"] + mereni["ulozeni_s"], 4)
+            self._hlaska(f"Chyba při ukládání {rel}: {e}", rel, ok=False, mereni=mereni)
+            return
+        # čekání ve frontě poolu se do času karty nepočítá
+        mereni["ulozeni_s"] = round(time.perf_counter() - start, 4)
+        mereni["sekundy"] = round(mereni["vykresleni_s"] + mereni["ulozeni_s"], 4)
+        mereni["vystup_b"] = vystup.stat().st_size
+        if mereni["vykreslovani"] == "mezipamet":
+            with self.zamek:
+                self.z_mezipameti += 1
+        zpusob = {"mezipamet": " (mezipaměť)", "cairo": " (cairo)"}.get(mereni["vykreslovani"], "")
+        self._hlaska(f"Převod hotov{zpusob}: {rel} -> {vystup}", rel, ok=True, mereni=mereni)
+
+    def _cairem(self, svg_soubor, vystup_png):
+        """Zkusí kartu vykreslit přes cairo; False = karta jde do Inkscape."""
+        if not self.cairo:
+            return False
+        try:
+            rastr.vykreslit_png(svg_soubor, vystup_png, dpi=self.dpi)
+        except rastr.Nepodporovano as e:
+            with self.zamek:
+                self.nepodporovane[str(e)] += 1
+            return False
+        with self.zamek:
+            self.cairem += 1
+        return True
+
+    def preved(self, karty):
+        self.celkem = len(karty)
+        vlakna = [threading.Thread(target=self._pracuj, daemon=True)
+                  for _ in range(min(self.procesy, max(1, len(karty))))]
+        # konec bloku with počká, až se uloží i poslední karty
+        with ThreadPoolExecutor(max_workers=len(vlakna)) as self.kodovani:
+            for vlakno in vlakna:
+                vlakno.start()
+            for i, karta in enumerate(karty):
+                if not self._vloz(karta, vlakna):
+                    # žádné vlákno už neběží (např. nešel spustit Inkscape), zbytek nemá kdo převést
+                    zbyle = []
+                    while not self.fronta.empty():
+                        zbyle.append(self.fronta.get_nowait())
+                    for rel, _, _ in zbyle + karty[i:]:
+                        self._hlaska(f"Chyba při převodu {rel}: převodní vlákna skončila", rel, ok=False)
+                    break
+            for _ in vlakna:
+                self._vloz(None, vlakna)
+            for vlakno in vlakna:
+                vlakno.join()
+        return len(vlakna)
+
+    def _vloz(self, uloha, vlakna):
+        """put() do omezené fronty, který nečeká věčně, když už frontu nikdo nevybírá."""
+        while True:
+            try:
+                self.fronta.put(uloha, timeout=0.5)
+                return True
+            except queue.Full:
+                if not any(vlakno.is_alive() for vlakno in vlakna):
+                    return False
+
+def main():
+    # ---------------- Cesta k projektu ----------------
+    if len(sys.argv) < 2:
+        print("Nebyla předána cesta k projektu.")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    vse, prednost = argumenty(sys.argv[2:])
+
+    config_path = project_path / "config.json"
+    config = {}
+    if config_path.exists():
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+    # Cesta k adresáři s SVG soubory (volné soubory i balík karet)
+    svg_slozka = project_path / "vystup" / "vystup_svg"
+    balik_path = balik.cesta_baliku(project_path)
+    vystup_zaklad = project_path / "vystup" / "vystup_png"
+    vystup_zaklad.mkdir(parents=True, exist_ok=True)
+    vystup_pdf = project_path / "vystup" / "vystup_pdf" if pouzit_pdf(config) else None
+
+    karty = balik.karty_k_prevodu(svg_slozka, balik_path)
+    dpi = 300
+
+    manifest_path = project_path / "data" / "prevod_manifest.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    cairo = pouzit_cairo(config)
+    export = kodovani.nastaveni_exportu(config)
+    pripona = kodovani.pripona(export)
+    nastaveni = {"dpi": dpi, "export": export, "vykreslovani": "cairo" if cairo else "inkscape",
+                 "pdf": vystup_pdf is not None}
+    puvodni, vytvorene = nacti_manifest(manifest_path, nastaveni)
+    fronta_prevodu = fronta.FrontaPrevodu(fronta.cesta_fronty(project_path), nastaveni)
+    vytvorene |= set(fronta_prevodu.karty)  # i karty z přerušeného běhu mohly vytvořit PNG
+    if vse:
+        puvodni = {}
+
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        cteni = None
+        if any(zdroj is None for _, zdroj in karty):
+            cteni = stack.enter_context(balik.CteniBaliku(balik_path, svg_slozka))
+
+        # ---------------- Výběr změněných karet ----------------
+        hashe = {rel: hash_karty(rel, zdroj, cteni) for rel, zdroj in karty}
+        if not vse:
+            # karty hotové v přerušeném běhu se nepřevádí znovu
+            navazat = {rel: h for rel, h in fronta_prevodu.hotove(hashe).items() if puvodni.get(rel) != h}
+            if navazat:
+                print(f"Navazuji na přerušený převod, {len(navazat)} karet už je hotových.")
+                puvodni.update(navazat)
+        k_prevodu = [(rel, zdroj, hashe[rel]) for rel, zdroj in karty
+                     if puvodni.get(rel) != hashe[rel] or not png_karty(vystup_zaklad, rel, pripona).exists()
+                     or (vystup_pdf is not None and not pdf_karty(vystup_pdf, rel).exists())]
+        if len(k_prevodu) < len(karty):
+            print(f"Přeskočeno {len(karty) - len(k_prevodu)} nezměněných karet.")
+        priority = fronta.priority_karet(project_path, svg_slozka, prednost)
+        k_prevodu = fronta_prevodu.naplanuj(k_prevodu, priority,
+                                            lambda rel, zdroj: zdroj.stat().st_mtime if zdroj is not None else 0)
+        prednostne = sum(1 for rel, _, _ in k_prevodu if priority.get(rel))
+        if prednostne:
+            print(f"Přednostně se převede {prednostne} označených a naposledy uložených karet.")
+
+        mezipamet_karet = mezipamet.mezipamet_projektu(project_path, config)
+        planovac = Planovac(pocet_prevadecu(config), cteni, vystup_zaklad, dpi, cairo, mezipamet_karet,
+                            vystup_pdf, export, fronta_prevodu)
+        if k_prevodu:
+            # časy jednotlivých karet pro souhrn (casy.py, tlačítko Casy)
+            planovac.log_casu = stack.enter_context(casy.LogCasu(project_path))
+        vlakna = planovac.preved(k_prevodu) if k_prevodu else 0
+    sekundy = time.perf_counter() - start
+
+    # nezměněné karty bez náhledů (např. převedené starší verzí) je stačí zmenšit
+    prevadene = {rel for rel, _, _ in k_prevodu}
+    doplnit = [rel for rel, _ in karty
+               if rel not in prevadene and nahledy.chybi_varianty(png_karty(vystup_zaklad, rel, pripona))]
+    for rel in doplnit:
+        nahledy.odvodit(png_karty(vystup_zaklad, rel, pripona), dpi)
+    if doplnit:
+        print(f"Doplněny náhledy {len(doplnit)} karet.")
+
+    # nepovedené karty v manifestu nezůstanou, příště se převedou znovu
+    selhane = set(planovac.selhane)
+    zaznamy = {rel: hashe[rel] for rel, _ in karty if rel in puvodni and rel not in selhane}
+    zaznamy.update((rel, hashe[rel]) for rel in planovac.prevedene)
+
+    # ---------------- PNG, jejichž SVG zmizelo ----------------
+    for rel in sorted(vytvorene - set(hashe)):
+        png_soubor = png_karty(vystup_zaklad, rel)
+        nahledy.smazat_varianty(png_soubor)
+        for soubor in (png_soubor.with_suffix(p) for p in kodovani.PRIPONY):
+            if soubor.exists():
+                soubor.unlink()
+                print(f"Smazán obrázek bez SVG: {soubor}")
+        if png_soubor.parent != vystup_zaklad and png_soubor.parent.exists() and not any(png_soubor.parent.iterdir()):
+            png_soubor.parent.rmdir()
+        pdf_soubor = pdf_karty(project_path / "vystup" / "vystup_pdf", rel)
+        if pdf_soubor.exists():
+            pdf_soubor.unlink()
+            print(f"Smazáno PDF bez SVG: {pdf_soubor}")
+    uloz_manifest(manifest_path, nastaveni, zaznamy)
+    # hotové karty už drží manifest, ve frontě zůstanou jen chyby pro příští běh
+    fronta_prevodu.dokonci(selhane)
+    smazano_z_mezipameti, _ = mezipamet_karet.uklid() if mezipamet_karet.zapnuta else (0, 0)
+
+    # ---------------- Souhrn ----------------
+    prevedeno = len(planovac.prevedene)
+    print(f"Profil exportu: {export['profil']}, formát {export['formát']}.")
+    if k_prevodu:
+        rychlost = f", {prevedeno / sekundy:.1f} karet/s" if sekundy > 0 else ""
+        print(f"Převedeno {prevedeno} z {len(k_prevodu)} karet za {sekundy:.1f} s{rychlost} (souběžně {vlakna}).")
+    else:
+        print("Všechna PNG jsou aktuální.")
+    if planovac.z_mezipameti:
+        print(f"Z mezipaměti {planovac.z_mezipameti} karet, vykresleno {prevedeno - planovac.z_mezipameti}.")
+    if smazano_z_mezipameti:
+        print(f"Z mezipaměti odstraněno {smazano_z_mezipameti} nejdéle nepoužitých souborů (limit {mezipamet_karet.limit // (1024 * 1024)} MB).")
+    if planovac.cairo:
+        print(f"Cairo vykreslilo {planovac.cairem} karet, Inkscape {prevedeno - planovac.cairem - planovac.z_mezipameti}.")
+        for duvod, pocet in planovac.nepodporovane.most_common(5):
+            print(f"  přes Inkscape ({pocet}×): {duvod}")
+    if planovac.restarty:
+        print(f"Inkscape byl po pádu znovu spuštěn {planovac.restarty}×.")
+    if planovac.casy:
+        print("Nejpomalejší karty: " + ", ".join(f"{rel} ({sekundy:.1f} s)"
+                                                for sekundy, rel in sorted(planovac.casy, reverse=True)[:3]))
+        print(f"Časy karet: {casy.cesta_logu(project_path)} (podrobný souhrn: tlačítko Casy)")
+    if planovac.selhane:
+        print(f"Nepodařilo se převést {len(planovac.selhane)} karet: {', '.join(sorted(planovac.selhane))}")
+    print("Hotovo!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,698 @@
+# -*- coding: utf-8 -*-
+"""
+Vykreslení jednoduchých karet přímo přes cairo, bez spouštění Inkscape.
+
+Podporovaná podmnožina SVG: g, rect, circle, ellipse, line, polyline, polygon, path,
+text/tspan (toy font API cairo), image (PNG, s Pillow i JPEG/GIF/WebP), transformace,
+barvy, průhlednost, tahy s čárkováním. Cokoli jiného (přechody, ořezové cesty, masky,
+filtry, <use>, CSS třídy, plovoucí text…) vyvolá Nepodporovano a karta se vykreslí
+Inkscapem. Bez balíčku pycairo je dostupny() False a vše jde přes Inkscape.
+"""
+import io
+import re
+import math
+import base64
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+from urllib.request import url2pathname
+import xml.etree.ElementTree as ET
+
+try:
+    import cairo
+except ImportError:
+    cairo = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+INKSCAPE_NS = "{http://www.inkscape.org/namespaces/inkscape}"
+SODIPODI_NS = "{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}"
+
+class Nepodporovano(Exception):
+    """Karta používá něco mimo podporovanou podmnožinu SVG, vykreslí ji Inkscape."""
+
+def dostupny():
+    return cairo is not None
+
+# ---------------- Délky, barvy, styly ----------------
+JEDNOTKY_PX = {"": 1.0, "px": 1.0, "mm": 96 / 25.4, "cm": 96 / 2.54, "in": 96.0, "pt": 96 / 72, "pc": 16.0}
+CISLO = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-z%]*)\s*$")
+
+def delka(hodnota, vychozi=0.0, relativni=None):
+    """Délka v uživatelských jednotkách; em a % jen vůči `relativni` (velikost písma)."""
+    if hodnota is None or hodnota == "":
+        return vychozi
+    m = CISLO.match(hodnota)
+    if not m:
+        raise Nepodporovano(f"délka '{hodnota}'")
+    cislo, jednotka = float(m.group(1)), m.group(2)
+    if jednotka in JEDNOTKY_PX:
+        return cislo * JEDNOTKY_PX[jednotka]
+    if relativni is not None and jednotka in ("em", "%"):
+        return cislo * relativni / (100.0 if jednotka == "%" else 1.0)
+    raise Nepodporovano(f"jednotka '{jednotka}'")
+
+def cisla(text):
+    return [float(c) for c in re.findall(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?", text or "")]
+
+BARVY = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+    "blue": (0, 0, 255), "yellow": (255, 255, 0), "gray": (128, 128, 128), "grey": (128, 128, 128),
+    "silver": (192, 192, 192), "maroon": (128, 0, 0), "purple": (128, 0, 128), "fuchsia": (255, 0, 255),
+    "magenta": (255, 0, 255), "lime": (0, 255, 0), "olive": (128, 128, 0), "navy": (0, 0, 128),
+    "teal": (0, 128, 128), "aqua": (0, 255, 255), "cyan": (0, 255, 255), "orange": (255, 165, 0),
+}
+
+def barva(hodnota, aktualni=None):
+    """(r, g, b) v rozsahu 0–1, nebo None pro 'none'."""
+    hodnota = (hodnota or "").strip().lower()
+    if hodnota in ("none", "transparent", ""):
+        return None
+    if hodnota == "currentcolor":
+        return barva(aktualni or "black")
+    if hodnota.startswith("#"):
+        h = hodnota[1:]
+        if len(h) == 3:
+            h = "".join(c * 2 for c in h)
+        if len(h) == 6 and all(c in "0123456789abcdef" for c in h):
+            return tuple(int(h[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    elif hodnota.startswith("rgb(") and hodnota.endswith(")"):
+        slozky = [s.strip() for s in hodnota[4:-1].split(",")]
+        if len(slozky) == 3:
+            return tuple(min(1.0, float(s[:-1]) / 100 if s.endswith("%") else float(s) / 255) for s in slozky)
+    elif hodnota in BARVY:
+        return tuple(c / 255 for c in BARVY[hodnota])
+    raise Nepodporovano(f"barva '{hodnota}'")
+
+# vlastnosti, které se dědí do potomků
+DEDENE = {
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity",
+    "stroke-linecap", "stroke-linejoin", "stroke-miterlimit", "stroke-dasharray", "stroke-dashoffset",
+    "font-family", "font-size", "font-weight", "font-style", "text-anchor", "visibility", "color",
+}
+VYCHOZI_STYL = {
+    "fill": "black", "fill-opacity": "1", "fill-rule": "nonzero", "stroke": "none", "stroke-width": "1",
+    "stroke-opacity": "1", "stroke-linecap": "butt", "stroke-linejoin": "miter", "stroke-miterlimit": "4",
+    "stroke-dasharray": "none", "stroke-dashoffset": "0", "font-family": "sans-serif", "font-size": "16px",
+    "font-weight": "normal", "font-style": "normal", "text-anchor": "start", "visibility": "visible",
+    "color": "black",
+}
+# vlastnost: hodnoty, které nic nemění; cokoli jiného umí jen Inkscape
+NEPODPOROVANE_VLASTNOSTI = {
+    "clip-path": {"none"}, "mask": {"none"}, "filter": {"none"}, "marker": {"none"},
+    "marker-start": {"none"}, "marker-mid": {"none"}, "marker-end": {"none"},
+    "paint-order": {"normal", "fill stroke", "fill stroke markers", "fill"},
+    "mix-blend-mode": {"normal"}, "letter-spacing": {"normal", "0", "0px"},
+    "word-spacing": {"normal", "0", "0px"}, "writing-mode": {"lr-tb", "lr", "horizontal-tb"},
+    "text-decoration": {"none"}, "text-decoration-line": {"none"}, "baseline-shift": {"baseline", "0"},
+    "shape-inside": {"none"}, "direction": {"ltr"},
+}
+
+def vlastnosti(elem):
+    """Prezentační atributy přebité atributem style."""
+    hodnoty = {k: v for k, v in elem.attrib.items() if not k.startswith("{")}
+    for deklarace in elem.get("style", "").split(";"):
+        if ":" in deklarace:
+            klic, hodnota = deklarace.split(":", 1)
+            hodnoty[klic.strip()] = hodnota.strip()
+    for klic, hodnota in hodnoty.items():
+        if klic in NEPODPOROVANE_VLASTNOSTI and hodnota not in NEPODPOROVANE_VLASTNOSTI[klic]:
+            raise Nepodporovano(f"{klic}: {hodnota}")
+        if "url(" in hodnota:
+            raise Nepodporovano(f"{klic}: {hodnota}")
+    return hodnoty
+
+def zdedit(rodic, elem):
+    vlastni = vlastnosti(elem)
+    styl = {k: v for k, v in rodic.items() if k in DEDENE}
+    for klic, hodnota in vlastni.items():
+        if hodnota != "inherit":
+            styl[klic] = hodnota
+    # velikost písma v em/% je relativní k rodiči
+    if vlastni.get("font-size", "inherit") != "inherit":
+        styl["font-size"] = f"{delka(vlastni['font-size'], 16.0, delka(rodic['font-size'], 16.0))}px"
+    return styl
+
+# ---------------- Transformace ----------------
+TRANSFORMACE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+def matice(transform):
+    m = cairo.Matrix()
+    if not transform:
+        return m
+    zbytek = TRANSFORMACE.sub("", transform).replace(",", "").strip()
+    if zbytek:
+        raise Nepodporovano(f"transform '{transform}'")
+    for nazev, argumenty in TRANSFORMACE.findall(transform):
+        a = cisla(argumenty)
+        if nazev == "matrix" and len(a) == 6:
+            t = cairo.Matrix(*a)
+        elif nazev == "translate" and len(a) in (1, 2):
+            t = cairo.Matrix(x0=a[0], y0=a[1] if len(a) == 2 else 0.0)
+        elif nazev == "scale" and len(a) in (1, 2):
+            t = cairo.Matrix(xx=a[0], yy=a[1] if len(a) == 2 else a[0])
+        elif nazev == "rotate" and len(a) in (1, 3):
+            t = cairo.Matrix()
+            if len(a) == 3:
+                t.translate(a[1], a[2])
+            t.rotate(math.radians(a[0]))
+            if len(a) == 3:
+                t.translate(-a[1], -a[2])
+        elif nazev == "skewX" and len(a) == 1:
+            t = cairo.Matrix(xy=math.tan(math.radians(a[0])))
+        elif nazev == "skewY" and len(a) == 1:
+            t = cairo.Matrix(yx=math.tan(math.radians(a[0])))
+        else:
+            raise Nepodporovano(f"transform '{transform}'")
+        # cairo násobí zleva: t * m uplatní t před dosavadními transformacemi
+        m = t.multiply(m)
+    return m
+
+# ---------------- Cesty ----------------
+PRIKAZY = "MmZzLlHhVvCcSsQqTtAa"
+POCET_ARGUMENTU = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+CISLO_CESTY = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+def rozloz_cestu(d):
+    """[(příkaz, [čísla])]; příznaky oblouku smí být bez oddělovače (a1 1 0 011 1)."""
+    vysledek = []
+    i, n = 0, len(d)
+    prikaz = None
+    while i < n:
+        c = d[i]
+        if c in " \t\r\n,":
+            i += 1
+            continue
+        if c in PRIKAZY:
+            prikaz = c
+            i += 1
+            if c in "Zz":
+                vysledek.append((c, []))
+            continue
+        if prikaz is None or prikaz in "Zz":
+            raise Nepodporovano(f"cesta '{d[:40]}'")
+        argumenty = []
+        pocet = POCET_ARGUMENTU[prikaz.upper()]
+        while len(argumenty) < pocet:
+            while i < n and d[i] in " \t\r\n,":
+                i += 1
+            if prikaz in "Aa" and len(argumenty) in (3, 4):
+                if i >= n or d[i] not in "01":
+                    raise Nepodporovano(f"cesta '{d[:40]}'")
+                argumenty.append(float(d[i]))
+                i += 1
+                continue
+            m = CISLO_CESTY.match(d, i)
+            if not m:
+                raise Nepodporovano(f"cesta '{d[:40]}'")
+            argumenty.append(float(m.group()))
+            i = m.end()
+        vysledek.append((prikaz, argumenty))
+        # další dvojice po M/m jsou implicitní L/l
+        if prikaz == "M":
+            prikaz = "L"
+        elif prikaz == "m":
+            prikaz = "l"
+    return vysledek
+
+def _oblouk(ctx, x1, y1, rx, ry, phi, velky, kladny, x2, y2):
+    """Oblouk podle SVG (koncové body) převedený na středový tvar, viz SVG 1.1 F.6.5."""
+    if (x1, y1) == (x2, y2):
+        return
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        ctx.line_to(x2, y2)
+        return
+    cos_p, sin_p = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p, y1p = cos_p * dx + sin_p * dy, -sin_p * dx + cos_p * dy
+    lam = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    if lam > 1:
+        rx, ry = rx * math.sqrt(lam), ry * math.sqrt(lam)
+    citatel = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    jmenovatel = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    koef = math.sqrt(max(0.0, citatel / jmenovatel)) if jmenovatel else 0.0
+    if velky == kladny:
+        koef = -koef
+    cxp, cyp = koef * rx * y1p / ry, -koef * ry * x1p / rx
+    cx = cos_p * cxp - sin_p * cyp + (x1 + x2) / 2
+    cy = sin_p * cxp + cos_p * cyp + (y1 + y2) / 2
+    t1 = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    t2 = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    puvodni = ctx.get_matrix()
+    ctx.translate(cx, cy)
+    ctx.rotate(math.radians(phi))
+    ctx.scale(rx, ry)
+    (ctx.arc if kladny else ctx.arc_negative)(0, 0, 1, t1, t2)
+    ctx.set_matrix(puvodni)
+
+def cesta(ctx, d):
+    x = y = sx = sy = 0.0
+    ridici = None  # poslední řídicí bod pro S/T
+    predchozi = None
+    for prikaz, a in rozloz_cestu(d):
+        relativni = prikaz.islower()
+        P = prikaz.upper()
+        ox, oy = (x, y) if relativni else (0.0, 0.0)
+        if P == "M":
+            x, y = a[0] + ox, a[1] + oy
+            sx, sy = x, y
+            ctx.move_to(x, y)
+        elif P == "L":
+            x, y = a[0] + ox, a[1] + oy
+            ctx.line_to(x, y)
+        elif P == "H":
+            x = a[0] + ox
+            ctx.line_to(x, y)
+        elif P == "V":
+            y = a[0] + oy
+            ctx.line_to(x, y)
+        elif P in "CS":
+            if P == "C":
+                x1, y1 = a[0] + ox, a[1] + oy
+                x2, y2, ex, ey = a[2] + ox, a[3] + oy, a[4] + ox, a[5] + oy
+            else:
+                x1, y1 = (2 * x - ridici[0], 2 * y - ridici[1]) if predchozi in ("C", "S") else (x, y)
+                x2, y2, ex, ey = a[0] + ox, a[1] + oy, a[2] + ox, a[3] + oy
+            ctx.curve_to(x1, y1, x2, y2, ex, ey)
+            ridici = (x2, y2)
+            x, y = ex, ey
+        elif P in "QT":
+            if P == "Q":
+                qx, qy, ex, ey = a[0] + ox, a[1] + oy, a[2] + ox, a[3] + oy
+            else:
+                qx, qy = (2 * x - ridici[0], 2 * y - ridici[1]) if predchozi in ("Q", "T") else (x, y)
+                ex, ey = a[0] + ox, a[1] + oy
+            ctx.curve_to(x + 2 / 3 * (qx - x), y + 2 / 3 * (qy - y),
+                         ex + 2 / 3 * (qx - ex), ey + 2 / 3 * (qy - ey), ex, ey)
+            ridici = (qx, qy)
+            x, y = ex, ey
+        elif P == "A":
+            ex, ey = a[5] + ox, a[6] + oy
+            _oblouk(ctx, x, y, a[0], a[1], a[2], bool(a[3]), bool(a[4]), ex, ey)
+            x, y = ex, ey
+        elif P == "Z":
+            ctx.close_path()
+            x, y = sx, sy
+        predchozi = P
+
+# ---------------- Obrázky ----------------
+def _data_obrazku(href, zaklad):
+    if href.startswith("data:"):
+        hlavicka, _, data = href.partition(",")
+        return base64.b64decode(data) if ";base64" in hlavicka else unquote(data).encode("latin-1")
+    if href.startswith("file:"):
+        return Path(url2pathname(urlparse(href).path)).read_bytes()
+    if re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:", href) and not re.match(r"^[a-zA-Z]:[\\/]", href):
+        raise Nepodporovano(f"odkaz na obrázek '{href[:40]}'")
+    cesta_obrazku = Path(unquote(href))
+    if not cesta_obrazku.is_absolute():
+        if zaklad is None:
+            raise Nepodporovano("relativní odkaz na obrázek bez složky karty")
+        cesta_obrazku = zaklad / cesta_obrazku
+    return cesta_obrazku.read_bytes()
+
+def _povrch_obrazku(data):
+    if data.startswith(b"\x89PNG"):
+        try:
+            return cairo.ImageSurface.create_from_png(io.BytesIO(data))
+        except cairo.Error:
+            pass  # např. 16bitové PNG, zkusí se přes Pillow
+    if Image is None:
+        raise Nepodporovano("obrázek, který cairo neumí načíst (chybí Pillow)")
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            png = io.BytesIO()
+            img.convert("RGBA").save(png, format="PNG")
+    except OSError as e:
+        raise Nepodporovano(f"obrázek nelze načíst: {e}") from None
+    png.seek(0)
+    return cairo.ImageSurface.create_from_png(png)
+
+def _zarovnani(par, vx, vy, vw, vh, x, y, w, h):
+    """Matice z (vx, vy, vw, vh) do (x, y, w, h) podle preserveAspectRatio, a zda ořezávat."""
+    casti = (par or "xMidYMid meet").split()
+    if casti and casti[0] == "defer":
+        casti = casti[1:]
+    align = casti[0] if casti else "xMidYMid"
+    slice_ = len(casti) > 1 and casti[1] == "slice"
+    m = cairo.Matrix()
+    if align == "none":
+        m.translate(x, y)
+        m.scale(w / vw, h / vh)
+        m.translate(-vx, -vy)
+        return m, False
+    if align not in {f"x{a}Y{b}" for a in ("Min", "Mid", "Max") for b in ("Min", "Mid", "Max")}:
+        raise Nepodporovano(f"preserveAspectRatio '{par}'")
+    s = (max if slice_ else min)(w / vw, h / vh)
+    posun = {"Min": 0.0, "Mid": 0.5, "Max": 1.0}
+    tx = x + (w - vw * s) * posun[align[1:4]]
+    ty = y + (h - vh * s) * posun[align[5:8]]
+    m.translate(tx, ty)
+    m.scale(s, s)
+    m.translate(-vx, -vy)
+    return m, slice_
+
+# ---------------- Vykreslení ----------------
+PRVKY_TVARU = {"rect", "circle", "ellipse", "line", "polyline", "polygon", "path"}
+NEVYKRESLOVANE = {"defs", "metadata", "title", "desc"}
+
+class Kresleni:
+    def __init__(self, ctx, zaklad):
+        self.ctx = ctx
+        self.zaklad = zaklad
+
+    def prvek(self, elem, styl):
+        tag = elem.tag
+        if not isinstance(tag, str):
+            return  # komentáře, instrukce
+        if not tag.startswith(SVG_NS):
+            if "}" in tag:
+                return  # cizí jmenné prostory (sodipodi:namedview, metadata editoru)
+            raise Nepodporovano(f"prvek <{tag}>")
+        nazev = tag[len(SVG_NS):]
+        if nazev in NEVYKRESLOVANE:
+            return
+        styl = zdedit(styl, elem)
+        if styl.get("display", "inline") == "none":
+            return
+        try:
+            pruhlednost = float(styl.get("opacity", "1"))
+        except ValueError:
+            raise Nepodporovano(f"opacity '{styl.get('opacity')}'") from None
+        if pruhlednost <= 0:
+            return
+
+        ctx = self.ctx
+        ctx.save()
+        ctx.transform(matice(elem.get("transform")))
+        if pruhlednost < 1:
+            ctx.push_group()
+        if nazev in ("g", "svg"):
+            if nazev == "svg":
+                raise Nepodporovano("vnořené <svg>")
+            for potomek in elem:
+                self.prvek(potomek, styl)
+        elif nazev in PRVKY_TVARU:
+            ctx.new_path()
+            self.tvar(nazev, elem)
+            self.namaluj(styl)
+        elif nazev == "text":
+            self.text(elem, styl)
+        elif nazev == "image":
+            self.obrazek(elem, styl)
+        else:
+            raise Nepodporovano(f"prvek <{nazev}>")
+        if pruhlednost < 1:
+            ctx.pop_group_to_source()
+            ctx.paint_with_alpha(pruhlednost)
+        ctx.restore()
+
+    def tvar(self, nazev, elem):
+        ctx = self.ctx
+        g = lambda atr: delka(elem.get(atr), 0.0)
+        if nazev == "rect":
+            x, y, w, h = g("x"), g("y"), g("width"), g("height")
+            if w <= 0 or h <= 0:
+                return
+            rx, ry = elem.get("rx"), elem.get("ry")
+            rx = delka(rx) if rx is not None else (delka(ry) if ry is not None else 0.0)
+            ry = delka(ry) if ry is not None else rx
+            rx, ry = min(rx, w / 2), min(ry, h / 2)
+            if rx <= 0 or ry <= 0:
+                ctx.rectangle(x, y, w, h)
+                return
+            ctx.move_to(x + rx, y)
+            ctx.line_to(x + w - rx, y)
+            _oblouk(ctx, x + w - rx, y, rx, ry, 0, False, True, x + w, y + ry)
+            ctx.line_to(x + w, y + h - ry)
+            _oblouk(ctx, x + w, y + h - ry, rx, ry, 0, False, True, x + w - rx, y + h)
+            ctx.line_to(x + rx, y + h)
+            _oblouk(ctx, x + rx, y + h, rx, ry, 0, False, True, x, y + h - ry)
+            ctx.line_to(x, y + ry)
+            _oblouk(ctx, x, y + ry, rx, ry, 0, False, True, x + rx, y)
+            ctx.close_path()
+        elif nazev in ("circle", "ellipse"):
+            cx, cy = g("cx"), g("cy")
+            rx = g("r") if nazev == "circle" else g("rx")
+            ry = g("r") if nazev == "circle" else g("ry")
+            if rx <= 0 or ry <= 0:
+                return
+            puvodni = ctx.get_matrix()
+            ctx.translate(cx, cy)
+            ctx.scale(rx, ry)
+            ctx.move_to(1, 0)
+            ctx.arc(0, 0, 1, 0, 2 * math.pi)
+            ctx.close_path()
+            ctx.set_matrix(puvodni)
+        elif nazev == "line":
+            ctx.move_to(g("x1"), g("y1"))
+            ctx.line_to(g("x2"), g("y2"))
+        elif nazev in ("polyline", "polygon"):
+            body = cisla(elem.get("points"))
+            for i in range(0, len(body) - 1, 2):
+                (ctx.line_to if i else ctx.move_to)(body[i], body[i + 1])
+            if nazev == "polygon" and len(body) >= 4:
+                ctx.close_path()
+        else:
+            cesta(ctx, elem.get("d", ""))
+
+    def namaluj(self, styl):
+        """Výplň a tah aktuální cesty (paint-order fill, stroke)."""
+        if styl.get("visibility") in ("hidden", "collapse"):
+            self.ctx.new_path()
+            return
+        ctx = self.ctx
+        vypln = barva(styl["fill"], styl.get("color"))
+        tah = barva(styl["stroke"], styl.get("color"))
+        if vypln is not None:
+            ctx.set_source_rgba(*vypln, float(styl["fill-opacity"]))
+            ctx.set_fill_rule(cairo.FILL_RULE_EVEN_ODD if styl["fill-rule"] == "evenodd" else cairo.FILL_RULE_WINDING)
+            ctx.fill_preserve()
+        sirka = delka(styl["stroke-width"], 1.0)
+        if tah is not None and sirka > 0:
+            ctx.set_source_rgba(*tah, float(styl["stroke-opacity"]))
+            ctx.set_line_width(sirka)
+            ctx.set_line_cap({"round": cairo.LINE_CAP_ROUND, "square": cairo.LINE_CAP_SQUARE}
+                             .get(styl["stroke-linecap"], cairo.LINE_CAP_BUTT))
+            ctx.set_line_join({"round": cairo.LINE_JOIN_ROUND, "bevel": cairo.LINE_JOIN_BEVEL}
+                              .get(styl["stroke-linejoin"], cairo.LINE_JOIN_MITER))
+            ctx.set_miter_limit(float(styl["stroke-miterlimit"]))
+            carky = [] if styl["stroke-dasharray"] == "none" else cisla(styl["stroke-dasharray"])
+            if len(carky) % 2:
+                carky *= 2
+            if carky and sum(carky) > 0:
+                ctx.set_dash(carky, delka(styl["stroke-dashoffset"]))
+            else:
+                ctx.set_dash([])
+            ctx.stroke_preserve()
+        ctx.new_path()
+
+    # --- text ---
+    def _pismo(self, styl):
+        rodina = styl["font-family"].split(",")[0].strip().strip("'\"") or "sans-serif"
+        sklon = cairo.FONT_SLANT_ITALIC if styl["font-style"] == "italic" else (
+            cairo.FONT_SLANT_OBLIQUE if styl["font-style"] == "oblique" else cairo.FONT_SLANT_NORMAL)
+        vaha = styl["font-weight"]
+        tucne = vaha in ("bold", "bolder") or (vaha.isdigit() and int(vaha) >= 600)
+        self.ctx.select_font_face(rodina, sklon, cairo.FONT_WEIGHT_BOLD if tucne else cairo.FONT_WEIGHT_NORMAL)
+        self.ctx.set_font_size(delka(styl["font-size"], 16.0))
+
+    def _useky(self, elem, styl, zachovat, useky, pozice):
+        """
+        Rozloží text na úseky (x, y, text, styl); x/y jsou None, pokud text plyne dál.
+        pozice je společná pro celý text: x/y prvku platí pro jeho první úsek, i když leží v potomkovi.
+        """
+        for atr in ("dx", "dy", "rotate", "textLength", "lengthAdjust"):
+            if elem.get(atr) is not None:
+                raise Nepodporovano(f"text s atributem {atr}")
+        x = cisla(elem.get("x"))
+        y = cisla(elem.get("y"))
+        if len(x) > 1 or len(y) > 1:
+            raise Nepodporovano("text s více souřadnicemi x/y")
+        if x:
+            pozice[0] = x[0]
+        if y:
+            pozice[1] = y[0]
+
+        def pridej(text, styl_useku):
+            if not text:
+                return
+            text = text.replace("\n", " " if zachovat else "").replace("\t", " ")
+            if not zachovat:
+                text = re.sub(r" +", " ", text)
+            if text:
+                useky.append((pozice[0], pozice[1], text, styl_useku))
+                pozice[0] = pozice[1] = None
+
+        pridej(elem.text, styl)
+        for potomek in elem:
+            if not isinstance(potomek.tag, str):
+                pridej(potomek.tail, styl)
+                continue
+            if potomek.tag != SVG_NS + "tspan":
+                raise Nepodporovano(f"prvek <{potomek.tag}> v textu")
+            styl_potomka = zdedit(styl, potomek)
+            if styl_potomka.get("display", "inline") != "none":
+                if potomek.get("transform"):
+                    raise Nepodporovano("tspan s transformací")
+                self._useky(potomek, styl_potomka, zachovat, useky, pozice)
+            pridej(potomek.tail, styl)
+
+    def text(self, elem, styl):
+        zachovat = elem.get("{http://www.w3.org/XML/1998/namespace}space") == "preserve"
+        useky = []
+        self._useky(elem, styl, zachovat, useky, [None, None])
+        if not zachovat and useky:
+            # úvodní a koncové mezery celého textu se při collapse zahazují
+            x, y, text, s = useky[0]
+            useky[0] = (x, y, text.lstrip(), s)
+            x, y, text, s = useky[-1]
+            useky[-1] = (x, y, text.rstrip(), s)
+
+        # bloky textu začínají úsekem s absolutním x, text-anchor se počítá pro celý blok
+        bloky = []
+        for usek in useky:
+            if usek[0] is not None or not bloky:
+                bloky.append([])
+            bloky[-1].append(usek)
+
+        ctx = self.ctx
+        cx = cy = 0.0
+        for blok in bloky:
+            sirky = []
+            for _, _, text, s in blok:
+                self._pismo(s)
+                sirky.append(ctx.text_extents(text).x_advance)
+            x0, y0 = blok[0][0], blok[0][1]
+            cx = cx if x0 is None else x0
+            cy = cy if y0 is None else y0
+            kotva = blok[0][3]["text-anchor"]
+            cx -= sum(sirky) * {"middle": 0.5, "end": 1.0}.get(kotva, 0.0)
+            for (_, y, text, s), sirka in zip(blok, sirky):
+                if y is not None:
+                    cy = y
+                self._pismo(s)
+                ctx.new_path()
+                ctx.move_to(cx, cy)
+                ctx.text_path(text)
+                self.namaluj(s)
+                cx += sirka
+
+    # --- obrázky ---
+    def obrazek(self, elem, styl):
+        if styl.get("visibility") in ("hidden", "collapse"):
+            return
+        href = elem.get(XLINK_HREF) or elem.get("href")
+        if not href:
+            return
+        w, h = delka(elem.get("width"), 0.0), delka(elem.get("height"), 0.0)
+        povrch = _povrch_obrazku(_data_obrazku(href.strip(), self.zaklad))
+        if w <= 0 or h <= 0:
+            w, h = w or povrch.get_width(), h or povrch.get_height()
+        m, orez = _zarovnani(elem.get("preserveAspectRatio"), 0, 0, povrch.get_width(), povrch.get_height(),
+                             delka(elem.get("x")), delka(elem.get("y")), w, h)
+        ctx = self.ctx
+        ctx.save()
+        if orez:
+            ctx.rectangle(delka(elem.get("x")), delka(elem.get("y")), w, h)
+            ctx.clip()
+        ctx.transform(m)
+        ctx.set_source_surface(povrch, 0, 0)
+        if "optimizespeed" in styl.get("image-rendering", "").lower() or "pixelated" in styl.get("image-rendering", ""):
+            ctx.get_source().set_filter(cairo.FILTER_FAST)
+        ctx.rectangle(0, 0, povrch.get_width(), povrch.get_height())
+        ctx.fill()
+        ctx.restore()
+
+def _rozmer_dokumentu(root):
+    """(šířka, výška) v CSS px a viewBox (x, y, w, h)."""
+    vb = cisla(root.get("viewBox"))
+    if vb and len(vb) != 4:
+        raise Nepodporovano("viewBox")
+    for atr in ("width", "height"):
+        if (root.get(atr) or "").endswith("%"):
+            if not vb:
+                raise Nepodporovano("rozměr v % bez viewBox")
+    sirka = delka(root.get("width"), vb[2] if vb else 0.0) if not (root.get("width") or "").endswith("%") else vb[2]
+    vyska = delka(root.get("height"), vb[3] if vb else 0.0) if not (root.get("height") or "").endswith("%") else vb[3]
+    if sirka <= 0 or vyska <= 0:
+        raise Nepodporovano("dokument bez rozměru")
+    return sirka, vyska, (vb or [0.0, 0.0, sirka, vyska])
+
+def _pozadi(root):
+    """Barva pozadí exportu z sodipodi:namedview (pagecolor + inkscape:pageopacity), jinak průhledné."""
+    namedview = root.find(SODIPODI_NS + "namedview")
+    if namedview is None:
+        return None
+    try:
+        nepruhlednost = float(namedview.get(INKSCAPE_NS + "pageopacity", "0"))
+    except ValueError:
+        return None
+    if nepruhlednost <= 0:
+        return None
+    try:
+        rgb = barva(namedview.get("pagecolor", "#ffffff"))
+    except Nepodporovano:
+        return None
+    return (*rgb, min(1.0, nepruhlednost)) if rgb else None
+
+def vykreslit_povrch(svg, dpi=300, zaklad=None):
+    """
+    ImageSurface karty. svg je cesta nebo bajty, zaklad je složka pro relativní odkazy na obrázky
+    (u cesty se doplní sama). Mimo podporovanou podmnožinu vyvolá Nepodporovano.
+    """
+    if cairo is None:
+        raise Nepodporovano("chybí pycairo")
+    try:
+        if isinstance(svg, (bytes, bytearray)):
+            root = ET.fromstring(svg)
+        else:
+            root = ET.parse(svg).getroot()
+            zaklad = zaklad if zaklad is not None else Path(svg).parent
+    except ET.ParseError as e:
+        # poškozené SVG: Inkscape ho buď přečte, nebo ohlásí chybu karty
+        raise Nepodporovano(f"ParseError: {e}") from None
+    if root.tag != SVG_NS + "svg":
+        raise Nepodporovano("kořen není <svg>")
+
+    sirka, vyska, (vx, vy, vw, vh) = _rozmer_dokumentu(root)
+    meritko = dpi / 96.0
+    px_w, px_h = max(1, round(sirka * meritko)), max(1, round(vyska * meritko))
+    povrch = cairo.ImageSurface(cairo.FORMAT_ARGB32, px_w, px_h)
+    ctx = cairo.Context(povrch)
+    pozadi = _pozadi(root)
+    if pozadi:
+        ctx.set_source_rgba(*pozadi)
+        ctx.paint()
+    ctx.scale(px_w / sirka, px_h / vyska)
+    m, _ = _zarovnani(root.get("preserveAspectRatio"), vx, vy, vw, vh, 0, 0, sirka, vyska)
+    ctx.transform(m)
+
+    kresleni = Kresleni(ctx, zaklad)
+    try:
+        styl = zdedit(VYCHOZI_STYL, root)
+        for potomek in root:
+            kresleni.prvek(potomek, styl)
+    except (ValueError, TypeError, KeyError, IndexError, ZeroDivisionError, cairo.Error) as e:
+        # nečekaná hodnota v SVG – ať ji posoudí Inkscape
+        raise Nepodporovano(f"{type(e).__name__}: {e}") from None
+    povrch.flush()
+    return povrch
+
+def vykreslit_png(svg_soubor, png_soubor, dpi=300):
+    """Zapíše PNG karty; při Nepodporovano se nic nezapíše."""
+    povrch = vykreslit_povrch(svg_soubor, dpi)
+    png_soubor = Path(png_soubor)
+    docasny = png_soubor.with_name(png_soubor.name + ".tmp")
+    povrch.write_to_png(str(docasny))
+    docasny.replace(png_soubor)
+
+def png_bytes(svg_soubor, dpi=150):
+    data = io.BytesIO()
+    vykreslit_povrch(svg_soubor, dpi).write_to_png(data)
+    return data.getvalue()
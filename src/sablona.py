@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import copy
+import xml.etree.ElementTree as ET
+import assety
+
+SVG_G = "{http://www.w3.org/2000/svg}g"
+# Pořadí určuje prioritu při hledání skupiny podle jména (stejně jako dřív najdi_g)
+ATRIBUTY_SKUPIN = [
+    "id",
+    "{http://www.inkscape.org/namespaces/inkscape}label",
+    "{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}label",
+    "label",
+]
+
+def styl_s_display(styl, value):
+    novy_styl = ";".join(
+        s for s in styl.split(";") if not s.strip().startswith("display:")
+    )
+    return (novy_styl + f";display:{value}").strip(";")
+
+# ---------------- Zkompilovaná šablona ----------------
+class Sablona:
+    """
+    Šablona karty načtená jednou za běh generátoru.
+    Strom se parsuje jen jednou, textové uzly se předem zaindexují podle názvu
+    placeholderu, přepínatelné skupiny Kategorie/Vzacnost podle jména
+    a každá karta vzniká jako hluboká kopie stromu.
+    """
+
+    def __init__(self, sablona_file, asset_dir=None, karta_dir=None):
+        self.root = ET.parse(sablona_file).getroot()
+
+        # Režim úložiště obrázků: base64 ze šablony se uloží jednou a karty na něj jen odkazují.
+        # karta_dir je složka, do které se karty zapisují (href je relativní k ní).
+        if asset_dir is not None:
+            assety.odkazat_obrazky(self.root, asset_dir, karta_dir)
+
+        # Pořadí uzlů v root.iter() je v kopii stejné, uzly proto stačí držet jako indexy
+        self.index = {elem: i for i, elem in enumerate(self.root.iter())}
+
+        # Placeholder = text uzlu (nebo text za uzlem) shodný s názvem sloupce.
+        self.placeholdery = {}
+        for elem, i in self.index.items():
+            for typ in ("text", "tail"):
+                text = getattr(elem, typ)
+                if text is not None and text.strip():
+                    self.placeholdery.setdefault(text.strip(), []).append((i, typ))
+
+        # --- Kategorie: (všechny podskupiny, {jméno: (cílová skupina, její podskupiny)}) ---
+        self.kategorie = None
+        kategorie_root = self._cile(self.root).get("Kategorie")
+        if kategorie_root is not None:
+            self.kategorie = (
+                self._podskupiny(kategorie_root),
+                {nazev: (self.index[g], self._podskupiny(g))
+                 for nazev, g in self._cile(kategorie_root).items()},
+            )
+
+        # --- Vzácnost: všechny skupiny se jménem Vzacnost, každá (podskupiny, {jméno: skupina}) ---
+        self.vzacnosti = []
+        for attr in ATRIBUTY_SKUPIN:
+            for vzacnost_root in self.root.iter(SVG_G):
+                if vzacnost_root.get(attr) == "Vzacnost":
+                    self.vzacnosti.append((
+                        self._podskupiny(vzacnost_root),
+                        {nazev: self.index[g] for nazev, g in self._cile(vzacnost_root).items()},
+                    ))
+
+        # Výsledný styl závisí jen na posledním nastaveném display, lze ho tedy předpočítat
+        prepinatelne = set()
+        if self.kategorie is not None:
+            prepinatelne.update(self.kategorie[0])
+        for podskupiny, _ in self.vzacnosti:
+            prepinatelne.update(podskupiny)
+        uzly = list(self.root.iter())
+        self.styly = {
+            i: {value: styl_s_display(uzly[i].get("style", ""), value) for value in ("none", "inline")}
+            for i in prepinatelne
+        }
+
+    def _podskupiny(self, elem):
+        return [self.index[g] for g in elem.iter(SVG_G) if g is not elem]
+
+    def _cile(self, elem):
+        """{jméno: první podskupina s tímto jménem}, atributy s vyšší prioritou mají přednost."""
+        cile = {}
+        for attr in ATRIBUTY_SKUPIN:
+            for g in elem.iter(SVG_G):
+                if g is not elem and g.get(attr) is not None:
+                    cile.setdefault(g.get(attr), g)
+        return cile
+
+    def nova_karta(self, hodnoty, kategorie, vzacnost):
+        """
+        Vrátí kopii stromu šablony s vyplněnými placeholdery a přepnutými vrstvami
+        a seznam nenalezených vrstev [("Kategorie" / "Vzacnost", jméno)].
+        hodnoty: slovník {název sloupce: text}, vyplní se jedním průchodem indexu.
+        """
+        kopie = copy.deepcopy(self.root)
+        uzly = list(kopie.iter())
+        for nazev, sloty in self.placeholdery.items():
+            if nazev not in hodnoty:
+                continue
+            for i, typ in sloty:
+                setattr(uzly[i], typ, hodnoty[nazev])
+
+        # --- přepnutí vrstev bez hledání ve stromu ---
+        display = {}
+        nenalezene = []
+        if self.kategorie is not None:
+            podskupiny, cile = self.kategorie
+            display.update((i, "none") for i in podskupiny)
+            if kategorie in cile:
+                cilova, vnorene = cile[kategorie]
+                display[cilova] = "inline"
+                display.update((i, "inline") for i in vnorene)
+            else:
+                nenalezene.append(("Kategorie", kategorie))
+
+        for podskupiny, cile in self.vzacnosti:
+            display.update((i, "none") for i in podskupiny)
+            if vzacnost in cile:
+                display[cile[vzacnost]] = "inline"
+            else:
+                nenalezene.append(("Vzacnost", vzacnost))
+
+        for i, value in display.items():
+            uzly[i].set("style", self.styly[i][value])
+        return kopie, nenalezene
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import hashlib
+import pandas as pd
+from pathlib import Path
+
+# ---------------- Cache načteného Excelu ----------------
+# Parsování XLSX přes openpyxl je nejpomalejší krok celé linky. Načtená tabulka se proto
+# ukládá vedle sešitu do cache/<sešit>.pkl (pandas pickle drží data po sloupcích)
+# a znovu se parsuje jen tehdy, když se sešit opravdu změní.
+
+VERZE_CACHE = 1
+
+def hash_souboru(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+def _cesty_cache(excel_file):
+    cache_dir = excel_file.parent / "cache"
+    return cache_dir / f"{excel_file.name}.pkl", cache_dir / f"{excel_file.name}.json"
+
+def _zapis_atomicky(cesta, zapis):
+    docasny = cesta.with_name(cesta.name + ".tmp")
+    zapis(docasny)
+    os.replace(docasny, cesta)
+
+def nacti_excel(excel_file):
+    """
+    Vrátí DataFrame sešitu. Klíčem cache je velikost, mtime a SHA-256 sešitu:
+    při shodné velikosti a mtime se hash ani nepočítá, při jiném mtime ale stejném
+    obsahu (kopie, checkout) se cache jen potvrdí.
+    """
+    excel_file = Path(excel_file)
+    pkl_path, meta_path = _cesty_cache(excel_file)
+    stat = excel_file.stat()
+    klic = {"verze": VERZE_CACHE, "pandas": pd.__version__,
+            "velikost": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    meta = None
+    if meta_path.exists() and pkl_path.exists():
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            meta = None
+
+    sha = None
+    if meta is not None and all(meta.get(k) == v for k, v in klic.items() if k != "mtime_ns"):
+        if meta.get("mtime_ns") != klic["mtime_ns"]:
+            sha = hash_souboru(excel_file)
+        if sha is None or meta.get("sha256") == sha:
+            try:
+                df = pd.read_pickle(pkl_path)
+                if sha is not None:
+                    _uloz_meta(meta_path, {**klic, "sha256": sha})
+                return df
+            except Exception:
+                pass  # poškozená cache -> načíst znovu ze sešitu
+
+    df = pd.read_excel(excel_file)
+    try:
+        pkl_path.parent.mkdir(exist_ok=True)
+        _zapis_atomicky(pkl_path, df.to_pickle)
+        _uloz_meta(meta_path, {**klic, "sha256": sha or hash_souboru(excel_file)})
+    except Exception as e:
+        print(f"Cache Excelu se nepodařilo uložit: {e}")
+    return df
+
+def _uloz_meta(meta_path, meta):
+    def zapis(cesta):
+        with open(cesta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    _zapis_atomicky(meta_path, zapis)
@@ -1,130 +1,589 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
+import io
 import math
+import sys
+import json
+import shutil
 import unicodedata
 from pathlib import Path
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from PyPDF2 import PdfReader, PdfWriter
+import PyPDF2
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, IndirectObject,
+                            NameObject, NullObject, NumberObject)
+from tabulka import nacti_excel, hash_souboru
+from generator import vystupni_soubor, chyba_radku
+from kodovani import PRIPONY
+from impozice import Rozvrzeni, rozlozit
 
 # --- Nastavení ---
-EXCEL_FILE = Path("karty.xlsx")
-PNG_ROOT   = Path("vystup_png")
-OUTPUT_PDF = Path("karty_tisk.pdf")
-FINAL_PDF  = Path("karty_tisk_oboustranne.pdf")
-
-CARD_W_MM, CARD_H_MM = 63.5, 88.9
-MARGIN_MM = 7
-GAP_MM    = 2
-
-def mm2pt(mm_val): return mm_val * 72 / 25.4
-CARD_W, CARD_H = mm2pt(CARD_W_MM), mm2pt(CARD_H_MM)
-PAGE_W, PAGE_H = A4
-
-# spočítáme, kolik karet se vejde na stránku
-usable_width_mm  = (PAGE_W / mm) - 2 * MARGIN_MM
-usable_height_mm = (PAGE_H / mm) - 2 * MARGIN_MM
-COLS = int((usable_width_mm + GAP_MM) // (CARD_W_MM + GAP_MM))
-ROWS = int((usable_height_mm + GAP_MM) // (CARD_H_MM + GAP_MM))
-PER_PAGE = COLS * ROWS
+# Rozměr karty a archu, okraje, mezery a otáčení určuje config.json, viz impozice.py.
 
 def clean_filename(name: str) -> str:
     nfkd_form = unicodedata.normalize('NFKD', name)
     only_ascii = nfkd_form.encode('ASCII', 'ignore').decode('ASCII')
     return only_ascii.replace(' ', '_')
 
-def find_rarity_dir(vzacnost: str) -> Path:
+def find_rarity_dir(png_root: Path, vzacnost: str) -> Path:
     vz = vzacnost.strip().lower()
-    for d in PNG_ROOT.iterdir():
+    for d in png_root.iterdir():
         if d.is_dir() and d.name.lower() == vz:
             return d
     return None
 
-def create_print_pdf():
-    """Vytvoří PDF s lícovými stranami karet."""
-    df = pd.read_excel(EXCEL_FILE)
-    df = df.sort_values(["Vzacnost", "Nazev"])
-    c = canvas.Canvas(str(OUTPUT_PDF), pagesize=A4)
+def find_png(png_root: Path, rar_dir: Path, row) -> Path:
+    """Obrázek karty: výstup převodu (<Kategorie>/<nazev>.png, .webp nebo .jpg podle profilu), jinak podadresář vzácnosti."""
+    if chyba_radku(0, row) is None:
+        vystup = vystupni_soubor(row, png_root)
+        for pripona in PRIPONY:
+            if vystup.with_suffix(pripona).exists():
+                return vystup.with_suffix(pripona)
+    nazev = str(row.get("Nazev", "")).strip()
+    return (rar_dir or png_root) / f"{clean_filename(nazev)}.png"
 
-    for vzacnost, group in df.groupby("Vzacnost"):
-        placed = 0
-        rar_dir = find_rarity_dir(vzacnost)
-        if not rar_dir:
-            print(f"⚠️ Podadresar pro vzácnost '{vzacnost}' nenalezen.")
-            continue
+def find_pdf(pdf_root: Path, row) -> Path:
+    """Vektorové PDF karty z převodu (<Kategorie>/<nazev>.pdf), None když chybí."""
+    if pdf_root is None or chyba_radku(0, row) is not None:
+        return None
+    pdf_file = vystupni_soubor(row, pdf_root).with_suffix(".pdf")
+    return pdf_file if pdf_file.exists() else None
 
-        for _, row in group.iterrows():
-            nazev_raw = row.get("Nazev", "")
-            nazev = str(nazev_raw).strip()
-            pocet = row.get("Pocet", 1)
-            try:
-                pocet = int(pocet) if not math.isnan(pocet) else 1
-            except:
-                pocet = 1
-
-            png_file = rar_dir / f"{clean_filename(nazev)}.png"
-            if not png_file.exists():
-                print(f"⚠️ Chybí PNG pro kartu: {png_file}")
-                continue
+# ---------------- Sdílené objekty ----------------
+class SdileneObjekty:
+    """
+    Každý obsah (SHA-256 souboru) se do PDF vloží jednou jako XObject, další
+    výskyty (kopie karty, stejná karta pod jiným jménem, rub za každým archem)
+    jsou jen odkazy. Ušetřené bajty se odhadují velikostí zdrojového souboru.
+    Když zapisovač sám slučuje opakování stejného souboru (reportlab drawImage),
+    počítá se s podle_jmena=True jen úspora navíc: stejný obsah pod jiným jménem.
+    """
+
+    def __init__(self, predpona, podle_jmena=False):
+        self.predpona = predpona
+        self.podle_jmena = podle_jmena
+        self.soubory = {}
+        self.podle_obsahu = {}
+        self.vlozene = set()
+        self.vlozeno = 0
+        self.odkazu = 0
+        self.usetreno = 0
+
+    def registruj(self, soubor):
+        """(jméno XObjectu, True pokud je obsah nový a volající ho má vložit)."""
+        novy_soubor = soubor not in self.soubory
+        if novy_soubor:
+            obsah = hash_souboru(soubor)
+            jmeno = self.podle_obsahu.setdefault(obsah, f"{self.predpona}{len(self.podle_obsahu)}")
+            self.soubory[soubor] = (jmeno, Path(soubor).stat().st_size)
+        jmeno, velikost = self.soubory[soubor]
+        if jmeno in self.vlozene:
+            self.odkazu += 1
+            if novy_soubor or not self.podle_jmena:
+                self.usetreno += velikost
+            return jmeno, False
+        self.vlozene.add(jmeno)
+        self.vlozeno += 1
+        return jmeno, True
+
+    def pricti(self, jine):
+        """Souhrn přes více výstupních souborů (svazky proudového tisku)."""
+        self.vlozeno += jine.vlozeno
+        self.odkazu += jine.odkazu
+        self.usetreno += jine.usetreno
+
+    def souhrn(self, co):
+        return (f"{co}: {self.vlozeno} vloženo jednou, {self.odkazu} dalších výskytů odkazem, "
+                f"ušetřeno přibližně {self.usetreno / (1024 * 1024):.1f} MB.")
+
+def forma_ze_stranky(writer, stranka):
+    """Stránku PDF vloží do writeru jako Form XObject; vrátí (odkaz, mediabox)."""
+    box = [float(v) for v in stranka.mediabox]
+    data = DecodedStreamObject()
+    obsah = stranka.get_contents()
+    data.set_data(obsah.get_data() if obsah is not None else b"")
+    forma = data.flate_encode()  # flate_encode nepřenáší klíče slovníku, doplní se až po něm
+    forma.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Form"),
+        NameObject("/BBox"): ArrayObject(FloatObject(v) for v in box),
+    })
+    if "/Resources" in stranka:
+        forma[NameObject("/Resources")] = stranka["/Resources"].get_object().clone(writer)
+        # PyPDF2 pamatuje klony podle id() zdrojového readeru; reader karty po vložení zanikne
+        # a jeho id() může dostat reader další karty, který by pak dostal cizí zdroje
+        writer._id_translated.pop(id(stranka.pdf), None)
+    return writer._add_object(forma), box
 
-            for _ in range(pocet):
-                if placed and placed % PER_PAGE == 0:
-                    c.showPage()
-                    placed = 0
+def stranka_s_formami(writer, sirka, vyska, obsah, formy):
+    """Nová stránka, jejíž obsah jen umísťuje Form XObjecty {jméno: odkaz}."""
+    stranka = PageObject.create_blank_page(None, sirka, vyska)
+    data = DecodedStreamObject()
+    data.set_data("\n".join(obsah).encode("ascii"))
+    stranka[NameObject("/Contents")] = writer._add_object(data.flate_encode())
+    stranka[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): formy})
+    writer.add_page(stranka)
 
-                col = placed % COLS
-                row_i = placed // COLS
+# ProudovyPdfWriter sahá do vnitřků PdfWriteru (_objects, _pages, _info, _root),
+# které se mezi verzemi PyPDF2 mění; proudově se proto tiskne jen s ověřenou verzí
+# (requirements.txt, tests/test_tisk.py), jinak se použije běžný zápis.
+PYPDF2_PROUDOVE = ("3.0.1",)
 
-                x = mm2pt(MARGIN_MM + col * (CARD_W_MM + GAP_MM))
-                y = PAGE_H - mm2pt(MARGIN_MM + (row_i + 1) * CARD_H_MM + row_i * GAP_MM)
+def lze_proudove():
+    return PyPDF2.__version__ in PYPDF2_PROUDOVE
+
+class ProudovyPdfWriter(PdfWriter):
+    """
+    PdfWriter, který každou přidanou stránku i vše, co vzniklo od minulé stránky
+    (formy karet a rubů, obsah stránky), hned zapíše do souboru a v paměti z nich
+    nechá jen číslo objektu a pozici v souboru. Katalog a strom stránek se zapíší
+    při zavření. Paměť tak nezávisí na počtu stránek, jen na počtu různých karet.
+    """
+
+    def __init__(self, cesta):
+        super().__init__()
+        self.cesta = Path(cesta)
+        self.f = open(self.cesta, "wb")
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.pozice = {}
+        self.kids = ArrayObject()
+        self.zapsano = len(self._objects)  # strom stránek, info a katalog až na konci
+
+    def add_page(self, stranka):
+        stranka[NameObject("/Parent")] = self._pages
+        self._objects.append(stranka)  # PageObject má indirect_reference = None, _add_object ho nebere
+        stranka.indirect_reference = IndirectObject(len(self._objects), 0, self)
+        self.kids.append(stranka.indirect_reference)
+        self.vyprazdni()
+        return stranka
+
+    def _zapis_objekt(self, cislo, obj):
+        self.pozice[cislo] = self.f.tell()
+        self.f.write(f"{cislo} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.f, None)
+        self.f.write(b"\nendobj\n")
+
+    def vyprazdni(self):
+        for i in range(self.zapsano, len(self._objects)):
+            self._zapis_objekt(i + 1, self._objects[i])
+            self._objects[i] = NullObject()  # na zapsaný objekt se dál jen odkazuje číslem
+        self.zapsano = len(self._objects)
+
+    def zavri(self):
+        self.vyprazdni()
+        stranky = self._objects[self._pages.idnum - 1]
+        stranky[NameObject("/Kids")] = self.kids
+        stranky[NameObject("/Count")] = NumberObject(len(self.kids))
+        for ref in (self._pages, self._info, self._root):
+            self._zapis_objekt(ref.idnum, self._objects[ref.idnum - 1])
+        xref = self.f.tell()
+        self.f.write(f"xref\n0 {len(self._objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+        for cislo in range(1, len(self._objects) + 1):
+            self.f.write(f"{self.pozice[cislo]:010} 00000 n \n".encode("ascii"))
+        self.f.write(b"trailer\n")
+        DictionaryObject({
+            NameObject("/Size"): NumberObject(len(self._objects) + 1),
+            NameObject("/Root"): self._root,
+            NameObject("/Info"): self._info,
+        }).write_to_stream(self.f, None)
+        self.f.write(f"\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.zavri()
+        else:
+            self.f.close()
+            self.cesta.unlink(missing_ok=True)  # nedokončené PDF by tiskárna stejně nepřečetla
 
-                c.drawImage(str(png_file), x, y,
-                            width=CARD_W, height=CARD_H,
-                            preserveAspectRatio=True, anchor="sw")
-                placed += 1
+# ---------------- Zápis archů ----------------
+class RastrovyArch:
+    """Archy přes reportlab, karta je bitmapa z PNG vložená jednou jako formulář (beginForm/doForm)."""
 
-        c.showPage()  # nová strana po dokončení vzácnosti
+    def __init__(self, output_pdf, sirka, vyska):
+        self.c = canvas.Canvas(str(output_pdf), pagesize=(sirka, vyska))
+        self.sdilene = SdileneObjekty("karta", podle_jmena=True)
+        self.formy = {}
 
+    def karta(self, soubor, umisteni):
+        jmeno, novy = self.sdilene.registruj(soubor)
+        if novy:
+            self.formy[jmeno] = (0, 0, umisteni.sirka, umisteni.vyska)
+            self.c.beginForm(jmeno, *self.formy[jmeno])
+            self.c.drawImage(str(soubor), 0, 0,
+                             width=umisteni.sirka, height=umisteni.vyska,
+                             preserveAspectRatio=True, anchor="sw")
+            self.c.endForm()
+        self.c.saveState()
+        self.c.transform(*umisteni.matice(self.formy[jmeno]))
+        self.c.doForm(jmeno)
+        self.c.restoreState()
+
+    def strana(self):
+        self.c.showPage()
+
+    def uloz(self):
+        self.c.save()
+
+def pdf_z_png(png_file, sirka, vyska):
+    """PNG zabalené reportlabem do jednostránkového PDF velikosti karty."""
+    data = io.BytesIO()
+    c = canvas.Canvas(data, pagesize=(sirka, vyska))
+    c.drawImage(str(png_file), 0, 0, width=sirka, height=vyska, preserveAspectRatio=True, anchor="sw")
     c.save()
-    print(f"✅ Lícové PDF vytvořeno: {OUTPUT_PDF}")
+    data.seek(0)
+    return data
+
+class FormyPdf:
+    """Form XObjecty souborů (PDF nebo PNG) v jednom PdfWriteru; každý obsah se načte a vloží jednou."""
+
+    def __init__(self, writer, predpona):
+        self.writer = writer
+        self.sdilene = SdileneObjekty(predpona)
+        self.formy = {}
+
+    def forma(self, soubor, umisteni):
+        """(jméno, odkaz, mediabox); každé volání je jeden výskyt v souhrnu sdílení.
+        PNG se zabalí do PDF velikosti karty z umístění."""
+        jmeno, novy = self.sdilene.registruj(soubor)
+        if novy:
+            if Path(soubor).suffix.lower() == ".pdf":
+                stranka = PdfReader(str(soubor)).pages[0]
+            else:
+                stranka = PdfReader(pdf_z_png(soubor, umisteni.sirka, umisteni.vyska)).pages[0]
+            self.formy[jmeno] = forma_ze_stranky(self.writer, stranka)
+        odkaz, box = self.formy[jmeno]
+        return NameObject(jmeno), odkaz, box
+
+def umisteni_karty(forma, umisteni, zdroje):
+    """Příkaz obsahu stránky, který formu vloží na místo karty (impozice.Umisteni)."""
+    jmeno, odkaz, box = forma
+    zdroje[jmeno] = odkaz
+    return "q " + " ".join(f"{v:.6f}" for v in umisteni.matice(box)) + f" cm {jmeno} Do Q"
+
+class VektorovyArch:
+    """
+    Archy přes PyPDF2, karta je jednostránkové PDF z Inkscape. Stránka karty se
+    do výstupu vloží jednou jako Form XObject a každý výskyt na arších je jen
+    odkaz s posunem (q ... cm /K0 Do Q), text tak zůstává vektorový.
+    Karta bez PDF se vloží z PNG (reportlab ji zabalí do jednostránkového PDF).
+    """
+
+    def __init__(self, output_pdf, sirka, vyska):
+        self.output_pdf = output_pdf
+        self.sirka, self.vyska = sirka, vyska
+        self.writer = PdfWriter()
+        self.formy = FormyPdf(self.writer, "/K")
+        self.sdilene = self.formy.sdilene
+        self.obsah = []
+        self.zdroje = DictionaryObject()
+
+    def karta(self, soubor, umisteni):
+        self.obsah.append(umisteni_karty(self.formy.forma(soubor, umisteni), umisteni, self.zdroje))
+
+    def strana(self):
+        stranka_s_formami(self.writer, self.sirka, self.vyska, self.obsah, self.zdroje)
+        self.obsah = []
+        self.zdroje = DictionaryObject()
+
+    def uloz(self):
+        with open(self.output_pdf, "wb") as f:
+            self.writer.write(f)
+
+# ---------------- Rubové archy ----------------
+# Rub vzácnosti je data/<vzacnost>.pdf (nebo .png; dřívější src/<Vzacnost>.pdf se při
+# prvním tisku do data/ zkopíruje, viz prevezmi_stary_rub), vlastní rub karty data/ruby/<nazev>.pdf
+# (nebo .png, případně soubor ze sloupce "Rub" v Excelu). Rub velikosti karty se skládá
+# zrcadlově k lícům (Umisteni.zrcadlit): při oboustranném tisku přes dlouhou hranu leží
+# zadní strana karty zrcadlově podle svislé osy archu, levý sloupec líce je pravý sloupec rubu.
+# Rub velikosti celého archu (dřívější formát) se vloží jako podklad beze změny.
+RUBY_DIR = "ruby"
+PRIPONY_RUBU = (".pdf", ".png")
+
+def je_arch(box, sirka, vyska):
+    """Rub navržený na celý arch (pokryje aspoň 80 % šířky i výšky), ne na jednu kartu."""
+    x0, y0, x1, y1 = box
+    return x1 - x0 >= 0.8 * sirka and y1 - y0 >= 0.8 * vyska
+
+def find_rub(soubor_bez_pripony: Path) -> Path:
+    for pripona in PRIPONY_RUBU:
+        if soubor_bez_pripony.with_suffix(pripona).exists():
+            return soubor_bez_pripony.with_suffix(pripona)
+    return None
+
+def stara_mista_rubu():
+    """Kde ležely ruby vzácností před data/: pracovní složka (main.py) a složka skriptů."""
+    mista = [Path.cwd(), Path(__file__).resolve().parent]
+    return [slozka for i, slozka in enumerate(mista) if slozka.is_dir() and slozka not in mista[:i]]
 
-def create_backed_pdf():
-    """Za každou stránku líců vloží rub odpovídající vzácnosti stránky."""
-    df = pd.read_excel(EXCEL_FILE)
+def prevezmi_stary_rub(back_dir: Path, vzacnost) -> Path:
+    """
+    Rub vzácnosti ze starého umístění (<Vzacnost>.pdf vedle skriptů) jednou zkopíruje
+    do back_dir, aby starší projekty o ruby nepřišly. Vrátí novou cestu nebo None.
+    """
+    for pripona in PRIPONY_RUBU:
+        hledany = f"{vzacnost}{pripona}".lower()
+        for slozka in stara_mista_rubu():
+            for soubor in sorted(slozka.iterdir()):
+                if soubor.is_file() and soubor.name.lower() == hledany:
+                    cil = back_dir / f"{vzacnost}{pripona}"
+                    shutil.copy2(soubor, cil)
+                    print(f"Rub pro '{vzacnost}' zkopírován ze starého umístění {soubor} do {cil}, "
+                          f"dál se čte odtud.")
+                    return cil
+    return None
+
+def find_rub_karty(ruby_dir: Path, row) -> Path:
+    """Vlastní rub karty: sloupec "Rub" (soubor v data/ruby), jinak data/ruby/<nazev>.pdf|png."""
+    vlastni = row.get("Rub")
+    if isinstance(vlastni, str) and vlastni.strip():
+        soubor = ruby_dir / vlastni.strip()
+        if soubor.suffix and soubor.exists():
+            return soubor
+        nalezeny = find_rub(soubor)
+        if nalezeny is None:
+            print(f"⚠️ Rub '{vlastni}' karty '{row.get('Nazev', '')}' nenalezen v {ruby_dir}.")
+        return nalezeny
+    nazev = str(row.get("Nazev", "")).strip()
+    return find_rub(ruby_dir / clean_filename(nazev)) if nazev else None
+
+class StavitelRubu:
+    """Skládá rubové archy do PdfWriteru; každý návrh rubu se načte jednou."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.formy = FormyPdf(writer, "/R")
+        self.sdilene = self.formy.sdilene
+
+    def arch(self, strana):
+        """Přidá rub za arch; False, když arch žádný rub nemá."""
+        obsah = []
+        zdroje = DictionaryObject()
+        sirka, vyska = strana.sirka, strana.vyska
+        rub_vzacnosti = forma_vzacnosti = None
+        if strana.rub is not None:
+            forma = self.formy.forma(strana.rub, strana.sloty[0][0])
+            jmeno, _, (x0, y0, x1, y1) = forma
+            if je_arch(forma[2], sirka, vyska):
+                zdroje[jmeno] = forma[1]
+                obsah.append(f"q 1 0 0 1 {0 - x0:.4f} {0 - y0:.4f} cm {jmeno} Do Q")
+            else:
+                rub_vzacnosti, forma_vzacnosti = strana.rub, forma  # už započtená pro první slot
+
+        for umisteni, _, _, rub in strana.sloty:
+            if rub is not None:
+                forma = self.formy.forma(rub, umisteni)
+            elif rub_vzacnosti is not None:
+                forma = forma_vzacnosti or self.formy.forma(rub_vzacnosti, umisteni)
+                forma_vzacnosti = None
+            else:
+                continue
+            obsah.append(umisteni_karty(forma, umisteni.zrcadlit(sirka), zdroje))
+
+        if not obsah:
+            return False
+        stranka_s_formami(self.writer, sirka, vyska, obsah, zdroje)
+        return True
+
+# ---------------- Plán tisku ----------------
+# Sešit se čte jednou a vznikne z něj seznam archů: kde na kterém archu leží která
+# kopie které karty (impozice.rozlozit) a jaký rub patří za arch. Líce i oboustranné
+# PDF se kreslí podle téhož plánu, počty stránek tak vždy sedí.
+class StranaPlanu:
+    """Jeden arch: karty (Umisteni, soubor, název, vlastní rub nebo None) a rub vzácnosti."""
+
+    def __init__(self, vzacnost, rub, sirka, vyska):
+        self.vzacnost = vzacnost
+        self.rub = rub
+        self.sirka, self.vyska = sirka, vyska
+        self.sloty = []
+
+def pocet_kopii(row):
+    pocet = row.get("Pocet", 1)
+    try:
+        return int(pocet) if not math.isnan(pocet) else 1
+    except (TypeError, ValueError):
+        return 1
+
+def naplanuj_tisk(excel_file, png_root, back_dir, pdf_root=None, rozvrzeni=None):
+    """Vrátí seznam StranaPlanu; každá vzácnost začíná na novém archu."""
+    rozvrzeni = rozvrzeni or Rozvrzeni()
+    df = nacti_excel(excel_file)
     df = df.sort_values(["Vzacnost", "Nazev"])
+    plan = []
+    bez_pdf = vlastni_ruby = 0
 
-    # spočítáme počet stránek pro každou vzácnost
-    rarity_pages = []
     for vzacnost, group in df.groupby("Vzacnost"):
-        total_cards = group["Pocet"].fillna(1).astype(int).sum()
-        num_pages = math.ceil(total_cards / PER_PAGE)
-        rarity_pages.extend([vzacnost] * num_pages)
+        rar_dir = find_rarity_dir(png_root, vzacnost) if png_root.exists() else None
+        rub = find_rub(back_dir / str(vzacnost)) or prevezmi_stary_rub(back_dir, vzacnost)
+        if rub is None:
+            print(f"⚠️ Rub pro '{vzacnost}' nenalezen, archy budou bez rubu (kromě karet s vlastním rubem).")
+        karty = []
 
-    reader = PdfReader(OUTPUT_PDF)
-    writer = PdfWriter()
+        for _, row in group.iterrows():
+            karta_file = find_pdf(pdf_root, row)
+            if karta_file is None:
+                karta_file = find_png(png_root, rar_dir, row)
+                if not karta_file.exists():
+                    print(f"⚠️ Chybí PNG pro kartu: {karta_file}")
+                    continue
+                if pdf_root is not None:
+                    bez_pdf += 1
+            rub_karty = find_rub_karty(back_dir / RUBY_DIR, row)
+            if rub_karty is not None:
+                vlastni_ruby += 1
 
-    if len(rarity_pages) != len(reader.pages):
-        print(f"⚠️ Počet stránek a vzácností nesedí, použiji minimum")
-        rarity_pages = rarity_pages[:len(reader.pages)]
+            sirka, vyska = rozvrzeni.rozmer_karty(row.get("Rozmer"))
+            karty += [(sirka, vyska, (karta_file, str(row.get("Nazev", "")), rub_karty))] * pocet_kopii(row)
 
-    for i, page in enumerate(reader.pages):
-        vzacnost = rarity_pages[i]
-        writer.add_page(page)  # líc
+        archy, nevejde = rozlozit(karty, rozvrzeni)
+        for nazev in sorted({nazev for _, nazev, _ in nevejde}):
+            print(f"⚠️ Karta '{nazev}' se nevejde na arch ({rozvrzeni.popis()}), vynechána.")
+        for arch in archy:
+            strana = StranaPlanu(vzacnost, rub, rozvrzeni.sirka, rozvrzeni.vyska)
+            strana.sloty = [(umisteni, *karta) for umisteni, karta in arch]
+            plan.append(strana)
 
-        back_pdf = Path(f"{vzacnost}.pdf")
-        if back_pdf.exists():
-            back_reader = PdfReader(back_pdf)
-            writer.add_page(back_reader.pages[0])  # rub
-        else:
-            print(f"⚠️ Rubový PDF pro '{vzacnost}' nenalezen, pokračuji bez něj.")
+    if bez_pdf:
+        print(f"⚠️ {bez_pdf} karet nemá PDF z převodu, vloženy jsou z PNG (spusťte Převod).")
+    if vlastni_ruby:
+        print(f"Vlastní rub má {vlastni_ruby} karet ({back_dir / RUBY_DIR}).")
+    karet = sum(len(strana.sloty) for strana in plan)
+    otocenych = sum(1 for strana in plan for umisteni, *_ in strana.sloty if umisteni.otoceni)
+    print(f"Plán tisku: {karet} karet na {len(plan)} arších ({rozvrzeni.popis()}"
+          f"{f', otočeno {otocenych} karet' if otocenych else ''}).")
+    return plan
+
+def create_print_pdf(plan, output_pdf, vektorove=False):
+    """Vytvoří PDF s lícovými stranami karet podle plánu; vektorově z PDF karet."""
+    rozmer = plan[0] if plan else Rozvrzeni()
+    sirka, vyska = rozmer.sirka, rozmer.vyska
+    arch = VektorovyArch(output_pdf, sirka, vyska) if vektorove else RastrovyArch(output_pdf, sirka, vyska)
+    for strana in plan:
+        for umisteni, karta_file, _, _ in strana.sloty:
+            arch.karta(karta_file, umisteni)
+        arch.strana()
+    arch.uloz()
+    print(f"✅ Lícové PDF vytvořeno{' (vektorově)' if vektorove else ''}: {output_pdf}")
+    print("   " + arch.sdilene.souhrn("Karty"))
 
-    with open(FINAL_PDF, "wb") as f:
+def create_backed_pdf(plan, output_pdf, final_pdf):
+    """
+    Za každý arch líců vloží rubový arch podle plánu (viz StavitelRubu). Každý návrh
+    rubu je ve výstupu jednou jako Form XObject, archy rubů na něj jen odkazují.
+    """
+    reader = PdfReader(output_pdf)
+    if len(reader.pages) != len(plan):
+        raise RuntimeError(f"Lícové PDF má {len(reader.pages)} stran, plán {len(plan)} archů: {output_pdf}")
+    writer = PdfWriter()
+    ruby = StavitelRubu(writer)
+    bez_rubu = 0
+
+    for strana, page in zip(plan, reader.pages):
+        writer.add_page(page)  # líc
+        if not ruby.arch(strana):  # rub
+            bez_rubu += 1
+
+    with open(final_pdf, "wb") as f:
         writer.write(f)
 
-    print(f"✅ Oboustranné PDF vytvořeno: {FINAL_PDF}")
+    print(f"✅ Oboustranné PDF vytvořeno: {final_pdf}")
+    print("   " + ruby.sdilene.souhrn("Ruby"))
+    if bez_rubu:
+        print(f"⚠️ {bez_rubu} archů je bez rubu.")
+
+# ---------------- Proudový tisk ----------------
+# tisk.proudove: líce i oboustranné PDF vznikají v jednom průchodu plánem a stránky
+# se zapisují průběžně (ProudovyPdfWriter), nic se nenačítá zpět. tisk.svazek_archu
+# rozdělí výstup na svazky po N arších (karty_tisk_001.pdf, ...); každý svazek je
+# samostatné PDF, rub zůstává vždy hned za svým lícem.
+def cesta_svazku(pdf, cislo, pocet):
+    pdf = Path(pdf)
+    return pdf if pocet == 1 else pdf.with_name(f"{pdf.stem}_{cislo:03}{pdf.suffix}")
+
+def arch_karet(writer, formy, strana):
+    zdroje = DictionaryObject()
+    obsah = [umisteni_karty(formy.forma(soubor, umisteni), umisteni, zdroje)
+             for umisteni, soubor, _, _ in strana.sloty]
+    stranka_s_formami(writer, strana.sirka, strana.vyska, obsah, zdroje)
+
+def create_pdf_proudove(plan, output_pdf, final_pdf, svazek_archu=0):
+    """Líce i oboustranné PDF podle plánu v jednom průchodu, volitelně po svazcích."""
+    velikost = svazek_archu if svazek_archu and svazek_archu > 0 else max(len(plan), 1)
+    svazky = [plan[i:i + velikost] for i in range(0, len(plan), velikost)] or [[]]
+    karty, ruby = SdileneObjekty(""), SdileneObjekty("")
+    bez_rubu = 0
+
+    for cislo, svazek in enumerate(svazky, 1):
+        licove, oboustranne = cesta_svazku(output_pdf, cislo, len(svazky)), cesta_svazku(final_pdf, cislo, len(svazky))
+        with ProudovyPdfWriter(licove) as lic, ProudovyPdfWriter(oboustranne) as obo:
+            formy_lic, formy_obo = FormyPdf(lic, "/K"), FormyPdf(obo, "/K")
+            stavitel = StavitelRubu(obo)
+            for strana in svazek:
+                arch_karet(lic, formy_lic, strana)
+                arch_karet(obo, formy_obo, strana)  # líc
+                if not stavitel.arch(strana):  # rub
+                    bez_rubu += 1
+        karty.pricti(formy_lic.sdilene)
+        ruby.pricti(stavitel.sdilene)
+        if len(svazky) > 1:
+            print(f"   Svazek {cislo}/{len(svazky)}: {len(svazek)} archů → {licove.name}, {oboustranne.name}")
+
+    print(f"✅ Lícové a oboustranné PDF vytvořeno proudově: {cesta_svazku(output_pdf, 1, len(svazky))}, "
+          f"{cesta_svazku(final_pdf, 1, len(svazky))}" + (f" a další ({len(svazky)} svazků)" if len(svazky) > 1 else ""))
+    print("   " + karty.souhrn("Karty"))
+    print("   " + ruby.souhrn("Ruby"))
+    if bez_rubu:
+        print(f"⚠️ {bez_rubu} archů je bez rubu.")
+
+def main():
+    # ---------------- Cesta k projektu ----------------
+    if len(sys.argv) < 2:
+        print("Nebyla předána cesta k projektu.")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    data_dir = project_path / "data"
+    output_dir = project_path / "vystup"
+
+    config_path = project_path / "config.json"
+    if not config_path.exists():
+        print(f"Chybí config soubor: {config_path}")
+        sys.exit(1)
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    excel_file = data_dir / config["zdroje"].get("excel", "")
+    if not excel_file.exists():
+        print(f"Excel soubor nenalezen: {excel_file}")
+        sys.exit(1)
+
+    png_root = output_dir / "vystup_png"
+    # tisk.vektorove: karty z vystup_pdf (PDF z převodu) místo bitmap
+    tisk = config.get("tisk", {})
+    pdf_root = output_dir / "vystup_pdf" if tisk.get("vektorove", False) else None
+    if not png_root.exists() and (pdf_root is None or not pdf_root.exists()):
+        print(f"Složka s PNG neexistuje: {png_root}")
+        sys.exit(1)
+
+    output_pdf = output_dir / "karty_tisk.pdf"
+    final_pdf = output_dir / "karty_tisk_oboustranne.pdf"
+
+    rozvrzeni = Rozvrzeni(config)   # generator.rozměr_karty, tisk.arch, okraje a otáčení
+    plan = naplanuj_tisk(excel_file, png_root, data_dir, pdf_root, rozvrzeni)   # ruby z data/<vzacnost>.pdf a data/ruby/
+    if tisk.get("proudove", False) and not lze_proudove():
+        print(f"⚠️ Proudový tisk je ověřený jen s PyPDF2 {', '.join(PYPDF2_PROUDOVE)} "
+              f"(nainstalováno {PyPDF2.__version__}), PDF se vytvoří běžně.")
+    elif tisk.get("proudove", False):
+        # velké náklady: stránky rovnou na disk, paměť nezávisí na počtu archů
+        create_pdf_proudove(plan, output_pdf, final_pdf, int(tisk.get("svazek_archu", 0) or 0))
+        return
+    create_print_pdf(plan, output_pdf, vektorove=pdf_root is not None)    # vytvoří lícové PDF
+    create_backed_pdf(plan, output_pdf, final_pdf)   # za každou stránku vloží zrcadlený rubový arch
 
 if __name__ == "__main__":
-    create_print_pdf()    # vytvoří lícové PDF
-    create_backed_pdf()   # vloží ruby za každou stránku
+    main()
 
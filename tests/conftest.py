@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+# moduly v src/ se importují navzájem bez balíčku (from tabulka import ...)
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
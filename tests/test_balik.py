@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import struct
+import pytest
+import balik
+from balik import CteniBaliku, ZapisBaliku
+
+KARTA = ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+         '<image xlink:href="../../assety/obr.png"/><image xlink:href="data:image/png;base64,AA=="/></svg>')
+
+def zapis(balik_path, karty):
+    with ZapisBaliku(balik_path) as z:
+        for soubor, data in karty.items():
+            z.pridej(soubor, data.encode("utf-8"), {"nazev": soubor, "pocet": 1})
+
+def test_manifest_a_offsety(tmp_path):
+    balik_path = tmp_path / "karty.zip"
+    karty = {"postavy/Rytir.svg": KARTA, "mista/Hrad.svg": "<svg/>"}
+    zapis(balik_path, karty)
+    obsah = balik.nacti_obsah(balik_path)
+    assert set(obsah) == set(karty)
+    surovy = balik_path.read_bytes()
+    for soubor, zaznam in obsah.items():
+        assert zaznam["nazev"] == soubor
+        assert zaznam["velikost"] == len(karty[soubor].encode("utf-8"))
+        # offset ukazuje na lokální hlavičku právě této položky
+        hlavicka = surovy[zaznam["offset"]:zaznam["offset"] + 30]
+        assert hlavicka[:4] == b"PK\x03\x04"
+        delka_jmena = struct.unpack("<H", hlavicka[26:28])[0]
+        assert surovy[zaznam["offset"] + 30:zaznam["offset"] + 30 + delka_jmena].decode() == soubor
+    with CteniBaliku(balik_path, tmp_path / "vystup_svg") as cteni:
+        assert cteni.precti("mista/Hrad.svg") == b"<svg/>"
+        assert cteni.velikost("postavy/Rytir.svg") == len(KARTA.encode("utf-8"))
+
+def test_docasny_soubor_ma_absolutni_odkazy(tmp_path):
+    balik_path = tmp_path / "karty.zip"
+    svg_dir = tmp_path / "vystup" / "vystup_svg"
+    zapis(balik_path, {"postavy/Rytir.svg": KARTA})
+    with CteniBaliku(balik_path, svg_dir) as cteni:
+        with cteni.docasny_soubor("postavy/Rytir.svg") as cesta:
+            text = cesta.read_text(encoding="utf-8")
+            assert (tmp_path / "vystup" / "assety" / "obr.png").resolve().as_uri() in text
+            assert "data:image/png;base64,AA==" in text
+        assert not cesta.exists()
+
+def test_nepovedeny_zapis_necha_stary_balik(tmp_path):
+    balik_path = tmp_path / "karty.zip"
+    zapis(balik_path, {"a.svg": "<svg/>"})
+    with pytest.raises(RuntimeError):
+        with ZapisBaliku(balik_path) as z:
+            z.pridej("b.svg", b"<svg/>", {})
+            raise RuntimeError("generátor spadl")
+    assert set(balik.nacti_obsah(balik_path)) == {"a.svg"}
+    assert not balik_path.with_name("karty.zip.tmp").exists()
+
+def test_volny_soubor_ma_prednost(tmp_path):
+    balik_path = tmp_path / "karty.zip"
+    svg_dir = tmp_path / "vystup_svg"
+    (svg_dir / "postavy").mkdir(parents=True)
+    (svg_dir / "postavy" / "Rytir.svg").write_text("<svg/>", encoding="utf-8")
+    zapis(balik_path, {"postavy/Rytir.svg": KARTA, "mista/Hrad.svg": "<svg/>"})
+    assert balik.karty_k_prevodu(svg_dir, balik_path) == [
+        ("mista/Hrad.svg", None),
+        ("postavy/Rytir.svg", svg_dir / "postavy" / "Rytir.svg"),
+    ]
+
+def test_chybejici_nebo_poskozeny_balik(tmp_path):
+    assert balik.nacti_obsah(tmp_path / "neni.zip") == {}
+    (tmp_path / "rozbity.zip").write_bytes(b"neni zip")
+    assert balik.nacti_obsah(tmp_path / "rozbity.zip") == {}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import json
+import fronta
+from fronta import FrontaPrevodu
+
+NASTAVENI = {"dpi": 300, "export": {"profil": "tisk"}}
+
+def ulohy(*karty):
+    return [(rel, None, f"hash-{rel}") for rel in karty]
+
+def test_navazani_po_prerusenem_behu(tmp_path):
+    cesta = tmp_path / "prevod_fronta.json"
+    prvni = FrontaPrevodu(cesta, NASTAVENI, interval=0)
+    prvni.naplanuj(ulohy("a.svg", "b.svg", "c.svg"), {})
+    prvni.oznac("a.svg", True)
+    prvni.oznac("b.svg", False, "Inkscape spadl")
+    # pád: dokonci() se nezavolá, na disku zůstane rozpracovaný stav
+
+    druhy = FrontaPrevodu(cesta, NASTAVENI)
+    hashe = {rel: h for rel, _, h in ulohy("a.svg", "b.svg", "c.svg")}
+    assert druhy.hotove(hashe) == {"a.svg": "hash-a.svg"}
+    assert druhy.karty["b.svg"]["stav"] == fronta.STAV_CHYBA
+    assert druhy.karty["c.svg"]["stav"] == fronta.STAV_CEKA
+
+    # karta změněná od přerušení se převede znovu
+    assert druhy.hotove({**hashe, "a.svg": "jiny"}) == {}
+
+def test_jine_nastaveni_zahodi_rozpracovany_beh(tmp_path):
+    cesta = tmp_path / "prevod_fronta.json"
+    prvni = FrontaPrevodu(cesta, NASTAVENI, interval=0)
+    prvni.naplanuj(ulohy("a.svg"), {})
+    prvni.oznac("a.svg", True)
+    druhy = FrontaPrevodu(cesta, {**NASTAVENI, "dpi": 150})
+    assert druhy.karty == {}
+
+def test_chyba_zustane_a_dokonceni_necha_jen_zbytek(tmp_path):
+    cesta = tmp_path / "prevod_fronta.json"
+    f = FrontaPrevodu(cesta, NASTAVENI, interval=0)
+    f.naplanuj(ulohy("a.svg", "b.svg"), {})
+    f.oznac("a.svg", True)
+    f.oznac("b.svg", False, "chyba vykreslení")
+    f.naplanuj(ulohy("b.svg"), {})  # stejné SVG: hláška minulé chyby zůstává
+    assert f.karty["b.svg"] == {"hash": "hash-b.svg", "stav": fronta.STAV_CEKA, "priorita": 0,
+                                "chyba": "chyba vykreslení"}
+    f.dokonci({"b.svg"})
+    data = json.loads(cesta.read_text(encoding="utf-8"))
+    assert list(data["karty"]) == ["b.svg"]
+
+def test_poradi_podle_priority_a_casu_ulozeni(tmp_path):
+    svg = tmp_path / "vystup_svg"
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "saved_files.json").write_text(json.dumps([str(svg / "x" / "ulozena.svg"),
+                                                       str(svg / "x" / "stara.svg"),
+                                                       "/jinde/cizi.svg"]), encoding="utf-8")
+    (data / "marked_files.json").write_text(json.dumps([str(svg / "x" / "oznacena.svg")]), encoding="utf-8")
+    priority = fronta.priority_karet(tmp_path, svg, prednost=["x/prednostni"])
+    assert priority == {"x/ulozena.svg": fronta.PRIORITA_ULOZENE, "x/stara.svg": fronta.PRIORITA_ULOZENE,
+                        "x/oznacena.svg": fronta.PRIORITA_OZNACENE,
+                        "x/prednostni.svg": fronta.PRIORITA_PREDNOST}
+
+    casy = {"x/ulozena.svg": 200, "x/stara.svg": 100}
+    f = FrontaPrevodu(data / "prevod_fronta.json", NASTAVENI)
+    poradi = f.naplanuj(ulohy("a.svg", "x/stara.svg", "x/oznacena.svg", "x/ulozena.svg", "x/prednostni.svg"),
+                        priority, lambda rel, zdroj: casy.get(rel, 0))
+    assert [rel for rel, _, _ in poradi] == ["x/prednostni.svg", "x/oznacena.svg", "x/ulozena.svg",
+                                             "x/stara.svg", "a.svg"]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+from generator import kontrola
+from sablona import Sablona
+
+SABLONA = """<svg xmlns="http://www.w3.org/2000/svg"
+     xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape">
+  <g inkscape:label="Kategorie">
+    <g inkscape:label="postavy"/>
+    <g inkscape:label="mista"/>
+  </g>
+  <g inkscape:label="Vzacnost">
+    <g inkscape:label="bezna"/>
+    <g inkscape:label="vzacna"/>
+  </g>
+  <text>Nazev</text>
+  <text>Popis</text>
+</svg>
+"""
+
+@pytest.fixture
+def sablona(tmp_path):
+    soubor = tmp_path / "sablona.svg"
+    soubor.write_text(SABLONA, encoding="utf-8")
+    return Sablona(soubor)
+
+def test_kontrola_platne_tabulky(sablona):
+    df = pd.DataFrame({
+        "Nazev": ["Rytíř", "Hrad"],
+        "Kategorie": ["postavy", "mista"],
+        "Vzacnost": ["Běžná", "vzacna"],
+        "Popis": ["a", "b"],
+    })
+    chyby, upozorneni = kontrola(df, sablona)
+    assert chyby == []
+    assert upozorneni == ["Sloupce bez placeholderu v šabloně: Kategorie, Vzacnost"]
+
+def test_kontrola_hlasi_chyby_po_sloupcich(sablona):
+    df = pd.DataFrame({
+        "Nazev": ["Rytíř", "Rytir", "Drak"],
+        "Kategorie": ["postavy", "postavy", "neznama"],
+        "Vzacnost": ["bezna", "bezna", "mytická"],
+    })
+    chyby, _ = kontrola(df, sablona)
+    assert "Kategorie 'neznama' nebyla nalezena v šabloně (řádky: 4)" in chyby
+    assert "Vzacnost 'myticka' nebyla nalezena v šabloně (řádky: 4)" in chyby
+    assert "Více karet se uloží do stejného souboru postavy/Rytir.svg (řádky: 2, 3)" in chyby
+
+def test_kontrola_chybejici_sloupec(sablona):
+    chyby, _ = kontrola(pd.DataFrame({"Nazev": ["Rytíř"], "Kategorie": ["postavy"]}), sablona)
+    assert chyby == ["V Excelu chybí sloupec 'Vzacnost'."]
+
+def test_kontrola_prazdny_sloupec(sablona):
+    # žádný řádek nemá všechny povinné hodnoty, sloupec Vzacnost je celý typu float
+    df = pd.DataFrame({
+        "Nazev": ["Rytíř", "Hrad"],
+        "Kategorie": ["postavy", "mista"],
+        "Vzacnost": [float("nan"), float("nan")],
+    })
+    chyby, _ = kontrola(df, sablona)
+    assert chyby == ["Prázdný sloupec 'Vzacnost' na řádcích: 2, 3"]
+
+def test_kontrola_list_bez_radku(sablona):
+    df = pd.DataFrame({"Nazev": [], "Kategorie": [], "Vzacnost": []})
+    chyby, _ = kontrola(df, sablona)
+    assert chyby == []
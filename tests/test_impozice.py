@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import pytest
+from impozice import BODU_NA_MM, FORMATY_KARET, Rozvrzeni, Umisteni, rozlozit, rozmer_mm
+
+def mm(body):
+    return round(body / BODU_NA_MM, 3)
+
+def karty(rozvrzeni, pocet, format_karty=None):
+    sirka, vyska = rozvrzeni.rozmer_karty(format_karty)
+    return [(sirka, vyska, i) for i in range(pocet)]
+
+def prekryvaji(a, b):
+    (ax, ay), (aw, ah) = (a.x, a.y), a.stopa
+    (bx, by), (bw, bh) = (b.x, b.y), b.stopa
+    return ax < bx + bw - 1e-6 and bx < ax + aw - 1e-6 and ay < by + bh - 1e-6 and by < ay + ah - 1e-6
+
+def over_arch(arch, rozvrzeni):
+    """Každá karta leží v tiskové ploše a žádné dvě se nepřekrývají."""
+    for umisteni, _ in arch:
+        w, h = umisteni.stopa
+        assert umisteni.x >= rozvrzeni.okraj - 1e-6
+        assert umisteni.y >= rozvrzeni.okraj - 1e-6
+        assert umisteni.x + w <= rozvrzeni.sirka - rozvrzeni.okraj + 1e-6
+        assert umisteni.y + h <= rozvrzeni.vyska - rozvrzeni.okraj + 1e-6
+    umisteni = [u for u, _ in arch]
+    for i, a in enumerate(umisteni):
+        for b in umisteni[i + 1:]:
+            assert not prekryvaji(a, b)
+
+# ---------------- Rozměry ----------------
+@pytest.mark.parametrize("text, ocekavano", [
+    ("63x88mm", (63, 88)),
+    ("70 × 120", (70, 120)),
+    ("6,35x8,89cm", (63.5, 88.9)),
+    ("2.5x3.5in", (63.5, 88.9)),
+    ("Tarot", FORMATY_KARET["tarot"]),
+    ("", None),
+    ("0x88", None),
+    ("velká", None),
+    (float("nan"), None),
+])
+def test_rozmer_mm(text, ocekavano):
+    rozmer = rozmer_mm(text, FORMATY_KARET)
+    assert rozmer == ocekavano or rozmer == pytest.approx(ocekavano)
+
+def test_stara_vychozi_karta_zustava_standard():
+    assert Rozvrzeni({"generator": {"rozměr_karty": "63x88mm"}}).karta == Rozvrzeni().karta
+    assert tuple(map(mm, Rozvrzeni().karta)) == (63.5, 88.9)
+    assert tuple(map(mm, Rozvrzeni({"generator": {"rozměr_karty": "63x88"}}).karta)) == (63, 88)
+
+# ---------------- Skládání ----------------
+def test_stejne_karty_jako_mrizka():
+    rozvrzeni = Rozvrzeni()
+    archy, nevejde = rozlozit(karty(rozvrzeni, 20), rozvrzeni)
+    assert nevejde == []
+    assert [len(arch) for arch in archy] == [9, 9, 2]
+    # řádky zleva doprava shora dolů, okraj 7 mm a mezera 2 mm jako dřívější pevná mřížka
+    assert [(mm(u.x), mm(u.y)) for u, _ in archy[0]] == [
+        (7, 201.1), (72.5, 201.1), (138, 201.1),
+        (7, 110.2), (72.5, 110.2), (138, 110.2),
+        (7, 19.3), (72.5, 19.3), (138, 19.3),
+    ]
+    assert [data for arch in archy for _, data in arch] == list(range(20))  # pořadí tisku zůstává
+
+def test_otaceni_usetri_archy():
+    bez = Rozvrzeni()
+    s = Rozvrzeni({"tisk": {"otaceni": True}})
+    archy_bez, _ = rozlozit(karty(bez, 100, "mini"), bez)
+    archy_s, _ = rozlozit(karty(s, 100, "mini"), s)
+    assert (len(archy_bez), len(archy_s)) == (7, 6)
+    assert any(u.otoceni for arch in archy_s for u, _ in arch)
+    for arch in archy_s:
+        over_arch(arch, s)
+
+def test_smes_rozmeru_bez_prekryvu():
+    rozvrzeni = Rozvrzeni({"tisk": {"otaceni": True}})
+    smes = (karty(rozvrzeni, 7, "tarot") + karty(rozvrzeni, 13, "standard")
+            + karty(rozvrzeni, 11, "mini") + karty(rozvrzeni, 5, "45x45"))
+    archy, nevejde = rozlozit(smes, rozvrzeni)
+    assert nevejde == []
+    assert sum(len(arch) for arch in archy) == len(smes)
+    for arch in archy:
+        over_arch(arch, rozvrzeni)
+
+def test_prilis_velka_karta_se_vynecha():
+    rozvrzeni = Rozvrzeni()
+    velka = rozvrzeni.rozmer_karty("200x290")
+    archy, nevejde = rozlozit([(*velka, "plakat")] + karty(rozvrzeni, 2), rozvrzeni)
+    assert nevejde == ["plakat"]
+    assert [len(arch) for arch in archy] == [2]
+
+# ---------------- Rub a matice ----------------
+def test_zrcadlit_podle_svisle_osy():
+    rozvrzeni = Rozvrzeni({"tisk": {"otaceni": True}})
+    archy, _ = rozlozit(karty(rozvrzeni, 18, "mini"), rozvrzeni)
+    arch = archy[0]
+    ruby = [(u.zrcadlit(rozvrzeni.sirka), data) for u, data in arch]
+    over_arch(ruby, rozvrzeni)
+    for (lic, _), (rub, _) in zip(arch, ruby):
+        assert rub.y == lic.y
+        assert rub.stopa == lic.stopa
+        assert rub.otoceni == -lic.otoceni
+        # střed rubu je zrcadlový obraz středu líce
+        assert rub.x + rub.stopa[0] / 2 == pytest.approx(rozvrzeni.sirka - (lic.x + lic.stopa[0] / 2))
+        zpet = rub.zrcadlit(rozvrzeni.sirka)
+        assert (zpet.x, zpet.y, zpet.otoceni) == pytest.approx((lic.x, lic.y, lic.otoceni))
+
+def test_zrcadlit_levy_sloupec_je_pravy():
+    rozvrzeni = Rozvrzeni()
+    archy, _ = rozlozit(karty(rozvrzeni, 3), rozvrzeni)
+    sirka = rozvrzeni.karta[0]
+    ruby = [u.zrcadlit(rozvrzeni.sirka) for u, _ in archy[0]]
+    # rub první karty má pravý okraj tam, kde má líc levý (od pravé hrany archu)
+    assert [mm(rozvrzeni.sirka - (u.x + sirka)) for u in ruby] == [7, 72.5, 138]
+    assert ruby[0].x > ruby[1].x > ruby[2].x
+
+@pytest.mark.parametrize("otoceni", [0, 90, -90])
+def test_matice_mapuje_ramecek_na_stopu(otoceni):
+    umisteni = Umisteni(100, 50, 180, 252, otoceni)
+    box = (10, 20, 190, 272)  # stejný poměr stran jako karta, jen posunutý
+    a, b, c, d, e, f = umisteni.matice(box)
+    rohy = [(a * x + c * y + e, b * x + d * y + f) for x in (box[0], box[2]) for y in (box[1], box[3])]
+    w, h = umisteni.stopa
+    assert min(x for x, _ in rohy) == pytest.approx(100)
+    assert max(x for x, _ in rohy) == pytest.approx(100 + w)
+    assert min(y for _, y in rohy) == pytest.approx(50)
+    assert max(y for _, y in rohy) == pytest.approx(50 + h)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from PIL import Image
+import kodovani
+
+def test_ztratovy_profil_necha_png_predlohu(tmp_path):
+    predloha = tmp_path / "karta.png"
+    Image.new("RGBA", (30, 40), (200, 10, 10, 255)).save(predloha)
+    (tmp_path / "karta.jpg").write_bytes(b"stary jpeg")
+    nastaveni = kodovani.nastaveni_exportu({"prevod": {"profil": "web", "formát": "WEBP"}})
+    with Image.open(predloha) as img:
+        cil = kodovani.zakodovat(img, predloha.with_suffix(kodovani.pripona(nastaveni)), nastaveni)
+    kodovani.smazat_ostatni_formaty(cil)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["karta.png", "karta.webp"]
+
+def test_png_profil_smaze_ztratova_kodovani(tmp_path):
+    for pripona in (".png", ".webp", ".jpg"):
+        (tmp_path / f"karta{pripona}").write_bytes(b"x")
+    kodovani.smazat_ostatni_formaty(tmp_path / "karta.png")
+    assert [p.name for p in tmp_path.iterdir()] == ["karta.png"]
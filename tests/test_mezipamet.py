@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import os
+import mezipamet
+from mezipamet import Mezipamet
+
+KB = 1024
+
+def naplnit(pamet, klice, velikost):
+    for i, k in enumerate(klice):
+        pamet.uloz(k, bytes([i]) * velikost)
+        os.utime(pamet.cesta(k), (1_000_000 + i, 1_000_000 + i))  # starší klíče dřív použité
+
+def test_klic_zavisi_na_vsem_co_meni_obrazek():
+    zaklad = mezipamet.klic("abc", 300)
+    assert zaklad == mezipamet.klic("abc", 300.0, "page", "inkscape")
+    assert len({zaklad, mezipamet.klic("abd", 300), mezipamet.klic("abc", 150),
+                mezipamet.klic("abc", 300, "drawing"), mezipamet.klic("abc", 300, vykreslovani="cairo")}) == 5
+
+def test_uklid_maze_nejdele_nepouzite(tmp_path):
+    pamet = Mezipamet(tmp_path, limit_mb=1)
+    klice = [mezipamet.klic(str(i), 300) for i in range(4)]
+    naplnit(pamet, klice, 400 * KB)
+    assert pamet.nacti(klice[0]) is not None  # nejstarší se právě použil, stává se nejnovějším
+
+    smazano, zbyva = pamet.uklid()
+    assert (smazano, zbyva) == (2, 800 * KB)
+    assert [pamet.cesta(k).exists() for k in klice] == [True, False, False, True]
+
+def test_pod_limitem_se_nic_nemaze(tmp_path):
+    pamet = Mezipamet(tmp_path, limit_mb=1)
+    klice = [mezipamet.klic(str(i), 300) for i in range(2)]
+    naplnit(pamet, klice, 300 * KB)
+    assert pamet.uklid() == (0, 600 * KB)
+
+def test_zasahy_a_kopie(tmp_path):
+    pamet = Mezipamet(tmp_path / "cache")
+    k = mezipamet.klic("abc", 300)
+    cil = tmp_path / "karta.png"
+    assert not pamet.zkopiruj_do(k, cil)
+    pamet.uloz(k, b"png")
+    assert pamet.zkopiruj_do(k, cil)
+    assert cil.read_bytes() == b"png"
+    assert (pamet.zasahy, pamet.minuti) == (1, 1)
+    assert [p.name for p in cil.parent.iterdir() if p.suffix == ".tmp"] == []
+
+def test_vypnuta_mezipamet(tmp_path):
+    pamet = mezipamet.mezipamet_projektu(tmp_path, {"prevod": {"mezipamet_mb": 0}})
+    k = mezipamet.klic("abc", 300)
+    pamet.uloz(k, b"png")
+    assert not pamet.zapnuta
+    assert pamet.nacti(k) is None
+    assert not mezipamet.slozka_mezipameti(tmp_path).exists()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import xml.etree.ElementTree as ET
+import pytest
+import rastr
+from rastr import Nepodporovano
+
+potrebuje_cairo = pytest.mark.skipif(not rastr.dostupny(), reason="chybí pycairo")
+
+def prvek(xml):
+    return ET.fromstring(xml)
+
+# ---------------- Délky, barvy, styly ----------------
+@pytest.mark.parametrize("hodnota, ocekavano", [
+    ("10", 10.0), ("1in", 96.0), ("25.4mm", 96.0), ("12pt", 16.0), ("-.5e1px", -5.0), ("", 3.0), (None, 3.0),
+])
+def test_delka(hodnota, ocekavano):
+    assert rastr.delka(hodnota, 3.0) == pytest.approx(ocekavano)
+
+def test_delka_relativni_a_nepodporovana():
+    assert rastr.delka("1.5em", relativni=20) == pytest.approx(30)
+    assert rastr.delka("50%", relativni=20) == pytest.approx(10)
+    with pytest.raises(Nepodporovano):
+        rastr.delka("2em")  # em bez velikosti písma
+    with pytest.raises(Nepodporovano):
+        rastr.delka("10vw")
+
+@pytest.mark.parametrize("hodnota, ocekavano", [
+    ("#f00", (1, 0, 0)), ("#00FF00", (0, 1, 0)), ("rgb(0, 0, 255)", (0, 0, 1)),
+    ("rgb(100%, 50%, 0%)", (1, 0.5, 0)), ("Navy", (0, 0, 128 / 255)), ("none", None), ("", None),
+])
+def test_barva(hodnota, ocekavano):
+    vysledek = rastr.barva(hodnota)
+    assert vysledek == (None if ocekavano is None else pytest.approx(ocekavano))
+
+def test_barva_current_a_nepodporovana():
+    assert rastr.barva("currentColor", "#ffffff") == pytest.approx((1, 1, 1))
+    for hodnota in ("hsl(0, 100%, 50%)", "#12345", "url(#grad)"):
+        with pytest.raises(Nepodporovano):
+            rastr.barva(hodnota)
+
+def test_vlastnosti_style_prebije_atribut():
+    elem = prvek('<rect xmlns="http://www.w3.org/2000/svg" fill="red" stroke="blue" style="fill:#000; opacity:0.5"/>')
+    assert rastr.vlastnosti(elem) == {"fill": "#000", "stroke": "blue", "opacity": "0.5", "style": "fill:#000; opacity:0.5"}
+
+@pytest.mark.parametrize("styl", ["filter:url(#blur)", "clip-path:url(#c)", "fill:url(#grad)", "mask:url(#m)",
+                                  "mix-blend-mode:multiply"])
+def test_vlastnosti_mimo_podmnozinu(styl):
+    with pytest.raises(Nepodporovano):
+        rastr.vlastnosti(prvek(f'<g xmlns="http://www.w3.org/2000/svg" style="{styl}"/>'))
+
+def test_vlastnosti_bez_ucinku_projdou():
+    elem = prvek('<g xmlns="http://www.w3.org/2000/svg" style="filter:none;paint-order:normal" mask="none"/>')
+    assert rastr.vlastnosti(elem)["filter"] == "none"
+
+def test_zdedit():
+    rodic = rastr.zdedit(rastr.VYCHOZI_STYL, prvek('<g xmlns="http://www.w3.org/2000/svg" style="font-size:20px;fill:red;opacity:0.5"/>'))
+    styl = rastr.zdedit(rodic, prvek('<text xmlns="http://www.w3.org/2000/svg" style="font-size:1.5em;stroke:inherit"/>'))
+    assert styl["font-size"] == "30.0px"
+    assert styl["fill"] == "red"  # dědí se
+    assert "opacity" not in styl  # nedědí se
+    assert styl["stroke"] == "none"
+
+# ---------------- Cesty a dokument ----------------
+def test_rozloz_cestu_implicitni_prikazy_a_priznaky_oblouku():
+    assert rastr.rozloz_cestu("M0,0 10 10l5-5zm1 1") == [
+        ("M", [0, 0]), ("L", [10, 10]), ("l", [5, -5]), ("z", []), ("m", [1, 1]),
+    ]
+    assert rastr.rozloz_cestu("a1 1 0 011 1") == [("a", [1, 1, 0, 0, 1, 1, 1])]
+    assert rastr.rozloz_cestu("M1.5.5L-1e1,2") == [("M", [1.5, 0.5]), ("L", [-10, 2])]
+
+@pytest.mark.parametrize("d", ["10 10", "M0 0 L5", "a1 1 0 2 1 1 1", "M0 0 X 1"])
+def test_rozloz_cestu_chyby(d):
+    with pytest.raises(Nepodporovano):
+        rastr.rozloz_cestu(d)
+
+def test_rozmer_dokumentu():
+    root = prvek('<svg xmlns="http://www.w3.org/2000/svg" width="63.5mm" height="88.9mm" viewBox="0 0 63.5 88.9"/>')
+    sirka, vyska, vb = rastr._rozmer_dokumentu(root)
+    assert (sirka, vyska) == pytest.approx((240, 336), abs=0.01)
+    assert vb == [0, 0, 63.5, 88.9]
+    root = prvek('<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="100%" viewBox="0 0 50 70"/>')
+    assert rastr._rozmer_dokumentu(root)[:2] == (50, 70)
+    for atributy in ('width="100%" height="10"', 'viewBox="0 0 10"', ''):
+        with pytest.raises(Nepodporovano):
+            rastr._rozmer_dokumentu(prvek(f'<svg xmlns="http://www.w3.org/2000/svg" {atributy}/>'))
+
+def test_pozadi_z_namedview():
+    sablona = ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd" '
+               'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape">'
+               '<sodipodi:namedview pagecolor="{barva}" inkscape:pageopacity="{nepruhlednost}"/></svg>')
+    assert rastr._pozadi(prvek(sablona.format(barva="#ffffff", nepruhlednost="1"))) == pytest.approx((1, 1, 1, 1))
+    assert rastr._pozadi(prvek(sablona.format(barva="#ffffff", nepruhlednost="0"))) is None
+    assert rastr._pozadi(prvek(sablona.format(barva="divna", nepruhlednost="1"))) is None
+
+# ---------------- Vykreslení (jen s pycairo) ----------------
+KARTA = ('<svg xmlns="http://www.w3.org/2000/svg" width="10mm" height="20mm" viewBox="0 0 10 20">'
+         '<rect x="0" y="0" width="10" height="10" fill="#ff0000"/>{navic}</svg>')
+
+@potrebuje_cairo
+def test_vykresleni_rozmer_a_barva():
+    povrch = rastr.vykreslit_povrch(KARTA.format(navic="").encode(), dpi=254)
+    assert (povrch.get_width(), povrch.get_height()) == (100, 200)
+    data = povrch.get_data()
+    stride = povrch.get_stride()
+    horni = bytes(data[50 * stride + 50 * 4:50 * stride + 50 * 4 + 4])
+    dolni = bytes(data[150 * stride + 50 * 4:150 * stride + 50 * 4 + 4])
+    assert horni == bytes([0, 0, 255, 255])  # ARGB32 little-endian: B, G, R, A
+    assert dolni[3] == 0  # průhledné
+
+@potrebuje_cairo
+@pytest.mark.parametrize("svg", [
+    KARTA.format(navic='<rect width="1" height="1" style="filter:url(#f)"/>').encode(),
+    KARTA.format(navic='<foreignObject/>').encode(),
+    b"<svg",  # poškozené SVG
+    b'<html xmlns="http://www.w3.org/1999/xhtml"/>',
+])
+def test_nepodporovane_karty_jdou_do_inkscape(svg):
+    with pytest.raises(Nepodporovano):
+        rastr.vykreslit_povrch(svg)
+
+def test_bez_cairo_vse_do_inkscape(monkeypatch):
+    monkeypatch.setattr(rastr, "cairo", None)
+    assert not rastr.dostupny()
+    with pytest.raises(Nepodporovano):
+        rastr.vykreslit_povrch(KARTA.format(navic="").encode())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import pandas as pd
+import pytest
+import tabulka
+
+@pytest.fixture
+def sesit(tmp_path):
+    cesta = tmp_path / "karty.xlsx"
+    pd.DataFrame({"Nazev": ["Rytíř", "Drak"], "Pocet": [1, 3]}).to_excel(cesta, index=False)
+    return cesta
+
+@pytest.fixture
+def parsovani(monkeypatch):
+    """Počítá skutečná čtení sešitu přes pandas."""
+    volani = []
+    puvodni = pd.read_excel
+    def read_excel(*args, **kwargs):
+        volani.append(args[0])
+        return puvodni(*args, **kwargs)
+    monkeypatch.setattr(pd, "read_excel", read_excel)
+    return volani
+
+def test_druhe_nacteni_z_cache(sesit, parsovani):
+    prvni = tabulka.nacti_excel(sesit)
+    assert (sesit.parent / "cache" / "karty.xlsx.pkl").exists()
+    druhe = tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 1
+    pd.testing.assert_frame_equal(prvni, druhe)
+
+def test_jiny_mtime_se_stejnym_obsahem_jen_potvrdi_cache(sesit, parsovani):
+    tabulka.nacti_excel(sesit)
+    stat = sesit.stat()
+    os.utime(sesit, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 1
+    meta = json.loads((sesit.parent / "cache" / "karty.xlsx.json").read_text(encoding="utf-8"))
+    assert meta["mtime_ns"] == sesit.stat().st_mtime_ns  # příště už se hash nepočítá
+
+def test_zmena_obsahu_nacte_sesit_znovu(sesit, parsovani):
+    tabulka.nacti_excel(sesit)
+    pd.DataFrame({"Nazev": ["Rytíř", "Drak", "Hrad"], "Pocet": [1, 3, 2]}).to_excel(sesit, index=False)
+    df = tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 2
+    assert list(df["Nazev"]) == ["Rytíř", "Drak", "Hrad"]
+    tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 2
+
+def test_poskozena_cache_se_nahradi(sesit, parsovani):
+    tabulka.nacti_excel(sesit)
+    (sesit.parent / "cache" / "karty.xlsx.pkl").write_bytes(b"neni pickle")
+    df = tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 2
+    assert list(df["Pocet"]) == [1, 3]
+    tabulka.nacti_excel(sesit)
+    assert len(parsovani) == 2
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import PyPDF2
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+import tisk
+from impozice import Rozvrzeni, rozlozit
+from tisk import StranaPlanu, SdileneObjekty, create_pdf_proudove, create_print_pdf, create_backed_pdf
+
+def png(cesta, barva):
+    Image.new("RGB", (63, 88), barva).save(cesta)
+    return cesta
+
+def plan_z_karet(karty, rub=None):
+    """Plán jako z naplanuj_tisk: karty = [(soubor, vlastní rub)] pro jednu vzácnost."""
+    rozvrzeni = Rozvrzeni()
+    archy, nevejde = rozlozit([(*rozvrzeni.karta, (soubor, soubor.stem, rub_karty))
+                               for soubor, rub_karty in karty], rozvrzeni)
+    assert nevejde == []
+    plan = []
+    for arch in archy:
+        strana = StranaPlanu("bezna", rub, rozvrzeni.sirka, rozvrzeni.vyska)
+        strana.sloty = [(umisteni, *karta) for umisteni, karta in arch]
+        plan.append(strana)
+    return plan
+
+@pytest.fixture
+def plan(tmp_path):
+    cervena, modra = png(tmp_path / "cervena.png", "red"), png(tmp_path / "modra.png", "blue")
+    rub, rub_modre = png(tmp_path / "rub.png", "gray"), png(tmp_path / "rub_modre.png", "green")
+    karty = [(cervena, None)] * 8 + [(modra, rub_modre)] * 4  # 9 karet na arch A4 → 2 archy
+    return plan_z_karet(karty, rub)
+
+def precti_cele(cesta):
+    """Otevře PDF striktně a rozbalí každý objekt z xref i každou formu na stránkách."""
+    reader = PdfReader(str(cesta), strict=True)
+    for cislo in range(1, reader.trailer["/Size"]):
+        reader.get_object(cislo)
+    formy = []
+    for stranka in reader.pages:
+        xobjekty = stranka["/Resources"]["/XObject"]
+        obsah = stranka.get_contents().get_data().decode("ascii")
+        for jmeno, odkaz in xobjekty.items():
+            assert f"{jmeno} Do" in obsah
+            forma = odkaz.get_object()
+            assert forma["/Subtype"] == "/Form"
+            forma.get_data()
+            formy.append(odkaz.idnum)
+    return reader, formy
+
+@pytest.mark.skipif(not tisk.lze_proudove(), reason=f"proudový zápis neověřen s PyPDF2 {PyPDF2.__version__}")
+def test_proudove_pdf_se_precte_zpet(tmp_path, plan):
+    lic, oboustranne = tmp_path / "lic.pdf", tmp_path / "obo.pdf"
+    create_pdf_proudove(plan, lic, oboustranne)
+
+    reader, formy = precti_cele(lic)
+    assert len(reader.pages) == len(plan) == 2
+    assert len(set(formy)) == 2  # každá karta vložená jednou pro všechny kopie
+
+    reader, formy = precti_cele(oboustranne)
+    assert len(reader.pages) == 2 * len(plan)
+    assert len(set(formy)) == 4  # dvě karty, rub vzácnosti a vlastní rub modré karty
+
+@pytest.mark.skipif(not tisk.lze_proudove(), reason=f"proudový zápis neověřen s PyPDF2 {PyPDF2.__version__}")
+def test_proudove_svazky(tmp_path, plan):
+    create_pdf_proudove(plan, tmp_path / "lic.pdf", tmp_path / "obo.pdf", svazek_archu=1)
+    assert not (tmp_path / "lic.pdf").exists()
+    for cislo in (1, 2):
+        reader, _ = precti_cele(tmp_path / f"lic_{cislo:03}.pdf")
+        assert len(reader.pages) == 1
+        reader, _ = precti_cele(tmp_path / f"obo_{cislo:03}.pdf")
+        assert len(reader.pages) == 2
+
+def test_bezny_zapis_ma_stejne_stranky(tmp_path, plan):
+    lic, oboustranne = tmp_path / "lic.pdf", tmp_path / "obo.pdf"
+    create_print_pdf(plan, lic)
+    create_backed_pdf(plan, lic, oboustranne)
+    assert len(PdfReader(str(lic)).pages) == 2
+    reader, formy = precti_cele(oboustranne)
+    assert len(reader.pages) == 4
+    assert len(set(formy)) == 4  # formy karet z reportlabu a dva ruby
+
+def test_rub_ze_stareho_umisteni_se_zkopiruje_jednou(tmp_path, monkeypatch):
+    stary, data = tmp_path / "stary", tmp_path / "data"
+    stary.mkdir(), data.mkdir()
+    png(stary / "Mytická.png", "gray")
+    monkeypatch.chdir(stary)
+    assert tisk.prevezmi_stary_rub(data, "mytická") == data / "mytická.png"
+    assert tisk.find_rub(data / "mytická") == data / "mytická.png"
+    assert tisk.prevezmi_stary_rub(data, "neznama") is None
+
+def test_sdilene_objekty_podle_obsahu(tmp_path):
+    a, b = png(tmp_path / "a.png", "red"), png(tmp_path / "b.png", "red")
+    sdilene = SdileneObjekty("k")
+    assert sdilene.registruj(a) == ("k0", True)
+    assert sdilene.registruj(a) == ("k0", False)
+    assert sdilene.registruj(b) == ("k0", False)  # stejný obsah pod jiným jménem
+    assert (sdilene.vlozeno, sdilene.odkazu, sdilene.usetreno) == (1, 2, 2 * a.stat().st_size)
+
+def test_sdilene_objekty_podle_jmena_pocita_jen_usporu_navic(tmp_path):
+    a, b = png(tmp_path / "a.png", "red"), png(tmp_path / "b.png", "red")
+    sdilene = SdileneObjekty("k", podle_jmena=True)
+    for soubor in (a, a, a, b):
+        sdilene.registruj(soubor)
+    # opakování a.png sloučí reportlab sám, navíc se ušetří jen b.png
+    assert (sdilene.odkazu, sdilene.usetreno) == (3, b.stat().st_size)
+
+def rub_pdf(cesta, sirka, vyska):
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(str(cesta), pagesize=(sirka, vyska))
+    c.rect(5, 5, sirka - 10, vyska - 10)
+    c.showPage()
+    c.save()
+    return cesta
+
+def umisteni_na_strane(stranka):
+    """[(jméno formy, e, f)] z příkazů "q a b c d e f cm /X Do Q" obsahu stránky."""
+    radky = stranka.get_contents().get_data().decode("ascii").splitlines()
+    return [(casti[8], float(casti[5]), float(casti[6])) for casti in map(str.split, radky)]
+
+def test_rub_velikosti_karty_se_zrcadli(tmp_path):
+    karta = png(tmp_path / "karta.png", "red")
+    rozvrzeni = Rozvrzeni()
+    rub = rub_pdf(tmp_path / "bezna.pdf", *rozvrzeni.karta)
+    plan = plan_z_karet([(karta, None)] * 4, rub)
+    lic, oboustranne = tmp_path / "lic.pdf", tmp_path / "obo.pdf"
+    create_print_pdf(plan, lic)
+    create_backed_pdf(plan, lic, oboustranne)
+
+    reader, formy = precti_cele(oboustranne)
+    ruby = umisteni_na_strane(reader.pages[1])
+    assert len(set(formy)) == 2  # forma líce a jediná forma rubu pro všechny karty
+    ocekavane = [umisteni.zrcadlit(rozvrzeni.sirka) for umisteni, *_ in plan[0].sloty]
+    assert [v for _, e, f in ruby for v in (e, f)] == pytest.approx([v for u in ocekavane for v in (u.x, u.y)],
+                                                                   abs=1e-3)
+    assert len({jmeno for jmeno, _, _ in ruby}) == 1
+
+def test_rub_na_cely_arch_se_vlozi_jednou(tmp_path):
+    karta = png(tmp_path / "karta.png", "red")
+    rozvrzeni = Rozvrzeni()
+    rub = rub_pdf(tmp_path / "bezna.pdf", rozvrzeni.sirka, rozvrzeni.vyska)
+    plan = plan_z_karet([(karta, None)] * 4, rub)
+    lic, oboustranne = tmp_path / "lic.pdf", tmp_path / "obo.pdf"
+    create_print_pdf(plan, lic)
+    create_backed_pdf(plan, lic, oboustranne)
+
+    reader, _ = precti_cele(oboustranne)
+    assert umisteni_na_strane(reader.pages[1]) == [("/R0", 0.0, 0.0)]